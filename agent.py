@@ -0,0 +1,93 @@
+import datetime
+import os
+import threading
+from typing import Any, Callable, Optional
+
+# Agent executor'ı kuran modül. LLM yığını (langchain.agents, langchain_groq, prompt ve önbellek
+# modülleri) modül yüklenirken değil, executor ilk kez kurulurken içe aktarılır; böylece
+# terminal ve Streamlit giriş noktaları hızlı yol yanıtları için bu maliyeti hiç ödemez.
+
+DEFAULT_MODEL = "llama3-8b-8192"
+
+
+def build_agent_executor(groq_api_key: Optional[str] = None, llm=None, verbose: bool = False,
+                         clock: Optional[Callable[[], datetime.date]] = None,
+                         max_iterations: int = 15, **llm_kwargs: Any):
+    """Terminal, Streamlit ve toplu çalıştırma modlarının paylaştığı agent executor'ı oluşturur.
+
+    Args:
+        groq_api_key: Groq API anahtarı (llm verilmemişse kullanılır).
+        llm: Opsiyonel sohbet modeli; verilmezse paylaşılan ResilientChatGroq oluşturulur.
+        verbose: AgentExecutor ayrıntılı çıktısı.
+        clock: Prompt'taki tarih bilgisi için bugünün tarihini döndüren fonksiyon (varsayılan: datetime.date.today).
+        max_iterations: Bir turdaki en fazla agent adımı.
+        **llm_kwargs: llm verilmemişse modele geçirilen ek ayarlar (temperature, max_tokens, ...).
+
+    Returns:
+        ParallelAgentExecutor: Araç çağrılarını eşzamanlı çalıştıran executor.
+    """
+    from langchain.agents import create_tool_calling_agent
+
+    from direct_answer import DEFAULT_DIRECT_ANSWERS
+    from llm_cache import get_llm_cache_from_env
+    from llm_client import create_chat_model
+    from observations import compact_observation
+    from parallel_executor import ParallelAgentExecutor, DEFAULT_MAX_TOOL_WORKERS, DEFAULT_TOOL_TIMEOUT
+    from prompts import build_prompt
+    from tools import get_langchain_tools
+
+    tools = get_langchain_tools()
+
+    # Sabit talimat öneki + her turda clock'tan hesaplanan tarih bloğu (prompts.py)
+    prompt = build_prompt(clock)
+
+    if llm is None:
+        # Hız sınırı, yeniden deneme ve devre kesici tüm süreçte paylaşılır (llm_client.py)
+        llm = create_chat_model(
+            groq_api_key,
+            model=DEFAULT_MODEL,
+            cache=get_llm_cache_from_env(),  # LLM_CACHE_PATH tanımlıysa kalıcı yanıt önbelleği
+            **llm_kwargs
+        )
+
+    # Agent oluşturulması
+    agent = create_tool_calling_agent(llm, tools, prompt)
+    # Aynı turdaki birden fazla araç çağrısı eşzamanlı çalıştırılır
+    return ParallelAgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=verbose,
+        handle_parsing_errors=True,
+        max_iterations=max_iterations,
+        return_intermediate_steps=True,  # Toplu çalıştırma ve arayüz araç adımlarını da gösterir
+        # Başarılı tek araç sonuçları şablonla yanıtlanır, ikinci LLM turu atlanır (DIRECT_ANSWERS=0 ile kapatılır)
+        direct_answers=DEFAULT_DIRECT_ANSWERS if os.getenv("DIRECT_ANSWERS", "1") != "0" else {},
+        max_tool_workers=int(os.getenv("TOOL_MAX_WORKERS", DEFAULT_MAX_TOOL_WORKERS)),
+        tool_timeout=float(os.getenv("TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT)),  # Araç başına zaman aşımı (saniye)
+        # Araç sonuçları scratchpad'e kısa anahtarlı, kırpılmış JSON olarak yazılır (COMPACT_OBSERVATIONS=0 ile kapatılır)
+        observation_compactor=compact_observation if os.getenv("COMPACT_OBSERVATIONS", "1") != "0" else None
+    )
+
+
+class LazyAgent:
+    """Agent executor'ı ilk kullanımda (thread-safe olarak bir kez) kurar.
+
+    Args:
+        factory: Executor'ı oluşturan fonksiyon.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._executor is not None
+
+    def get(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+        return self._executor
@@ -2,151 +2,155 @@ import streamlit as st
 import os
 import json
 import logging
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain_core.agents import AgentAction, AgentFinish
 
-# Import tools from chatbot.py
-from chatbot import get_order_status, update_user_email, schedule_appointment, find_nearest_store
+# LLM yığını (langchain, langchain_groq) modül yüklenirken değil, agent ilk kez gerektiğinde yüklenir
+from agent import LazyAgent, build_agent_executor
+from tools import tool_specs
+from session_store import DEFAULT_PAGE_SIZE, get_session_store
+from metrics import get_metrics, get_metrics_callback, setup_metrics_exporters
+from router import IntentRouter
+from streaming import stream_agent
+from log_setup import log_context, new_id, setup_logging
+
+def render_tool_payload(payload):
+    """Araç girdisini veya sonucunu uygun Streamlit bileşeniyle gösterir."""
+    try:
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload)
+            except ValueError:
+                st.code(f"{payload}")
+                return
+        if isinstance(payload, (dict, list)):
+            st.json(payload, expanded=False)
+        else:
+            st.code(f"{payload}")
+    except:
+        st.write(f"{payload}")
+
+def render_intermediate_steps(intermediate_steps):
+    """Tamamlanmış bir agent çalışmasının ara adımlarını gösterir."""
+    with st.expander("⚙️ Agent Çalışma Adımları", expanded=False):
+        from langchain_core.agents import AgentAction
+
+        for step in intermediate_steps:
+            # Ensure step is a tuple (AgentAction, observation)
+            if isinstance(step, tuple) and len(step) == 2:
+                action, observation = step
+                if isinstance(action, AgentAction):
+                    st.markdown(f"**🛠️ Araç Çağrıldı:** `{action.tool}`")
+                    render_tool_payload(action.tool_input)
+                    st.markdown(f"**🔍 Araç Sonucu:**")
+                    render_tool_payload(observation)
+                    st.divider()
+                else:
+                    st.write("Beklenmeyen adım formatı (action):", action)
+            else:
+                st.write("Beklenmeyen adım formatı (step):", step)
+
+def render_fast_path_steps(tool_calls):
+    """Hızlı yoldan (LLM'siz) yapılan araç çağrılarını gösterir."""
+    with st.expander("⚙️ Agent Çalışma Adımları", expanded=False):
+        for call in tool_calls:
+            st.markdown(f"**🛠️ Araç Çağrıldı (hızlı yol):** `{call['tool']}`")
+            render_tool_payload(call["input"])
+            st.markdown(f"**🔍 Araç Sonucu:**")
+            render_tool_payload(call["output"])
+            st.divider()
+
+def load_agent_executor(lazy_agent):
+    """Agent executor'ı ilk kullanımda kurar; kurulamazsa hatayı gösterip çalışmayı durdurur."""
+    if lazy_agent.built:
+        return lazy_agent.get()
+    try:
+        agent_executor = lazy_agent.get()
+        logging.info("Agent Executor başarıyla yüklendi.")
+        return agent_executor
+    except Exception as e:
+        logging.exception("Agent Executor yüklenirken kritik bir hata oluştu.")
+        st.error(f"Agent başlatılırken bir hata oluştu: {e}. Lütfen API anahtarınızı ve yapılandırmayı kontrol edin.")
+        st.stop()
 
 def main():
     # --- Configuration and Setup ---
     load_dotenv()
     groq_api_key = os.getenv("GROQ_API_KEY")
+    # Akış modu: araç adımları ve yanıt token'ları geldikçe gösterilir (AGENT_STREAMING=0 ile kapatılır)
+    streaming_enabled = os.getenv("AGENT_STREAMING", "1") != "0"
+    # METRICS_PORT / METRICS_JSONL_PATH tanımlıysa ölçümler dışa aktarılır (süreç başına bir kez)
+    setup_metrics_exporters()
 
-    # --- Basic Logging Setup ---
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # --- Logging Setup ---
+    # Kayıtlar kuyruğa yazılır, G/Ç arka plan thread'inde yapılır; JSON-lines çıktı (LOG_FORMAT=console ile okunabilir satırlar)
+    setup_logging()
 
     st.set_page_config(page_title="Müşteri Destek Chatbot", page_icon="🤖")
     st.title("🤖 Müşteri Destek Chatbot")
     st.caption("Langchain & Groq ile Güçlendirilmiştir")
 
     # --- Langchain Agent Setup ---
+    # Executor, hızlı yolun karşılamadığı ilk istekte kurulur ve tüm oturumlarda paylaşılır
     @st.cache_resource
-    def load_agent_executor():
-        tools = [get_order_status, update_user_email, schedule_appointment, find_nearest_store]
-        
-        # Bugün, yarın ve hafta günleri için tarih hesapla
-        today = datetime.now()
-        
-        # Bugün ve yarın için tarih formatı
-        today_str = today.strftime("%Y-%m-%d")
-        tomorrow = today + timedelta(days=1)
-        tomorrow_str = tomorrow.strftime("%Y-%m-%d")
-        
-        # Hafta günleri için tarih hesaplama
-        current_weekday = today.weekday()  # 0: Pazartesi, 1: Salı, ..., 6: Pazar
-        
-        weekdays = {
-            "pazartesi": (0 - current_weekday) % 7 or 7,
-            "salı": (1 - current_weekday) % 7 or 7,
-            "çarşamba": (2 - current_weekday) % 7 or 7,
-            "perşembe": (3 - current_weekday) % 7 or 7,
-            "cuma": (4 - current_weekday) % 7 or 7,
-            "cumartesi": (5 - current_weekday) % 7 or 7,
-            "pazar": (6 - current_weekday) % 7 or 7
-        }
-        
-        # Tarihleri hesapla
-        weekday_dates = {}
-        for day_name, days_ahead in weekdays.items():
-            date = today + timedelta(days=days_ahead)
-            weekday_dates[day_name] = date.strftime("%Y-%m-%d")
-        
-        # Sistem talimatlarını güncelleyerek daha net yönlendirmeler ekliyorum
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """Sen müşteri hizmetleri taleplerini karşılayan bir asistansın. Uygun aracı çağırarak kullanıcıya yardımcı ol.
-
-Fonksiyon çağırma kuralları:
-- Sipariş durumu sorularında get_order_status kullan
-- E-posta güncelleme için update_user_email kullan
-- Randevu oluşturma için schedule_appointment kullan.
-- En yakın mağaza sorguları için find_nearest_store kullan ve lokasyon olarak şehir adı belirt
-- Kullanıcının lokasyonu yoksa veya "Your Current Location" çağrısı yapıyorsan, bunun yerine lokasyon için kullanıcıdan bilgi iste
-
-Tarih bilgisi:
-- Bugünün tarihi: {today_date}
-- Yarının tarihi: {tomorrow_date}
-- Önümüzdeki/bu/gelecek hafta için tarihler:
-  * Pazartesi: {monday_date}
-  * Salı: {tuesday_date}
-  * Çarşamba: {wednesday_date}
-  * Perşembe: {thursday_date}
-  * Cuma: {friday_date}
-  * Cumartesi: {saturday_date}
-  * Pazar: {sunday_date}
-- Tüm tarihler YYYY-MM-DD formatında kullanılmalıdır
-- "Yarın" ifadesi kullanıldığında {tomorrow_date} tarihini kullan
-- "Bugün" ifadesi kullanıldığında {today_date} tarihini kullan
-- "Bu pazartesi", "önümüzdeki pazartesi" gibi ifadeler için yukarıdaki tarihleri kullan
-- "Önümüzdeki hafta" ifadesinde bir sonraki pazartesi ({monday_date}) olarak kabul et
-- Başka tarihleri hesaplarken de YYYY-MM-DD formatını koruyarak hesapla
-
-Geçersiz bir yanıt verme ve her zaman Türkçe konuş.""".format(
-                today_date=today_str,
-                tomorrow_date=tomorrow_str,
-                monday_date=weekday_dates["pazartesi"],
-                tuesday_date=weekday_dates["salı"],
-                wednesday_date=weekday_dates["çarşamba"],
-                thursday_date=weekday_dates["perşembe"],
-                friday_date=weekday_dates["cuma"],
-                saturday_date=weekday_dates["cumartesi"],
-                sunday_date=weekday_dates["pazar"]
-            )),
-            MessagesPlaceholder(variable_name="chat_history", optional=True),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ])
-
-        # Groq modelini yapılandır ve hata durumuna karşı koruma ekle
-        try:
-            llm = ChatGroq(
-                model="llama3-8b-8192", 
-                groq_api_key=groq_api_key,
-                temperature=0.1,  # Daha kararlı yanıtlar için düşük sıcaklık
-                max_tokens=4000,   # Yeterli token sayısı
-                request_timeout=30, # Zaman aşımı süresi (saniye)
-            )
-        except Exception as e:
-            logging.error(f"LLM yapılandırılırken hata: {e}")
-            st.error(f"Model yüklenirken hata oluştu: {e}")
-            st.stop()
-
-        # Parsing hatalarına karşı koruma ile agent oluştur
-        agent = create_tool_calling_agent(llm, tools, prompt)
-        agent_executor = AgentExecutor(
-            agent=agent,
-            tools=tools, 
-            verbose=False,  # Üretim ortamında verbose kapatılabilir
-            handle_parsing_errors=True,
+    def load_lazy_agent():
+        return LazyAgent(lambda: build_agent_executor(
+            groq_api_key,
+            temperature=0.1,  # Daha kararlı yanıtlar için düşük sıcaklık
+            max_tokens=4000,   # Yeterli token sayısı
+            request_timeout=30, # Zaman aşımı süresi (saniye)
             max_iterations=3,  # Sonsuz döngü riskini azaltmak için
-            return_intermediate_steps=True
-        )
-        return agent_executor
+        ))
+
+    # Açık talepler için LLM'i atlayan hızlı yol, tüm oturumlarda paylaşılır
+    @st.cache_resource
+    def load_intent_router():
+        return IntentRouter(tool_specs(["get_order_status", "get_order_statuses", "update_user_email",
+                                        "find_nearest_store"]))
+
+    # FAST_PATH_ROUTER=0 ile kapatılabilir
+    intent_router = load_intent_router() if os.getenv("FAST_PATH_ROUTER", "1") != "0" else None
 
     if not groq_api_key:
         logging.error("GROQ_API_KEY ortam değişkeni bulunamadı.")
-        st.error("GROQ API Anahtarı bulunamadı. Lütfen .env dosyasını kontrol edin ve uygulamayı yeniden başlatın.")
-        st.stop()
+        if intent_router is None:
+            st.error("GROQ API Anahtarı bulunamadı. Lütfen .env dosyasını kontrol edin ve uygulamayı yeniden başlatın.")
+            st.stop()
+        # Hızlı yolun karşıladığı talepler LLM gerektirmez; yalnızca agent'a giden turlar engellenir
+        st.warning("GROQ API Anahtarı bulunamadı; yalnızca hızlı yolun karşıladığı talepler yanıtlanabilir. "
+                   "Lütfen .env dosyasını kontrol edin ve uygulamayı yeniden başlatın.")
 
-    try:
-        agent_executor = load_agent_executor()
-        logging.info("Agent Executor başarıyla yüklendi.")
-    except Exception as e:
-        logging.exception("Agent Executor yüklenirken kritik bir hata oluştu.")
-        st.error(f"Agent başlatılırken bir hata oluştu: {e}. Lütfen API anahtarınızı ve yapılandırmayı kontrol edin.")
-        st.stop()
+    lazy_agent = load_lazy_agent()
+    if lazy_agent.built:
+        # LLM önbelleği etkinse kazandırdığı gecikme ve token miktarını göster
+        from llm_cache import get_llm_cache_from_env
+        from llm_client import get_llm_guard
+
+        llm_cache = get_llm_cache_from_env()
+        if llm_cache:
+            with st.sidebar.expander("🗄️ LLM Önbelleği", expanded=False):
+                st.json(llm_cache.stats())
+        # Devre kesici açıksa yanıtlar geçici olarak sabit "yoğunluk" mesajıyla verilir
+        if get_llm_guard().breaker.is_open:
+            st.sidebar.warning("LLM servisi şu anda yanıt vermiyor; sınırlı modda çalışılıyor.")
 
     # --- Chat History Management ---
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-        
-    # Hafıza kısmında herhangi bir mesaj yoksa giriş yazısını göster
-    if len(st.session_state.messages) == 0:
+    # Mesajlar paylaşılan oturum deposunda tutulur (SESSION_DB_PATH ile kalıcı, kopyalar arasında ortak).
+    # Oturum kimliği URL'de taşınır; sayfa yenilense veya uygulama yeniden başlasa da konuşma sürer.
+    # Oturumun tüm logları da bu kimlikle ilişkilendirilir.
+    session_store = get_session_store()
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = st.query_params.get("session") or new_id()
+        st.query_params["session"] = st.session_state.session_id
+    # Yeniden çizimde yalnızca son sayfa(lar) okunur; geçmiş uzadıkça tur maliyeti artmaz
+    if "history_limit" not in st.session_state:
+        st.session_state.history_limit = DEFAULT_PAGE_SIZE
+    # (bir fazla mesaj okunarak daha eski mesaj olup olmadığı anlaşılır)
+    history = session_store.page(st.session_state.session_id, limit=st.session_state.history_limit + 1)
+    has_older_messages = len(history) > st.session_state.history_limit
+    history = history[-st.session_state.history_limit:]
+
+    # Oturumda herhangi bir mesaj yoksa giriş yazısını göster
+    if not history:
         st.markdown("""
         ### 👋 Hoş Geldiniz!
         
@@ -167,114 +171,95 @@ Geçersiz bir yanıt verme ve her zaman Türkçe konuş.""".format(
         """)
 
     # Display chat messages from history on app rerun
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    if has_older_messages:
+        def load_older_messages():
+            st.session_state.history_limit += DEFAULT_PAGE_SIZE
+
+        st.button("⬆️ Daha eski mesajları göster", on_click=load_older_messages)
+    for message in history:
+        with st.chat_message(message.role):
+            st.markdown(message.content)
 
     # --- Chat Input and Interaction ---
     if prompt := st.chat_input("Sorunuzu veya talebinizi yazın..."):
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
         # Display user message in chat message container
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Prepare chat history for the agent
-        chat_history_for_agent = []
-        for msg in st.session_state.messages:
-            if msg["role"] == "user":
-                chat_history_for_agent.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                chat_history_for_agent.append(AIMessage(content=msg["content"]))
+        # Prepare chat history for the agent (bu turun mesajı henüz depoda değil). Hafıza oturum
+        # başına bir kez kurulur, sonra yalnızca yeni mesajlarla güncellenir
+        chat_history_for_agent = session_store.memory(st.session_state.session_id).messages()
 
         # Get assistant response
-        with st.chat_message("assistant"):
+        # Turun tüm logları (araçlar dahil) aynı oturum/tur kimliğini taşır
+        with st.chat_message("assistant"), log_context(session_id=st.session_state.session_id):
             message_placeholder = st.empty() # Placeholder for final response
             loading_text = "Yanıt hazırlanıyor..."
             message_placeholder.markdown(loading_text)
 
             try:
-                logging.info(f"Kullanıcı girdisi: {prompt}")
-                
-                # Yarın için tarihi hesapla (randevu işlemleri için)
-                tomorrow = datetime.now() + timedelta(days=1)
-                tomorrow_str = tomorrow.strftime("%Y-%m-%d")
-                
-                # Kullanıcının girdisini olduğu gibi kullan, çünkü sistem promptunda zaten tarih bilgisi var
-                enhanced_prompt = prompt
-                
-                # Invoke the agent and get intermediate steps
-                if chat_history_for_agent and isinstance(chat_history_for_agent[-1], HumanMessage):
-                    input_for_agent = chat_history_for_agent.pop().content
-                else:
-                    input_for_agent = enhanced_prompt
-                
-                # Agent'i çağır ve maksimum 2 deneme yap
-                retry_count = 0
-                max_retries = 2
-                last_error = None
-                
-                while retry_count <= max_retries:
-                    try:
+                logging.info("Kullanıcı girdisi: %s", prompt)
+
+                # Akış sırasında araç adımlarının yazılacağı expander ilk araç olayında oluşturulur
+                stream_state = {"expander": None, "text": ""}
+
+                def render_stream_event(event):
+                    if event["type"] in ("tool_start", "tool_end"):
+                        if stream_state["expander"] is None:
+                            stream_state["expander"] = st.expander("⚙️ Agent Çalışma Adımları", expanded=True)
+                        with stream_state["expander"]:
+                            if event["type"] == "tool_start":
+                                st.markdown(f"**🛠️ Araç Çağrıldı:** `{event['tool']}`")
+                                render_tool_payload(event["input"])
+                            else:
+                                st.markdown(f"**🔍 Araç Sonucu:**")
+                                render_tool_payload(event["output"])
+                                st.divider()
+                    elif event["type"] == "token":
+                        stream_state["text"] += event["text"]
+                        message_placeholder.markdown(stream_state["text"] + "▌")
+
+                # Önce deterministik hızlı yolu dene; eşleşme yoksa agent'a git
+                fast_result = intent_router.try_handle(prompt) if intent_router else None
+                if fast_result:
+                    get_metrics().inc("fast_path_hits_total", route=fast_result["route"])
+                    result = {"output": fast_result["output"], "intermediate_steps": []}
+                    render_fast_path_steps(fast_result["tool_calls"])
+
+                # Hatalı LLM çağrıları llm_client içinde tek tek yeniden denenir; agent
+                # çalışmasının tamamı tekrarlanmaz (429 fırtınasında yükü katlamamak için)
+                if fast_result is None and not groq_api_key:
+                    result = {"output": "Bu talebi yanıtlamak için GROQ API Anahtarı gerekiyor. "
+                                        "Lütfen .env dosyasını kontrol edin ve uygulamayı yeniden başlatın.",
+                              "intermediate_steps": []}
+                elif fast_result is None:
+                    agent_executor = load_agent_executor(lazy_agent)
+                    # Ölçüm callback'i (ve langchain_core) agent'a giden ilk turda yüklenir
+                    run_config = {"callbacks": [get_metrics_callback()]}
+                    agent_input = {
+                        # Kullanıcının girdisi olduğu gibi kullanılır; tarih bilgisi sistem prompt'unda
+                        "input": prompt,
+                        "chat_history": chat_history_for_agent
+                    }
+                    if streaming_enabled:
+                        result = stream_agent(agent_executor, agent_input, on_event=render_stream_event,
+                                              config=run_config)
+                    else:
                         # Sadeleştirilmiş agent çağrısı
-                        result = agent_executor.invoke({
-                            "input": input_for_agent,
-                            "chat_history": chat_history_for_agent
-                        })
-                        
-                        # Başarılı çağrıyla döngüyü kır
-                        break
-                    except Exception as e:
-                        last_error = str(e)
-                        logging.warning(f"Agent çağrısı hatası (Deneme {retry_count+1}/{max_retries+1}): {e}")
-                        retry_count += 1
-                        
-                        # Son denemedeysek ve hala hata varsa, hatayı fırlatmaya devam et
-                        if retry_count > max_retries:
-                            raise e
+                        result = agent_executor.invoke(agent_input, config=run_config)
                 
                 # --- Display Intermediate Steps ---
-                if "intermediate_steps" in result and result["intermediate_steps"]:
-                    with st.expander("⚙️ Agent Çalışma Adımları", expanded=False):
-                        for step in result["intermediate_steps"]:
-                            # Ensure step is a tuple (AgentAction, observation)
-                            if isinstance(step, tuple) and len(step) == 2:
-                                action, observation = step
-                                if isinstance(action, AgentAction):
-                                    tool = action.tool
-                                    tool_input = action.tool_input
-                                    st.markdown(f"**🛠️ Araç Çağrıldı:** `{tool}`")
-                                    
-                                    try:
-                                        if isinstance(tool_input, str):
-                                            tool_input_dict = json.loads(tool_input)
-                                        else:
-                                            tool_input_dict = tool_input
-                                        st.json(tool_input_dict, expanded=False)
-                                    except:
-                                        st.code(f"{tool_input}")
-                                        
-                                    st.markdown(f"**🔍 Araç Sonucu:**")
-                                    try:
-                                        if isinstance(observation, (dict, list)):
-                                            st.json(observation, expanded=False)
-                                        else:
-                                            st.code(f"{observation}")
-                                    except:
-                                        st.write(f"{observation}")
-                                    st.divider()
-                                else:
-                                    st.write("Beklenmeyen adım formatı (action):", action)
-                            else:
-                                st.write("Beklenmeyen adım formatı (step):", step)
+                # Akış modunda adımlar zaten canlı olarak gösterildi
+                if not streaming_enabled and result.get("intermediate_steps"):
+                    render_intermediate_steps(result["intermediate_steps"])
 
                 # --- Final Response ---
                 full_response = result.get('output', "Üzgünüm, bir yanıt oluşturamadım.")
-                logging.info(f"Agent yanıtı: {full_response}")
+                logging.info("Agent yanıtı: %s", full_response)
                 message_placeholder.markdown(full_response)
 
             except Exception as e:
-                logging.exception(f"Agent çağrılırken hata oluştu. Kullanıcı girdisi: {prompt}")
+                logging.exception("Agent çağrılırken hata oluştu. Kullanıcı girdisi: %s", prompt)
                 
                 # Kullanıcı dostu hata mesajı
                 if "Failed to call a function" in str(e):
@@ -295,8 +280,8 @@ Lütfen talebinizi şu şekilde belirtin:
                 message_placeholder.markdown(error_message)
                 full_response = error_message
 
-        # Add assistant response to chat history (even if it's an error message)
-        st.session_state.messages.append({"role": "assistant", "content": full_response})
+        # Add user message and assistant response to chat history (even if it's an error message)
+        session_store.append_turn(st.session_state.session_id, prompt, full_response)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,324 @@
+import bisect
+import datetime
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from text_utils import fold_turkish
+
+# Randevu slot motoru: her servis türü için gün başına kapasite ve süreye göre
+# çakışma kontrolü yapar. Bir servisin günlük takvimi, başlangıç dakikasına göre
+# sıralı aralık listesi olarak tutulur; çakışma kontrolü ve boş slot araması bisect
+# ile O(log n) konumlanır. Randevu numaraları ULID biçiminde, zamana göre sıralı ve
+# aynı milisaniye içinde bile tekildir.
+
+# Çalışma saatleri (dakika cinsinden, 09:00-18:00) ve önerilen saatlerin ızgarası
+OPENING_MINUTE = 9 * 60
+CLOSING_MINUTE = 18 * 60
+SLOT_MINUTES = 30
+# Talep edilen gün doluysa ileriye doğru bakılacak en fazla gün
+SEARCH_DAYS = 14
+DEFAULT_ALTERNATIVES = 3
+
+
+@dataclass(frozen=True)
+class ServiceConfig:
+    name: str
+    duration_minutes: int
+    daily_capacity: int
+
+
+DEFAULT_SERVICE = ServiceConfig("Genel Servis", 30, 12)
+# Anahtarlar fold_turkish ile katlanmış servis adlarıdır
+SERVICES: Dict[str, ServiceConfig] = {
+    "genel servis": DEFAULT_SERVICE,
+    "bakim": ServiceConfig("Bakım", 60, 6),
+    "tamir": ServiceConfig("Tamir", 60, 6),
+    "kurulum": ServiceConfig("Kurulum", 90, 4),
+}
+
+_CROCKFORD32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+class ULIDGenerator:
+    """Monoton ULID üreteci (48 bit ms zaman damgası + 80 bit rastgelelik).
+
+    Aynı milisaniyede üretilen kimliklerde rastgele kısım bir artırılır; böylece
+    kimlikler hem tekil hem de üretim sırasına göre sözlük sırasında sıralıdır.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self) -> str:
+        with self._lock:
+            now_ms = int(self._clock() * 1000)
+            if now_ms <= self._last_ms:
+                # Saat geri gitse veya aynı ms'de kalsa bile sıra korunur
+                now_ms = self._last_ms
+                self._last_random += 1
+                if self._last_random >= 1 << 80:
+                    now_ms += 1
+                    self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            else:
+                # En üst bit boş bırakılır; aynı ms içindeki artışlar taşmaz
+                self._last_random = int.from_bytes(os.urandom(10), "big") >> 1
+            self._last_ms = now_ms
+            value = (now_ms << 80) | self._last_random
+        return "".join(_CROCKFORD32[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+@dataclass
+class Appointment:
+    appointment_id: str
+    service_type: str
+    date: str
+    start_minute: int
+    end_minute: int
+
+    @property
+    def time(self) -> str:
+        return _format_minute(self.start_minute)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "appointment_id": self.appointment_id,
+            "service_type": self.service_type,
+            "date": self.date,
+            "time": self.time,
+            "end_time": _format_minute(self.end_minute),
+        }
+
+
+@dataclass
+class BookingResult:
+    success: bool
+    appointment: Optional[Appointment] = None
+    reason: str = ""
+    alternatives: List[Dict[str, str]] = field(default_factory=list)
+
+
+def _format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def parse_time(value: str) -> int:
+    """"HH:MM" biçimindeki saati gün içindeki dakikaya çevirir."""
+    parsed = datetime.datetime.strptime(value.strip(), "%H:%M")
+    return parsed.hour * 60 + parsed.minute
+
+
+def resolve_service(service_type: Optional[str],
+                    services: Optional[Dict[str, ServiceConfig]] = None) -> Optional[ServiceConfig]:
+    """Servis türünü yapılandırmaya çevirir; boşsa genel servis, tanımsızsa None döner."""
+    if not service_type or not service_type.strip():
+        return DEFAULT_SERVICE
+    # Tanımsız adlar için takvim açılmaz; aksi halde her yeni ad bellekte yeni takvimler biriktirir
+    return (SERVICES if services is None else services).get(fold_turkish(service_type))
+
+
+class DayCalendar:
+    """Bir servisin tek bir gündeki randevuları; aralıklar başlangıca göre sıralıdır."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.lock = threading.Lock()
+
+    @property
+    def full(self) -> bool:
+        return len(self.starts) >= self.capacity
+
+    def conflicts(self, start: int, end: int) -> bool:
+        i = bisect.bisect_right(self.starts, start)
+        # Soldaki aralık başlangıcı aşıyorsa veya sağdaki bitişten önce başlıyorsa çakışır
+        if i > 0 and self.ends[i - 1] > start:
+            return True
+        return i < len(self.starts) and self.starts[i] < end
+
+    def insert(self, start: int, end: int) -> None:
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def free_after(self, start: int, duration: int, earliest: int = OPENING_MINUTE) -> Optional[int]:
+        """start veya sonrasındaki ilk boş ızgara başlangıcını döndürür."""
+        candidate = _ceil_to_slot(max(start, earliest))
+        i = bisect.bisect_right(self.starts, candidate)
+        if i > 0 and self.ends[i - 1] > candidate:
+            candidate = _ceil_to_slot(self.ends[i - 1])
+        # Yalnızca aday sonrasındaki aralıklar arasındaki boşluklar gezilir
+        while candidate + duration <= CLOSING_MINUTE:
+            if i >= len(self.starts) or candidate + duration <= self.starts[i]:
+                return candidate
+            candidate = _ceil_to_slot(max(candidate, self.ends[i]))
+            i += 1
+        return None
+
+    def free_before(self, start: int, duration: int, earliest: int = OPENING_MINUTE) -> Optional[int]:
+        """start'tan önce biten en geç boş ızgara başlangıcını döndürür."""
+        candidate = _floor_to_slot(min(start, CLOSING_MINUTE - duration))
+        while candidate >= earliest:
+            # Aday bitmeden başlayan son aralık, aralıklar çakışmadığından en geç biten aralıktır
+            i = bisect.bisect_left(self.starts, candidate + duration)
+            if i == 0 or self.ends[i - 1] <= candidate:
+                return candidate
+            candidate = _floor_to_slot(min(candidate - SLOT_MINUTES, self.starts[i - 1] - duration))
+        return None
+
+
+def _ceil_to_slot(minute: int) -> int:
+    return -(-minute // SLOT_MINUTES) * SLOT_MINUTES
+
+
+def _floor_to_slot(minute: int) -> int:
+    return minute // SLOT_MINUTES * SLOT_MINUTES
+
+
+class BookingEngine:
+    """Thread-safe randevu motoru.
+
+    Args:
+        services: Katlanmış servis adı -> ServiceConfig eşlemesi.
+        clock: Şu anki zamanı döndüren fonksiyon (geçmişe randevu verilmez).
+        id_generator: Randevu numarası üreteci.
+    """
+
+    def __init__(self, services: Optional[Dict[str, ServiceConfig]] = None,
+                 clock: Callable[[], datetime.datetime] = datetime.datetime.now,
+                 id_generator: Optional[ULIDGenerator] = None):
+        self.services = services if services is not None else SERVICES
+        self.clock = clock
+        self.ids = id_generator or ULIDGenerator()
+        self._calendars: Dict[Tuple[str, str], DayCalendar] = {}
+        self._calendars_lock = threading.Lock()
+        # Geçmiş günlerin takvimlerinin en son hangi gün için temizlendiği
+        self._pruned_date = ""
+
+    def _calendar(self, service: ServiceConfig, date: str) -> DayCalendar:
+        key = (service.name, date)
+        calendar = self._calendars.get(key)
+        if calendar is None:
+            with self._calendars_lock:
+                self._prune_past()
+                calendar = self._calendars.setdefault(key, DayCalendar(service.daily_capacity))
+        return calendar
+
+    def _prune_past(self) -> None:
+        """Bugünden önceki günlerin takvimlerini atar; gün değiştiğinde bir kez tarar.
+
+        _calendars_lock altında çağrılır. Geçmişe randevu verilmediğinden bu takvimler
+        bir daha okunmaz.
+        """
+        today = self.clock().date().isoformat()
+        if today == self._pruned_date:
+            return
+        # ISO tarihler sözlük sırasıyla karşılaştırılabilir
+        for key in [key for key in self._calendars if key[1] < today]:
+            del self._calendars[key]
+        self._pruned_date = today
+
+    def _earliest(self, date: datetime.date) -> Optional[int]:
+        """Gün içinde randevu verilebilecek en erken dakika; gün geçmişse None."""
+        now = self.clock()
+        if date < now.date():
+            return None
+        if date == now.date():
+            return max(OPENING_MINUTE, now.hour * 60 + now.minute + 1)
+        return OPENING_MINUTE
+
+    def book(self, service_type: Optional[str], date: str, time_str: str,
+             max_alternatives: int = DEFAULT_ALTERNATIVES) -> BookingResult:
+        """Randevu oluşturur; slot uygun değilse en yakın boş alternatifleri döndürür.
+
+        Args:
+            service_type: Servis türü (boşsa genel servis; tanımsız servisler reddedilir).
+            date: YYYY-MM-DD biçiminde tarih.
+            time_str: HH:MM biçiminde saat.
+            max_alternatives: Önerilecek en fazla alternatif sayısı.
+
+        Returns:
+            BookingResult: Başarılıysa randevu, değilse neden ve alternatifler.
+        """
+        service = resolve_service(service_type, self.services)
+        if service is None:
+            names = ", ".join(config.name for config in self.services.values())
+            return BookingResult(success=False,
+                                 reason=f"'{service_type.strip()}' tanımlı bir servis değil. Geçerli servisler: {names}.")
+        day = datetime.date.fromisoformat(date)
+        start = parse_time(time_str)
+        end = start + service.duration_minutes
+        earliest = self._earliest(day)
+
+        if earliest is None or start < earliest:
+            reason = "Geçmiş bir tarih veya saat için randevu oluşturulamaz."
+        elif start < OPENING_MINUTE or end > CLOSING_MINUTE:
+            reason = (f"Randevular {_format_minute(OPENING_MINUTE)}-{_format_minute(CLOSING_MINUTE)} "
+                      f"saatleri arasında verilebilir.")
+        else:
+            calendar = self._calendar(service, date)
+            with calendar.lock:
+                if calendar.full:
+                    reason = f"{date} tarihinde {service.name} kapasitesi dolmuştur."
+                elif calendar.conflicts(start, end):
+                    reason = f"{date} {time_str} saatinde {service.name} için uygun yer yoktur."
+                else:
+                    calendar.insert(start, end)
+                    appointment = Appointment("APT" + self.ids.new(), service.name, date, start, end)
+                    return BookingResult(success=True, appointment=appointment)
+
+        return BookingResult(success=False, reason=reason,
+                             alternatives=self.alternatives(service, day, start, max_alternatives))
+
+    def alternatives(self, service: ServiceConfig, day: datetime.date, start: int,
+                     limit: int = DEFAULT_ALTERNATIVES) -> List[Dict[str, str]]:
+        """İstenen saate en yakın boş slotları (önce aynı gün, sonra sonraki günler) bulur."""
+        found: List[Dict[str, str]] = []
+        duration = service.duration_minutes
+        for offset in range(SEARCH_DAYS + 1):
+            date = day + datetime.timedelta(days=offset)
+            earliest = self._earliest(date)
+            if earliest is None:
+                continue
+            calendar = self._calendar(service, date.isoformat())
+            with calendar.lock:
+                if calendar.full:
+                    continue
+                reference = start if offset == 0 else OPENING_MINUTE
+                before = calendar.free_before(reference, duration, earliest) if offset == 0 else None
+                candidates: List[int] = []
+                after = calendar.free_after(reference, duration, earliest)
+                # Aynı gün içinde istenen saate en yakın slotlar sırayla toplanır
+                while len(found) + len(candidates) < limit and (after is not None or before is not None):
+                    if before is None or (after is not None and after - reference <= reference - before):
+                        candidates.append(after)
+                        after = calendar.free_after(after + SLOT_MINUTES, duration, earliest)
+                    else:
+                        candidates.append(before)
+                        before = calendar.free_before(before - SLOT_MINUTES, duration, earliest)
+                # Kalan kapasiteden fazla öneri yapılmaz
+                candidates = candidates[:calendar.capacity - len(calendar.starts)]
+            found.extend({"date": date.isoformat(), "time": _format_minute(minute)} for minute in candidates)
+            if len(found) >= limit:
+                break
+        return found[:limit]
+
+
+_engine: Optional[BookingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_booking_engine() -> BookingEngine:
+    """Süreç genelinde paylaşılan randevu motorunu döndürür."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = BookingEngine()
+    return _engine
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from agent import build_agent_executor
+from log_setup import log_context, setup_logging
+from memory import ConversationMemory, DEFAULT_MAX_TOKENS
+from metrics import get_metrics, get_metrics_callback
+from router import IntentRouter
+
+# Kayıtlı konuşmaları başsız (headless) olarak agent üzerinden tekrar oynatır.
+#
+# Girdi JSONL satırı:
+#   {"id": "c1", "messages": ["Merhaba", "123456 siparişim nerede?"]}
+#   ("messages" öğeleri {"role": "user", "content": ...} biçiminde de olabilir;
+#    yalnızca kullanıcı mesajları agent'a gönderilir.)
+# Çıktı JSONL satırı (konuşma tamamlandıkça yazılır):
+#   {"id": "c1", "status": "ok" | "error", "turns": [{"input", "output", "route",
+#    "tool_calls", "intermediate_steps", "latency_ms"}], "error": ..., "duration_ms": ...}
+#
+# Konuşmalar birbirinden bağımsız olarak eşzamanlı çalışır; bir konuşmanın turları
+# ise chat_history sırası korunsun diye sırayla işlenir.
+
+DEFAULT_CONCURRENCY = 8
+# Saniyede başlatılabilecek en fazla agent turu (0: sınırsız)
+DEFAULT_RATE = 5.0
+
+
+class AsyncTokenBucket:
+    """asyncio için token bucket hız sınırlayıcı.
+
+    Args:
+        rate: Saniyede eklenen token sayısı (0 veya negatif: sınırsız).
+        capacity: Biriktirilebilecek en fazla token (ani yük payı).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        # Kilit, bekleyenlerin sırayla (FIFO) token almasını sağlar
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def load_conversations(path: str) -> List[Dict[str, Any]]:
+    """Girdi JSONL dosyasını okur; kimliği olmayan konuşmalara satır numarası verilir."""
+    conversations = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.warning("Girdi satırı %s okunamadı, atlanıyor: %s", line_no, e)
+                continue
+            messages = []
+            for message in record.get("messages", []):
+                if isinstance(message, str):
+                    messages.append(message)
+                elif message.get("role", "user") in ("user", "human"):
+                    messages.append(message["content"])
+            conversations.append({"id": str(record.get("id", f"line-{line_no}")), "messages": messages})
+    return conversations
+
+
+def load_completed_ids(path: str) -> Set[str]:
+    """Önceki çalışmada başarıyla tamamlanmış konuşma kimliklerini döndürür.
+
+    Yarıda kesilmiş son satır ve hatalı sonuçlar tamamlanmış sayılmaz; bu konuşmalar
+    yeniden çalıştırılır (okuyucular aynı kimlik için son satırı esas almalıdır).
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                completed.add(str(record["id"]))
+    return completed
+
+
+def serialize_steps(intermediate_steps: List[tuple]) -> List[Dict[str, Any]]:
+    """(AgentAction, gözlem) çiftlerini JSON'a yazılabilir sözlüklere çevirir."""
+    return [
+        {"tool": action.tool, "tool_input": action.tool_input, "observation": observation}
+        for action, observation in intermediate_steps
+    ]
+
+
+class BatchRunner:
+    """Konuşmaları sınırlı eşzamanlılık ve hız sınırıyla agent üzerinden çalıştırır.
+
+    Args:
+        agent_executor: ainvoke destekleyen AgentExecutor.
+        output_path: Sonuçların eklendiği JSONL dosyası.
+        concurrency: Aynı anda işlenen en fazla konuşma.
+        rate: Saniyede başlatılabilecek en fazla agent turu (0: sınırsız).
+        router: Opsiyonel hızlı yol yönlendiricisi.
+        memory_max_tokens: Konuşma başına hafıza bütçesi.
+    """
+
+    def __init__(self, agent_executor, output_path: str, concurrency: int = DEFAULT_CONCURRENCY,
+                 rate: float = DEFAULT_RATE, router: Optional[IntentRouter] = None,
+                 memory_max_tokens: int = DEFAULT_MAX_TOKENS):
+        self.agent_executor = agent_executor
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.rate_limiter = AsyncTokenBucket(rate)
+        self.router = router
+        self.memory_max_tokens = memory_max_tokens
+        self.run_config = {"callbacks": [get_metrics_callback()]}
+        self._output = None
+
+    async def _run_turn(self, user_input: str, memory: ConversationMemory) -> Dict[str, Any]:
+        start = time.perf_counter()
+        # Sipariş/mağaza araçları engelleyen I/O yapar; olay döngüsünü bekletmesin
+        fast_result = await asyncio.to_thread(self.router.try_handle, user_input) if self.router else None
+        if fast_result:
+            get_metrics().inc("fast_path_hits_total", route=fast_result["route"])
+            turn = {
+                "input": user_input,
+                "output": fast_result["output"],
+                "route": fast_result["route"],
+                "tool_calls": fast_result["tool_calls"],
+                "intermediate_steps": [],
+            }
+        else:
+            await self.rate_limiter.acquire()
+            result = await self.agent_executor.ainvoke(
+                {"input": user_input, "chat_history": memory.messages()}, config=self.run_config
+            )
+            steps = serialize_steps(result.get("intermediate_steps", []))
+            turn = {
+                "input": user_input,
+                "output": result["output"],
+                "route": "agent",
+                "tool_calls": [
+                    {"tool": step["tool"], "input": step["tool_input"], "output": step["observation"]}
+                    for step in steps
+                ],
+                "intermediate_steps": steps,
+            }
+        turn["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        memory.add_user_message(user_input)
+        memory.add_ai_message(turn["output"])
+        return turn
+
+    async def _run_conversation(self, conversation: Dict[str, Any], semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
+            start = time.perf_counter()
+            memory = ConversationMemory(max_tokens=self.memory_max_tokens)
+            record: Dict[str, Any] = {"id": conversation["id"], "status": "ok", "turns": []}
+            try:
+                # Turlar sırayla çalışır; her tur bir öncekinin geçmişini görür
+                for user_input in conversation["messages"]:
+                    # Loglar konuşma kimliği ve tur kimliğiyle ilişkilendirilir
+                    with log_context(session_id=str(conversation["id"])):
+                        record["turns"].append(await self._run_turn(user_input, memory))
+            except Exception as e:
+                logging.exception("Konuşma işlenirken hata: %s", conversation["id"])
+                record["status"] = "error"
+                record["error"] = f"{type(e).__name__}: {e}"
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self._write(record)
+            return record["status"] == "ok"
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        # Tek olay döngüsünde çalışıldığından yazmalar birbirine karışmaz
+        self._output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._output.flush()
+
+    async def run(self, conversations: List[Dict[str, Any]], resume: bool = True) -> Dict[str, Any]:
+        """Konuşmaları çalıştırır ve özet istatistikleri döndürür."""
+        completed = load_completed_ids(self.output_path) if resume else set()
+        pending = [c for c in conversations if c["id"] not in completed]
+        skipped = len(conversations) - len(pending)
+        if skipped:
+            logging.info("%s konuşma önceki çalışmada tamamlanmış, atlanıyor", skipped)
+
+        mode = "a" if resume else "w"
+        # Önceki çalışma satır ortasında kesildiyse yeni kayıt ayrı satırdan başlasın
+        needs_newline = False
+        if resume and os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 0:
+            with open(self.output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        with open(self.output_path, mode, encoding="utf-8") as self._output:
+            if needs_newline:
+                self._output.write("\n")
+            results = await asyncio.gather(*(self._run_conversation(c, semaphore) for c in pending))
+        elapsed = time.perf_counter() - start
+
+        succeeded = sum(results)
+        return {
+            "total": len(conversations),
+            "skipped": skipped,
+            "processed": len(pending),
+            "succeeded": succeeded,
+            "failed": len(pending) - succeeded,
+            "elapsed_seconds": round(elapsed, 2),
+            "conversations_per_minute": round(len(pending) / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL konuşma dosyasını agent üzerinden toplu çalıştırır.")
+    parser.add_argument("input", help="Girdi JSONL dosyası")
+    parser.add_argument("output", help="Sonuçların yazılacağı JSONL dosyası")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Aynı anda işlenen en fazla konuşma")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Saniyede başlatılabilecek en fazla agent turu (0: sınırsız)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Çıktı dosyasının üzerine yaz, tamamlanmış konuşmaları atlama")
+    parser.add_argument("--no-router", action="store_true", help="Hızlı yolu devre dışı bırak")
+    parser.add_argument("--allow-side-effects", action="store_true",
+                        help="E-posta güncellemelerini kalıcı outbox'a yazıp CRM'e gönder")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not args.allow_side_effects:
+        # Kayıtlı konuşmaları tekrar oynatmak gerçek profil güncellemesi kuyruğa almamalı;
+        # .env'deki değerler de ezilir
+        os.environ["PROFILE_OUTBOX_PATH"] = ":memory:"
+        os.environ["PROFILE_OUTBOX_DRY_RUN"] = "1"
+    setup_logging()
+    agent_executor = build_agent_executor(os.getenv("GROQ_API_KEY"))
+    router = None if args.no_router else IntentRouter(agent_executor.tools)
+    runner = BatchRunner(
+        agent_executor,
+        args.output,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        router=router,
+        memory_max_tokens=int(os.getenv("MEMORY_MAX_TOKENS", DEFAULT_MAX_TOKENS)),
+    )
+
+    conversations = load_conversations(args.input)
+    logging.info("%s konuşma yüklendi: %s", len(conversations), args.input)
+    summary = asyncio.run(runner.run(conversations, resume=not args.no_resume))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    print(f"Verim: {summary['conversations_per_minute']} konuşma/dakika")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Agent turu çerçeve yükü benchmark'ı.
+
+agent.build_agent_executor ile kurulan gerçek create_tool_calling_agent /
+ParallelAgentExecutor düzenini, ChatGroq yerine senaryo tabanlı sahte modelle
+(scripted_llm.py) çalıştırır. Her tur; simüle edilen LLM süresi, araç süresi ve geri
+kalan çerçeve yükü (prompt oluşturma, ayrıştırma, callback'ler, hafıza) olarak ayrıştırılır.
+Ağ veya GROQ_API_KEY gerektirmez.
+
+Sonuçlar bir baseline dosyasıyla karşılaştırılır; tolerans aşılırsa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_agent.py --sessions 50
+    python benchmarks/bench_agent.py --sessions 50 --save-baseline
+    python benchmarks/bench_agent.py --latency 0.2 --jitter 0.05 --no-compare
+"""
+import argparse
+import datetime
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from langchain_core.callbacks import BaseCallbackHandler  # noqa: E402
+
+from agent import build_agent_executor  # noqa: E402
+from memory import ConversationMemory  # noqa: E402
+from scripted_llm import ScriptedChatModel, build_script, load_scenarios  # noqa: E402
+
+DEFAULT_SCENARIOS = os.path.join(BENCH_DIR, "scenarios.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "bench_agent.json")
+# Baseline'a göre izin verilen en fazla kötüleşme oranı
+DEFAULT_TOLERANCE = 0.25
+# Karşılaştırılan metrikler ve iyileşme yönü (True: yüksek değer daha iyi)
+COMPARED_METRICS = {
+    "turns_per_sec": True,
+    "overhead_p50_ms": False,
+    "overhead_p99_ms": False,
+    "memory_per_session_kb": False,
+}
+
+
+class TurnBreakdownCallback(BaseCallbackHandler):
+    """Bir tur içindeki LLM ve araç çalışmalarının zaman aralıklarını toplar."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._starts: Dict[UUID, Tuple[str, float]] = {}
+        self.intervals: Dict[str, List[Tuple[float, float]]] = {"llm": [], "tool": []}
+
+    def _start(self, kind: str, run_id: UUID) -> None:
+        with self._lock:
+            self._starts[run_id] = (kind, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        end = time.perf_counter()
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            if started is not None:
+                self.intervals[started[0]].append((started[1], end))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start("llm", run_id)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start("tool", run_id)
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def busy_seconds(self, kind: str) -> float:
+        """Çakışan aralıkları (eşzamanlı araçlar) birleştirerek toplam süreyi döndürür."""
+        total, current_start, current_end = 0.0, None, None
+        for start, end in sorted(self.intervals[kind]):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            total += current_end - current_start
+        return total
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def run_session(executor, scenario: Dict[str, Any], samples: Dict[str, List[float]]) -> ConversationMemory:
+    memory = ConversationMemory()
+    for turn in scenario["turns"]:
+        callback = TurnBreakdownCallback()
+        start = time.perf_counter()
+        result = executor.invoke({"input": turn["input"], "chat_history": memory.messages()},
+                                 config={"callbacks": [callback]})
+        memory.add_user_message(turn["input"])
+        memory.add_ai_message(result["output"])
+        total = time.perf_counter() - start
+        llm, tool = callback.busy_seconds("llm"), callback.busy_seconds("tool")
+        samples["total"].append(total)
+        samples["llm"].append(llm)
+        samples["tool"].append(tool)
+        samples["overhead"].append(max(total - llm - tool, 0.0))
+    return memory
+
+
+def measure_memory_per_session(executor, scenarios: List[Dict[str, Any]], sessions: int) -> float:
+    """Canlı tutulan oturum hafızalarının oturum başına ayırdığı belleği (KB) ölçer."""
+    samples = {"total": [], "llm": [], "tool": [], "overhead": []}
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept = [run_session(executor, scenarios[i % len(scenarios)], samples) for i in range(sessions)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return used / sessions / 1024
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    scenarios = load_scenarios(args.scenarios)
+    llm = ScriptedChatModel(script=build_script(scenarios), latency=args.latency, jitter=args.jitter)
+    executor = build_agent_executor(llm=llm)
+
+    samples: Dict[str, List[float]] = {"total": [], "llm": [], "tool": [], "overhead": []}
+    # Isınma: import, önbellek ve şema oluşturma maliyetleri ölçüme girmesin
+    for scenario in scenarios:
+        run_session(executor, scenario, {"total": [], "llm": [], "tool": [], "overhead": []})
+
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        for scenario in scenarios:
+            run_session(executor, scenario, samples)
+    elapsed = time.perf_counter() - start
+
+    results: Dict[str, Any] = {
+        "turns": len(samples["total"]),
+        "turns_per_sec": round(len(samples["total"]) / elapsed, 1),
+        "memory_per_session_kb": round(measure_memory_per_session(executor, scenarios, len(scenarios) * 5), 1),
+    }
+    for kind, values in samples.items():
+        results[f"{kind}_p50_ms"] = round(percentile(values, 0.5) * 1000, 3)
+        results[f"{kind}_p99_ms"] = round(percentile(values, 0.99) * 1000, 3)
+    results["overhead_mean_ms"] = round(statistics.fmean(samples["overhead"]) * 1000, 3)
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for name, higher_is_better in COMPARED_METRICS.items():
+        old, new = baseline["results"].get(name), results.get(name)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        marker = "REGRESYON" if worse > tolerance else "ok"
+        print(f"  {name:24s} baseline={old:10.3f}  şimdi={new:10.3f}  ({change:+.1%})  {marker}")
+        if worse > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent turu çerçeve yükü benchmark'ı")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help="Senaryo JSON dosyası")
+    parser.add_argument("--sessions", type=int, default=30, help="Senaryo başına oturum sayısı")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simüle edilen LLM gecikmesi (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="LLM gecikmesine eklenen rastgele sapma (s)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON dosyası")
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--no-compare", action="store_true", help="Baseline ile karşılaştırma yapma")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="İzin verilen kötüleşme oranı (0.25 = %%25)")
+    args = parser.parse_args()
+    os.environ.setdefault("PROFILE_OUTBOX_PATH", ":memory:")  # Ölçüm data/ altındaki outbox'a yazmasın
+
+    # Araç logları ölçümü ve çıktıyı boğmasın
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run_benchmark(args)
+    print(f"{results['turns']} tur, simüle LLM gecikmesi {args.latency:.3f} s (+{args.jitter:.3f} s)")
+    print(f"Verim: {results['turns_per_sec']} tur/s, oturum başına bellek: {results['memory_per_session_kb']} KB")
+    print(f"{'':10s} {'p50 (ms)':>10s} {'p99 (ms)':>10s}")
+    for kind in ("total", "llm", "tool", "overhead"):
+        print(f"{kind:10s} {results[f'{kind}_p50_ms']:10.3f} {results[f'{kind}_p99_ms']:10.3f}")
+
+    regressions: List[str] = []
+    if not args.no_compare and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("latency") != args.latency:
+            print("Baseline farklı bir simüle gecikmeyle alınmış, karşılaştırma atlanıyor.")
+        else:
+            print(f"Baseline karşılaştırması ({baseline.get('created', '?')}):")
+            regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "latency": args.latency,
+                "sessions": args.sessions,
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"Baseline kaydedildi: {args.baseline}")
+
+    if regressions:
+        print(f"Baseline'a göre kötüleşen metrikler: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Türkçe tarih/saat normalleştirici benchmark'ı.
+
+İki ölçüm yapar:
+  1. dates.normalize_datetime çağrı başına süresi (soğuk: önbellek temizlenerek, sıcak: önbellekli).
+  2. Randevu turu başına ortalama agent iterasyonu (LLM çağrısı): eski araç ("yarın" ve
+     YYYY-MM-DD dışındaki her şeyi sessizce yarına / 09:00'a çeviren ayrıştırma) ile
+     ifadeleri araç içinde çözen yeni schedule_appointment karşılaştırılır.
+
+İkinci ölçümde politika tabanlı sahte model kullanılır: model kullanıcının ifadesini önce
+olduğu gibi araca iletir; araç sonucundaki tarih/saat beklenenden farklıysa (veya araç
+hata döndürürse) tarihi kendisi hesaplayıp YYYY-MM-DD / HH:MM ile yeniden dener. Beklenen
+değerler dates.py'den bağımsız, basit bir hesapla bulunur. Doğrudan yanıt şablonları
+kapatılır; aksi halde eski araçtaki yanlış tarihli randevu modele hiç görünmeden onaylanırdı.
+
+Kullanım:
+    python benchmarks/bench_dates.py
+    python benchmarks/bench_dates.py --iterations 20000
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+os.environ["DIRECT_ANSWERS"] = "0"
+
+from langchain.tools import StructuredTool  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+import appointments  # noqa: E402
+import dates  # noqa: E402
+from agent import build_agent_executor  # noqa: E402
+
+_MONTH_NAMES = ("ocak", "şubat", "mart", "nisan", "mayıs", "haziran",
+                "temmuz", "ağustos", "eylül", "ekim", "kasım", "aralık")
+
+
+def next_weekday(today: datetime.date, weekday: int) -> datetime.date:
+    """Bugünden sonraki ilk hafta günü (bugün hariç)."""
+    return today + datetime.timedelta(days=(weekday - today.weekday()) % 7 or 7)
+
+
+def build_cases(today: datetime.date) -> List[Dict[str, Any]]:
+    """Kullanıcı ifadesi ve bağımsız olarak hesaplanmış beklenen tarih/saat çiftleri."""
+    day = datetime.timedelta(days=1)
+    in_three_weeks = today + day * 20
+    month_text = f"{in_three_weeks.day} {_MONTH_NAMES[in_three_weeks.month - 1]}"
+    cases = [
+        ("Bakım", "yarın", "14:00", today + day, "14:00"),
+        ("Tamir", "önümüzdeki salı", "saat 2", next_weekday(today, 1), "14:00"),
+        ("Kurulum", "cuma", "öğleden sonra", next_weekday(today, 4), "14:00"),
+        ("Genel Servis", "3 gün sonra", "10:30", today + day * 3, "10:30"),
+        ("Bakım", "yarın öğleden sonra", None, today + day, "14:00"),
+        ("Tamir", (today + day * 5).isoformat(), "15:00", today + day * 5, "15:00"),
+        ("Kurulum", "öbür gün", "sabah 10", today + day * 2, "10:00"),
+        ("Genel Servis", "haftaya pazartesi", "11 buçuk", next_weekday(today, 0), "11:30"),
+        ("Bakım", month_text, "16:00", in_three_weeks, "16:00"),
+        ("Tamir", "perşembe", "16.00", next_weekday(today, 3), "16:00"),
+        ("Genel Servis", "pazar", "12:00", next_weekday(today, 6), "12:00"),
+        ("Kurulum", "yarın", None, today + day, "09:00"),
+        # Tarih verilmeden noktalı saat: tarih sanılmamalı, varsayılan gün (yarın) kullanılır
+        ("Bakım", None, "10.05", today + day, "10:05"),
+        ("Tamir", None, "09.12", today + day, "09:12"),
+    ]
+    return [
+        {"input": " ".join(part for part in (f"{service} için", date_text, time_text, "randevu istiyorum") if part),
+         "service_type": service, "date_text": date_text, "time_text": time_text,
+         "expected_date": expected_date.isoformat(), "expected_time": expected_time}
+        for service, date_text, time_text, expected_date, expected_time in cases
+    ]
+
+
+def legacy_schedule_appointment(service_type: Optional[str] = None,
+                                preferred_date: Optional[str] = None,
+                                preferred_time: Optional[str] = None) -> Dict[str, Any]:
+    """Servis randevusu oluşturur (dates.py öncesi tarih/saat ayrıştırması)."""
+    if not preferred_date or preferred_date.lower() == "yarın":
+        preferred_date = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        preferred_date = datetime.datetime.strptime(preferred_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        preferred_date = (datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        preferred_time = datetime.datetime.strptime((preferred_time or "").strip(), "%H:%M").strftime("%H:%M")
+    except ValueError:
+        preferred_time = "09:00"
+    booking = appointments.get_booking_engine().book(service_type, preferred_date, preferred_time)
+    if booking.success:
+        return {"success": True, **booking.appointment.to_dict()}
+    return {"success": False, "message": booking.reason, "alternatives": booking.alternatives}
+
+
+class PolicyChatModel(BaseChatModel):
+    """Önce ham ifadeyi gönderen, sonuç yanlışsa ISO tarihle yeniden deneyen sahte model."""
+
+    cases: Dict[str, Dict[str, Any]]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "policy-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        last_human = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        case = self.cases[messages[last_human].content]
+        tool_results = [m for m in messages[last_human + 1:] if isinstance(m, ToolMessage)]
+
+        if not tool_results:
+            args = {"service_type": case["service_type"]}
+            if case["date_text"]:
+                args["preferred_date"] = case["date_text"]
+            if case["time_text"]:
+                args["preferred_time"] = case["time_text"]
+            return self._tool_call(args, len(tool_results))
+
+        result = json.loads(tool_results[-1].content)
+        correct = (result.get("success") and result.get("date") == case["expected_date"]
+                   and result.get("time") == case["expected_time"])
+        if not correct and len(tool_results) == 1:
+            # Model tarihi kendisi hesaplayıp kesin biçimde yeniden dener
+            return self._tool_call({"service_type": case["service_type"],
+                                    "preferred_date": case["expected_date"],
+                                    "preferred_time": case["expected_time"]}, len(tool_results))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="Randevunuz oluşturuldu."))])
+
+    @staticmethod
+    def _tool_call(args: Dict[str, Any], step: int) -> ChatResult:
+        message = AIMessage(content="", tool_calls=[
+            {"name": "schedule_appointment", "args": args, "id": f"call_{step}"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def measure_normalizer(cases: List[Dict[str, Any]], iterations: int) -> Tuple[float, float]:
+    """normalize_datetime için (soğuk, sıcak) çağrı başına mikro saniye."""
+    pairs = [(case["date_text"], case["time_text"]) for case in cases]
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        dates._normalize_date.cache_clear()
+        dates._normalize_time.cache_clear()
+        date_text, time_text = pairs[i % len(pairs)]
+        dates.normalize_datetime(date_text, time_text)
+    cold = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        date_text, time_text = pairs[i % len(pairs)]
+        dates.normalize_datetime(date_text, time_text)
+    warm = (time.perf_counter() - start) / iterations * 1e6
+    return cold, warm
+
+
+def run_turns(executor, model: PolicyChatModel, cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Her randevu turunu boş bir takvimle çalıştırır; iterasyon ve ilk deneme isabetini sayar."""
+    iterations, first_try = [], 0
+    for case in cases:
+        appointments._engine = None  # Turlar birbirinin slotlarını doldurmasın
+        model.calls = 0
+        output = executor.invoke({"input": case["input"]})
+        iterations.append(model.calls)
+        first = output["intermediate_steps"][0][1]
+        if (isinstance(first, dict) and first.get("success") and first.get("date") == case["expected_date"]
+                and first.get("time") == case["expected_time"]):
+            first_try += 1
+    return {"avg_iterations": sum(iterations) / len(iterations), "first_try": first_try, "turns": len(cases)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tarih normalleştirici benchmark'ı")
+    parser.add_argument("--iterations", type=int, default=10000, help="Normalleştirici ölçümündeki çağrı sayısı")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    cases = build_cases(datetime.date.today())
+    cold, warm = measure_normalizer(cases, args.iterations)
+    print(f"normalize_datetime: soğuk {cold:.1f} µs/çağrı, önbellekli {warm:.2f} µs/çağrı")
+
+    model = PolicyChatModel(cases={case["input"]: case for case in cases})
+    executor = build_agent_executor(llm=model)
+    legacy_tool = StructuredTool.from_function(legacy_schedule_appointment, name="schedule_appointment")
+    legacy_executor = build_agent_executor(llm=model)
+    legacy_executor.tools = [legacy_tool if t.name == "schedule_appointment" else t for t in legacy_executor.tools]
+
+    results = {"eski": run_turns(legacy_executor, model, cases), "yeni": run_turns(executor, model, cases)}
+    for label, result in results.items():
+        print(f"{label:>4}: tur başına {result['avg_iterations']:.2f} LLM çağrısı, "
+              f"ilk denemede doğru randevu {result['first_try']}/{result['turns']}")
+    reduction = 1 - results["yeni"]["avg_iterations"] / results["eski"]["avg_iterations"]
+    print(f"Ortalama iterasyon azalması: %{reduction * 100:.0f}")
+    if results["yeni"]["first_try"] != results["yeni"]["turns"]:
+        print("HATA: yeni araç bazı ifadeleri ilk denemede yanlış tarih/saate çevirdi")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Giriş noktalarının soğuk başlangıç (içe aktarma) süresi benchmark'ı.
+
+Terminal (chatbot.py) ve Streamlit (app.py) giriş noktalarının modül düzeyindeki içe
+aktarmalarını her ölçümde yeni bir `python -X importtime` sürecinde çalıştırır ve
+yorumlayıcının kendi başlangıç modülleri dışındaki toplam süreyi raporlar. Streamlit'in
+kendi içe aktarma süresi projeye ait olmadığından ölçüme katılmaz. Ayrıca LLM yığınının
+ilk agent kurulumunda (ilk kullanımda) ödenen maliyeti ayrıca ölçülür.
+
+Sonuçlar bir baseline dosyasıyla karşılaştırılır; tolerans aşılırsa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 9 --save-baseline
+    python benchmarks/bench_import_time.py --top 15
+"""
+import argparse
+import ast
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "bench_import_time.json")
+DEFAULT_TOLERANCE = 0.25
+ENTRY_POINTS = {"chatbot": "chatbot.py", "app": "app.py"}
+# Ölçüme katılmayan üçüncü taraf arayüz çerçevesi
+EXCLUDED_MODULES = {"streamlit"}
+FIRST_BUILD_CODE = (
+    "import time; t = time.perf_counter(); from agent import build_agent_executor; "
+    "build_agent_executor('bench-key'); print((time.perf_counter() - t) * 1000)"
+)
+
+
+def entry_imports(path: str) -> List[str]:
+    """Dosyanın modül düzeyindeki içe aktarmalarının modül adları (sırasıyla)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return [m for m in dict.fromkeys(modules) if m.split(".")[0] not in EXCLUDED_MODULES]
+
+
+def run_importtime(code: str) -> List[Tuple[int, int, str]]:
+    """Kodu -X importtime ile çalıştırır; (kendi µs, kümülatif µs, girintili ad) satırları."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT_DIR,
+                            check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def startup_modules() -> set:
+    """Boş bir yorumlayıcının başlangıçta yüklediği üst düzey modüller."""
+    return {name.strip() for _, _, name in run_importtime("pass") if not name.startswith("  ")}
+
+
+def measure(code: str, startup: set) -> Tuple[float, List[Tuple[int, str]]]:
+    """Toplam içe aktarma süresi (ms) ve en pahalı üst düzey modüller."""
+    rows = run_importtime(code)
+    top_level = [(cumulative, name.strip()) for _, cumulative, name in rows
+                 if not name.startswith("  ") and name.strip() not in startup]
+    return sum(cumulative for cumulative, _ in top_level) / 1000, sorted(top_level, reverse=True)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = (new - old) / old
+        marker = "REGRESYON" if change > tolerance else "ok"
+        print(f"  {name:24s} baseline={old:10.1f}  şimdi={new:10.1f}  ({change:+.1%})  {marker}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giriş noktası soğuk başlangıç benchmark'ı")
+    parser.add_argument("--runs", type=int, default=5, help="Ölçüm başına süreç sayısı (medyan alınır)")
+    parser.add_argument("--top", type=int, default=8, help="Gösterilecek en pahalı modül sayısı")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON dosyası")
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    parser.add_argument("--no-compare", action="store_true", help="Baseline ile karşılaştırma yapma")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="İzin verilen kötüleşme oranı (0.25 = %%25)")
+    args = parser.parse_args()
+
+    startup = startup_modules()
+    results: Dict[str, float] = {}
+    for entry, filename in ENTRY_POINTS.items():
+        modules = entry_imports(os.path.join(ROOT_DIR, filename))
+        code = "; ".join(f"import {module}" for module in modules)
+        samples, heaviest = [], []
+        for _ in range(args.runs):
+            total_ms, heaviest = measure(code, startup)
+            samples.append(total_ms)
+        results[f"{entry}_import_ms"] = round(statistics.median(samples), 1)
+        print(f"{entry} ({filename}, {len(modules)} modül düzeyi içe aktarma): "
+              f"medyan {results[f'{entry}_import_ms']:.1f} ms")
+        for cumulative, name in heaviest[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+    # İlk agent kurulumu: LLM yığınının ilk kullanımda ödenen maliyeti (ağ çağrısı yapılmaz)
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, "-c", FIRST_BUILD_CODE], cwd=ROOT_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    results["first_agent_build_ms"] = round(statistics.median(samples), 1)
+    print(f"İlk agent kurulumu (LLM yığını dahil): medyan {results['first_agent_build_ms']:.1f} ms")
+
+    regressions: List[str] = []
+    if not args.no_compare and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Baseline karşılaştırması ({baseline.get('created', '?')}):")
+        regressions = compare(results, baseline["results"], args.tolerance)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "runs": args.runs,
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"Baseline kaydedildi: {args.baseline}")
+
+    if regressions:
+        print(f"Baseline'a göre kötüleşen metrikler: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
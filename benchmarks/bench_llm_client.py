@@ -0,0 +1,105 @@
+"""Dayanıklı LLM istemcisinin (llm_client.py) stub sunucuya karşı denenmesi.
+
+Üç senaryo çalıştırılır:
+  storm  : isteklerin bir kısmı 429 alır; korumasız ChatGroq ile LLMGuard karşılaştırılır
+  tail   : isteklerin bir kısmı yavaştır; hedge kapalı/açık p50/p99 karşılaştırılır
+  outage : tüm istekler 503 alır; devre kesicinin sunucuya giden yükü kesmesi gösterilir
+Ağ veya GROQ_API_KEY gerektirmez.
+
+Kullanım:
+    python benchmarks/bench_llm_client.py --calls 60 --concurrency 8
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_groq import ChatGroq  # noqa: E402
+
+from llm_client import DEGRADED_REPLY, CircuitBreaker, LLMGuard, RetryPolicy, create_chat_model  # noqa: E402
+from stub_groq_server import StubConfig, start_stub_server  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def drive(llm, calls: int, concurrency: int) -> Dict[str, Any]:
+    def one(i: int):
+        start = time.perf_counter()
+        try:
+            content = llm.invoke(f"Soru {i}").content
+            status = "degraded" if content == DEGRADED_REPLY else "ok"
+        except Exception:
+            status = "error"
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(calls)))
+    latencies = [latency for status, latency in results if status == "ok"]
+    return {
+        "ok": sum(1 for status, _ in results if status == "ok"),
+        "degraded": sum(1 for status, _ in results if status == "degraded"),
+        "error": sum(1 for status, _ in results if status == "error"),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "elapsed_s": round(time.perf_counter() - start, 2),
+    }
+
+
+def run_scenario(name: str, config: StubConfig, make_llm, calls: int, concurrency: int) -> None:
+    server = start_stub_server(config)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        result = drive(make_llm(base_url), calls, concurrency)
+    finally:
+        server.shutdown()
+    print(f"  {name:28s} {result}  sunucu={config.counts}")
+
+
+def guard(**kwargs) -> LLMGuard:
+    # Stub senaryolarında hız sınırı kapalı, geri çekilme kısa tutulur
+    kwargs.setdefault("retry", RetryPolicy(max_retries=4, base_delay=0.05, max_delay=0.5))
+    return LLMGuard(requests_per_minute=0, tokens_per_minute=0, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dayanıklı LLM istemcisi stub testi")
+    parser.add_argument("--calls", type=int, default=60, help="Senaryo başına LLM çağrısı")
+    parser.add_argument("--concurrency", type=int, default=8, help="Eşzamanlı çağrı sayısı")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    model = {"model": "llama3-8b-8192", "groq_api_key": "stub-key", "request_timeout": 10}
+
+    print("storm (429 oranı %40, Retry-After 0.2 s):")
+    run_scenario("korumasız ChatGroq", StubConfig(rate_limit=0.4, retry_after=0.2, seed=1),
+                 lambda url: ChatGroq(base_url=url, max_retries=0, **model), args.calls, args.concurrency)
+    run_scenario("LLMGuard", StubConfig(rate_limit=0.4, retry_after=0.2, seed=1),
+                 lambda url: create_chat_model(base_url=url, guard=guard(), **model), args.calls, args.concurrency)
+
+    print("tail (%10 istek 1.5 s gecikmeli):")
+    run_scenario("hedge kapalı", StubConfig(slow=0.1, slow_delay=1.5, seed=2),
+                 lambda url: create_chat_model(base_url=url, guard=guard(), **model), args.calls, args.concurrency)
+    run_scenario("hedge 0.3 s", StubConfig(slow=0.1, slow_delay=1.5, seed=2),
+                 lambda url: create_chat_model(base_url=url, guard=guard(hedge_after=0.3), **model),
+                 args.calls, args.concurrency)
+
+    print("outage (tüm istekler 503):")
+    run_scenario("LLMGuard + devre kesici", StubConfig(server_error=1.0, seed=3),
+                 lambda url: create_chat_model(
+                     base_url=url, guard=guard(breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30)),
+                     **model),
+                 args.calls, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
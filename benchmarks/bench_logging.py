@@ -0,0 +1,116 @@
+"""Araç loglarının istek thread'ine maliyeti: eski senkron loglama ve kuyruk tabanlı loglama.
+
+Araçların yaptığı "API Çağrısı" + "sonucu" log çiftini çok sayıda thread'den çağırır ve
+istek thread'inde geçen süreyi ve o thread'lerin kendi CPU süresini (time.thread_time) ölçer.
+Tek çekirdekte duvar saati süresi dinleyici thread'inin GIL'de geçirdiği zamanı da içerir;
+biçimlendirmenin istek thread'inden çıktığını CPU süresi gösterir:
+  - eski: basicConfig + FileHandler, f-string ile hevesli biçimlendirme, G/Ç çağıran thread'de
+  - yeni: log_setup.setup_logging (QueueHandler/QueueListener, JSON-lines, tembel %s)
+  - yeni + örnekleme: LOG_TOOL_SAMPLE_RATE=0.1
+Yeni çıktının her satırının geçerli JSON olduğu ve oturum/tur kimliği taşıdığı da doğrulanır.
+
+Kullanım:
+    python benchmarks/bench_logging.py --threads 8 --calls 5000
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+# Tipik bir randevu aracı sonucu
+RESULT = {
+    "success": True, "appointment_id": "APT01JABCDEFGHJKMNPQRSTVWXYZ", "service_type": "Bakım",
+    "date": "2030-01-07", "time": "14:00", "end_time": "15:00",
+    "message": "2030-01-07 tarihinde saat 14:00 için Bakım randevunuz oluşturulmuştur.",
+}
+
+
+def run_worker_load(mode: str, threads: int, calls: int, log_path: str) -> Tuple[float, float]:
+    """Seçilen loglama düzeniyle yükü çalıştırır; çağrı başına istek thread'i süresini ve CPU
+    süresini (µs) döndürür."""
+    if mode == "eski":
+        logging.basicConfig(level=logging.INFO, filename=log_path,
+                            format="%(asctime)s - %(levelname)s - %(message)s")
+        logger = logging.getLogger()
+    else:
+        from log_setup import TOOL_LOGGER, setup_logging
+        setup_logging(log_file=log_path, tool_sample_rate=0.1 if mode == "yeni+örnekleme" else 1.0)
+        logger = logging.getLogger(TOOL_LOGGER)
+    from log_setup import log_context
+
+    barrier = threading.Barrier(threads)
+    elapsed = [0.0] * threads
+    cpu = [0.0] * threads
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        for i in range(calls):
+            with log_context(session_id=f"s{index}", turn_id=f"t{index}-{i}"):
+                if mode == "eski":
+                    logger.info(f"--- API Çağrısı: schedule_appointment(service_type={RESULT['service_type']}, "
+                                f"preferred_date={RESULT['date']}, preferred_time={RESULT['time']}) ---")
+                    logger.info(f"schedule_appointment sonucu: {RESULT}")
+                else:
+                    logger.info("--- API Çağrısı: schedule_appointment(service_type=%s, preferred_date=%s, "
+                                "preferred_time=%s) ---", RESULT["service_type"], RESULT["date"], RESULT["time"])
+                    logger.info("schedule_appointment sonucu: %s", RESULT)
+        elapsed[index] = time.perf_counter() - start
+        cpu[index] = time.thread_time() - cpu_start
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    if mode != "eski":
+        from log_setup import shutdown_logging
+        shutdown_logging()
+    return sum(elapsed) / (threads * calls) * 1e6, sum(cpu) / (threads * calls) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loglama benchmark'ı")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=5000, help="Thread başına araç çağrısı")
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--log-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Her düzen kök logger yapılandırması karışmasın diye ayrı süreçte çalışır
+        print(*run_worker_load(args.mode, args.threads, args.calls, args.log_path))
+        return
+
+    total = args.threads * args.calls
+    print(f"{args.threads} thread x {args.calls} araç çağrısı (çağrı başına 2 log kaydı)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, mode in enumerate(("eski", "yeni", "yeni+örnekleme")):
+            log_path = os.path.join(tmp, f"{index}.log")
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--log-path", log_path,
+                 "--threads", str(args.threads), "--calls", str(args.calls)],
+                check=True, capture_output=True, text=True).stdout
+            per_call, cpu_per_call = map(float, output.strip().splitlines()[-1].split())
+            with open(log_path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            note = ""
+            if mode != "eski":
+                records = [json.loads(line) for line in lines]
+                missing = sum(1 for r in records if not r.get("session_id") or not r.get("turn_id"))
+                note = f", geçersiz/kimliksiz satır: {missing}"
+            print(f"  {mode:<15} istek thread'i {per_call:6.1f} µs/çağrı (CPU {cpu_per_call:5.1f} µs), "
+                  f"yazılan satır {len(lines)}/{total * 2}{note}")
+
+
+if __name__ == "__main__":
+    main()
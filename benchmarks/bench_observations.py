@@ -0,0 +1,141 @@
+"""Araç sonucu sıkıştırma (observations.py) prompt token benchmark'ı.
+
+benchmarks/scenarios.json senaryoları (ve birkaç ek büyük sonuçlu tur) agent.build_agent_executor
+ile kurulan gerçek agent düzeninde, senaryo tabanlı sahte modelle iki kez çalıştırılır:
+sıkıştırma kapalı (araç sonucu olduğu gibi JSON) ve açık. Modele giden her çağrının prompt
+token'ları memory.count_tokens ile sayılır; tur başına toplam ve yalnızca araç mesajları
+(ToolMessage) raporlanır. Nihai yanıtların iki çalıştırmada aynı olduğu da doğrulanır.
+
+Doğrudan yanıtlar (direct_answer.py) tek araçlı turlarda ikinci LLM çağrısını atladığından
+araç sonucu modele hiç gitmez; bu yüzden ölçüm varsayılan olarak DIRECT_ANSWERS=0 ile yapılır
+(--direct-answers ile açılır). Randevu numaraları her çalıştırmada yeni üretildiğinden
+karşılaştırmada ULID'ler maskelenir. Ağ veya GROQ_API_KEY gerektirmez.
+
+Kullanım:
+    python benchmarks/bench_observations.py
+    python benchmarks/bench_observations.py --direct-answers
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from langchain_core.callbacks import BaseCallbackHandler  # noqa: E402
+from langchain_core.messages import ToolMessage  # noqa: E402
+
+from memory import ConversationMemory, count_tokens  # noqa: E402
+from scripted_llm import ScriptedChatModel, build_script, load_scenarios  # noqa: E402
+
+DEFAULT_SCENARIOS = os.path.join(BENCH_DIR, "scenarios.json")
+_ULID_RE = re.compile(r"[0-9A-Z]{26,}")
+
+# scenarios.json'da bulunmayan, büyük veya hatalı sonuç üreten turlar
+EXTRA_SCENARIOS: List[Dict[str, Any]] = [
+    {"name": "many_orders", "turns": [{
+        "input": "Şu siparişlerimin hepsine bakar mısın: 123456, 867530, 111111, 222222, 333333, 444444",
+        "responses": [{"tool_calls": [{"name": "get_order_statuses", "args": {
+            "order_ids": ["123456", "867530", "111111", "222222", "333333", "444444"]}}]},
+            {"content": "İki siparişiniz bulundu, diğerleri sistemde kayıtlı değil."}]}]},
+    {"name": "store_without_location", "turns": [{
+        "input": "Bana en yakın mağaza nerede?",
+        "responses": [{"tool_calls": [{"name": "find_nearest_store", "args": {"location": "current location"}}]},
+                      {"content": "Hangi şehirde olduğunuzu söyler misiniz?"}]}]},
+    {"name": "store_not_found", "turns": [{
+        "input": "Trabzon'da mağazanız var mı?",
+        "responses": [{"tool_calls": [{"name": "find_nearest_store", "args": {"location": "Trabzon"}}]},
+                      {"content": "Maalesef Trabzon'da mağazamız yok."}]}]},
+]
+
+
+class PromptTokenCounter(BaseCallbackHandler):
+    """Modele giden her çağrının toplam ve araç mesajı token'larını toplar."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prompt_tokens = 0
+        self.tool_tokens = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        with self._lock:
+            for batch in messages:
+                for message in batch:
+                    tokens = count_tokens(str(message.content))
+                    self.prompt_tokens += tokens
+                    if isinstance(message, ToolMessage):
+                        self.tool_tokens += tokens
+
+
+def run(compact: bool, scenarios: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Senaryoları çalıştırır; senaryo başına token sayıları ve yanıtlar."""
+    import appointments
+    from agent import build_agent_executor
+
+    appointments._engine = None  # İki çalıştırma aynı boş takvimle başlasın
+    os.environ["COMPACT_OBSERVATIONS"] = "1" if compact else "0"
+    executor = build_agent_executor(llm=ScriptedChatModel(script=build_script(scenarios)))
+    results = {}
+    for scenario in scenarios:
+        memory, counter, outputs = ConversationMemory(), PromptTokenCounter(), []
+        for turn in scenario["turns"]:
+            result = executor.invoke({"input": turn["input"], "chat_history": memory.messages()},
+                                     config={"callbacks": [counter]})
+            memory.add_user_message(turn["input"])
+            memory.add_ai_message(result["output"])
+            outputs.append(_ULID_RE.sub("<id>", result["output"]))
+        results[scenario["name"]] = {"turns": len(scenario["turns"]), "prompt": counter.prompt_tokens,
+                                     "tool": counter.tool_tokens, "outputs": outputs}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Araç sonucu sıkıştırma prompt token benchmark'ı")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help="Senaryo JSON dosyası")
+    parser.add_argument("--direct-answers", action="store_true", help="Doğrudan yanıtları açık bırak")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    os.environ["DIRECT_ANSWERS"] = "1" if args.direct_answers else "0"
+    os.environ.setdefault("PROFILE_OUTBOX_PATH", ":memory:")  # Ölçüm data/ altındaki outbox'a yazmasın
+
+    scenarios = load_scenarios(args.scenarios) + EXTRA_SCENARIOS
+    full, compact = run(False, scenarios), run(True, scenarios)
+
+    print(f"{'senaryo':24s} {'tur':>4s} {'prompt (tam)':>13s} {'prompt (kısa)':>14s} "
+          f"{'araç (tam)':>11s} {'araç (kısa)':>12s} {'tur başına tasarruf':>20s}")
+    totals = {"turns": 0, "full": 0, "compact": 0, "tool_full": 0, "tool_compact": 0}
+    mismatched = []
+    for name, before in full.items():
+        after = compact[name]
+        if before["outputs"] != after["outputs"]:
+            mismatched.append(name)
+        saved = (before["prompt"] - after["prompt"]) / before["turns"]
+        print(f"{name:24s} {before['turns']:4d} {before['prompt']:13d} {after['prompt']:14d} "
+              f"{before['tool']:11d} {after['tool']:12d} {saved:20.1f}")
+        totals["turns"] += before["turns"]
+        totals["full"] += before["prompt"]
+        totals["compact"] += after["prompt"]
+        totals["tool_full"] += before["tool"]
+        totals["tool_compact"] += after["tool"]
+
+    saved = totals["full"] - totals["compact"]
+    tool_saved = totals["tool_full"] - totals["tool_compact"]
+    print(f"Toplam: {totals['turns']} tur, tur başına ortalama {saved / totals['turns']:.1f} prompt token "
+          f"tasarrufu (%{saved / totals['full'] * 100:.1f}); araç mesajlarında "
+          f"%{tool_saved / max(totals['tool_full'], 1) * 100:.1f} azalma")
+    print(json.dumps({"prompt_tokens_saved_per_turn": round(saved / totals["turns"], 1)}))
+    if mismatched:
+        print(f"HATA: sıkıştırma nihai yanıtları değiştirdi: {', '.join(mismatched)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""SQLite sipariş deposu gecikme benchmark'ı.
+
+Yerel bir veritabanını (varsayılan 1.000.000 sipariş) bir kez doldurur, ardından
+tekil ve toplu sorguların p50/p99 gecikmesini tek ve çok thread'li olarak ölçer.
+
+Kullanım:
+    python benchmarks/bench_order_repository.py --db /tmp/orders_bench.db --orders 1000000
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_repository import SQLiteOrderRepository  # noqa: E402
+
+STATUSES = ["Hazırlanıyor", "Kargoya Verildi", "Teslim Edildi", "İptal Edildi"]
+
+
+def generate_orders(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    base = datetime.date(2025, 1, 1)
+    for i in range(count):
+        status = rng.choice(STATUSES)
+        delivery = (base + datetime.timedelta(days=rng.randrange(365))).isoformat()
+        tracking = f"TR{i:09d}" if status == "Kargoya Verildi" else None
+        yield (f"{100000 + i}", status, delivery, tracking)
+
+
+def percentiles(durations_ms):
+    durations_ms = sorted(durations_ms)
+    return durations_ms[len(durations_ms) // 2], durations_ms[int(len(durations_ms) * 0.99) - 1]
+
+
+def measure(func, args_list):
+    durations = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def report(name, durations):
+    p50, p99 = percentiles(durations)
+    print(f"{name:<42} p50={p50 * 1000:8.1f} µs  p99={p99 * 1000:8.1f} µs  (n={len(durations)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite sipariş deposu benchmark'ı")
+    parser.add_argument("--db", default="/tmp/orders_bench.db", help="Veritabanı dosyası")
+    parser.add_argument("--orders", type=int, default=1_000_000, help="Doldurulacak sipariş sayısı")
+    parser.add_argument("--queries", type=int, default=20000, help="Ölçüm başına sorgu sayısı")
+    parser.add_argument("--threads", type=int, default=8, help="Eşzamanlı ölçümde thread sayısı")
+    args = parser.parse_args()
+
+    repo = SQLiteOrderRepository(args.db, pool_size=args.threads)
+    with repo.pool.connection() as conn:
+        existing = conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+    if existing < args.orders:
+        start = time.perf_counter()
+        written = repo.upsert_many(generate_orders(args.orders))
+        print(f"{written} sipariş yazıldı: {time.perf_counter() - start:.1f} s")
+    else:
+        print(f"Veritabanında zaten {existing} sipariş var, doldurma atlandı.")
+
+    rng = random.Random(3)
+    def random_id():
+        # %10 bulunamayan sipariş
+        if rng.random() < 0.1:
+            return f"{900000000 + rng.randrange(1000)}"
+        return f"{100000 + rng.randrange(args.orders)}"
+
+    report("get (tek thread)", measure(repo.get, [(random_id(),) for _ in range(args.queries)]))
+    report("get_many x2 (tek thread)",
+           measure(repo.get_many, [([random_id(), random_id()],) for _ in range(args.queries)]))
+    report("get_many x10 (tek thread)",
+           measure(repo.get_many, [([random_id() for _ in range(10)],) for _ in range(args.queries // 2)]))
+    # Toplu sorgunun tekil sorgu döngüsüne göre kazancı
+    report("get döngüsü x10 (tek thread)",
+           measure(lambda ids: [repo.get(i) for i in ids],
+                   [([random_id() for _ in range(10)],) for _ in range(args.queries // 2)]))
+
+    ids = [random_id() for _ in range(args.queries)]
+    def timed_get(order_id):
+        start = time.perf_counter()
+        repo.get(order_id)
+        return (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        durations = list(pool.map(timed_get, ids))
+    elapsed = time.perf_counter() - start
+    report(f"get ({args.threads} thread)", durations)
+    print(f"Eşzamanlı verim: {len(ids) / elapsed:,.0f} sorgu/s")
+
+
+if __name__ == "__main__":
+    main()
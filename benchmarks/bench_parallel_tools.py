@@ -0,0 +1,100 @@
+"""Eşzamanlı araç çalıştırma benchmark'ı.
+
+Tek turda birden fazla araç çağrısı üreten sahte bir model ve yapay olarak yavaşlatılmış
+mock araçlarla, standart AgentExecutor ile ParallelAgentExecutor'ın duvar saati
+sürelerini karşılaştırır. Ağ veya GROQ_API_KEY gerektirmez.
+
+Kullanım:
+    python benchmarks/bench_parallel_tools.py --tools 3 --delay 0.3 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, ToolMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder  # noqa: E402
+from langchain_core.tools import StructuredTool  # noqa: E402
+
+from parallel_executor import ParallelAgentExecutor  # noqa: E402
+
+
+class MultiToolCallModel(BaseChatModel):
+    """İlk turda tüm araçları birlikte çağıran, araç sonuçlarını görünce yanıt veren sahte model."""
+
+    tool_names: List[str]
+
+    @property
+    def _llm_type(self) -> str:
+        return "multi-tool-call-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if any(isinstance(message, ToolMessage) for message in messages):
+            message = AIMessage(content="Tüm sonuçlar hazır.")
+        else:
+            message = AIMessage(content="", tool_calls=[
+                {"name": name, "args": {"query": str(i)}, "id": f"call_{i}"}
+                for i, name in enumerate(self.tool_names)
+            ])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def make_slow_tool(name: str, delay: float) -> StructuredTool:
+    def slow_lookup(query: str) -> dict:
+        time.sleep(delay)
+        return {"tool": name, "query": query}
+    return StructuredTool.from_function(slow_lookup, name=name, description=f"{name} yavaş mock araç")
+
+
+def build_executor(executor_cls, tools, **kwargs):
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "Benchmark"),
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    llm = MultiToolCallModel(tool_names=[tool.name for tool in tools])
+    agent = create_tool_calling_agent(llm, tools, prompt)
+    return executor_cls(agent=agent, tools=tools, return_intermediate_steps=True, **kwargs)
+
+
+def run(executor, runs: int):
+    durations = []
+    order = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = executor.invoke({"input": "hepsini sorgula"})
+        durations.append(time.perf_counter() - start)
+        order = [action.tool for action, _ in result["intermediate_steps"]]
+    return durations, order
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eşzamanlı araç çalıştırma benchmark'ı")
+    parser.add_argument("--tools", type=int, default=3, help="Tek turdaki araç çağrısı sayısı")
+    parser.add_argument("--delay", type=float, default=0.3, help="Her aracın yapay gecikmesi (s)")
+    parser.add_argument("--runs", type=int, default=5, help="Tekrar sayısı")
+    args = parser.parse_args()
+
+    tools = [make_slow_tool(f"slow_tool_{i}", args.delay) for i in range(args.tools)]
+    sequential, seq_order = run(build_executor(AgentExecutor, tools), args.runs)
+    parallel, par_order = run(build_executor(ParallelAgentExecutor, tools, max_tool_workers=args.tools), args.runs)
+
+    seq_mean, par_mean = statistics.fmean(sequential), statistics.fmean(parallel)
+    print(f"{args.tools} araç x {args.delay:.2f} s gecikme, {args.runs} tekrar")
+    print(f"AgentExecutor (sıralı):        ort={seq_mean * 1000:8.1f} ms")
+    print(f"ParallelAgentExecutor:         ort={par_mean * 1000:8.1f} ms")
+    print(f"Hızlanma: {seq_mean / par_mean:.2f}x, sonuç sırası aynı: {seq_order == par_order}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Profil güncelleme outbox'ı (profile_outbox.py) benchmark'ı.
+
+Üç ölçüm yapar (ağ gerektirmez; CRM, gecikmesi ayarlanabilen sahte bir fonksiyondur):
+  1. update_user_email araç gecikmesi: CRM'i tur içinde eşzamanlı çağıran eski akış ile
+     güncellemeyi kuyruğa ekleyip hemen dönen yeni akış (p50/p99).
+  2. Birleştirme: her kullanıcı kısa sürede birkaç kez düzeltme yaptığında CRM'e giden çağrı
+     sayısı ve CRM'de kalan değerin her kullanıcı için son değer olduğu.
+  3. Yeniden deneme: CRM çağrılarının bir kısmı hata verdiğinde tüm güncellemelerin sonunda
+     gönderildiği.
+Bir değişmez bozulursa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/bench_profile_outbox.py
+    python benchmarks/bench_profile_outbox.py --crm-latency 0.3 --users 100 --corrections 4
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools  # noqa: E402
+from log_setup import log_context  # noqa: E402
+from profile_outbox import FAILED, SENT, ProfileOutbox  # noqa: E402
+
+
+class FakeCRM:
+    """Gecikmeli ve isteğe bağlı olarak hata veren sahte CRM."""
+
+    def __init__(self, latency: float, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.values: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def send(self, user_id: str, field: str, value: str) -> None:
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if random.random() < self.failure_rate:
+                raise ConnectionError("CRM 503")
+            self.values[user_id] = value
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def wait_until(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def measure_latency(crm_latency: float, calls: int) -> Dict[str, float]:
+    crm = FakeCRM(crm_latency)
+    legacy, queued = [], []
+    for i in range(calls):
+        start = time.perf_counter()
+        email = f"kullanici{i}@example.com"
+        if tools.validate_email(email):
+            crm.send(f"u{i}", "email", email)  # Eski akış: CRM tur içinde beklenir
+        legacy.append(time.perf_counter() - start)
+
+        with log_context(session_id=f"u{i}"):
+            start = time.perf_counter()
+            tools.update_user_email(email)
+            queued.append(time.perf_counter() - start)
+    return {"legacy_p50_ms": statistics.median(legacy) * 1000, "legacy_p99_ms": percentile(legacy, 0.99) * 1000,
+            "queued_p50_ms": statistics.median(queued) * 1000, "queued_p99_ms": percentile(queued, 0.99) * 1000}
+
+
+def run_outbox(users: int, corrections: int, crm: FakeCRM, retry_base_delay: float) -> ProfileOutbox:
+    outbox = ProfileOutbox(":memory:", sender=crm.send, flush_interval=0.2, retry_base_delay=retry_base_delay)
+    for round_ in range(corrections):
+        for user in range(users):
+            outbox.submit(f"u{user}", "email", f"deneme{round_}.u{user}@example.com")
+    return outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil güncelleme outbox benchmark'ı")
+    parser.add_argument("--crm-latency", type=float, default=0.2, help="Sahte CRM çağrı gecikmesi (s)")
+    parser.add_argument("--calls", type=int, default=20, help="Gecikme ölçümündeki araç çağrısı sayısı")
+    parser.add_argument("--users", type=int, default=50, help="Birleştirme ölçümündeki kullanıcı sayısı")
+    parser.add_argument("--corrections", type=int, default=3, help="Kullanıcı başına ardışık düzeltme")
+    parser.add_argument("--failure-rate", type=float, default=0.3, help="Yeniden deneme ölçümünde CRM hata oranı")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    os.environ.setdefault("CRM_LATENCY", str(args.crm_latency))
+    os.environ.setdefault("PROFILE_OUTBOX_PATH", ":memory:")  # Ölçüm data/ altındaki outbox'a yazmasın
+    errors = []
+
+    latency = measure_latency(args.crm_latency, args.calls)
+    print(f"update_user_email gecikmesi (CRM {args.crm_latency * 1000:.0f} ms): "
+          f"eski p50 {latency['legacy_p50_ms']:.1f} ms / p99 {latency['legacy_p99_ms']:.1f} ms, "
+          f"kuyruklu p50 {latency['queued_p50_ms']:.3f} ms / p99 {latency['queued_p99_ms']:.3f} ms")
+
+    crm = FakeCRM(latency=0.001)
+    outbox = run_outbox(args.users, args.corrections, crm, retry_base_delay=0.05)
+    done = wait_until(lambda: outbox.stats["sent"] >= args.users, timeout=30)
+    submitted = args.users * args.corrections
+    print(f"Birleştirme: {submitted} güncelleme -> {crm.calls} CRM çağrısı "
+          f"(birleştirilen {outbox.stats['coalesced']})")
+    final = {f"u{user}": f"deneme{args.corrections - 1}.u{user}@example.com" for user in range(args.users)}
+    if not done or crm.values != final:
+        errors.append("CRM'deki değerler her kullanıcının son düzeltmesi değil")
+    outbox.close()
+
+    crm = FakeCRM(latency=0.001, failure_rate=args.failure_rate)
+    outbox = run_outbox(args.users, 1, crm, retry_base_delay=0.05)
+    done = wait_until(lambda: outbox.stats["sent"] + outbox.stats["failed"] >= args.users, timeout=60)
+    statuses = [outbox.status(f"u{user}", "email")["status"] for user in range(args.users)]
+    print(f"Yeniden deneme (%{args.failure_rate * 100:.0f} hata): {statuses.count(SENT)}/{args.users} gönderildi, "
+          f"{outbox.stats['retried']} yeniden deneme, {statuses.count(FAILED)} kalıcı hata")
+    if not done or statuses.count(SENT) + statuses.count(FAILED) != args.users:
+        errors.append("Yeniden deneme sonunda bekleyen güncellemeler kaldı")
+    outbox.close()
+
+    if errors:
+        for error in errors:
+            print(f"HATA: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Oturum deposu tur maliyeti benchmark'ı.
+
+Streamlit arayüzünün bir turda yaptığı geçmiş işini, konuşma uzunluğu arttıkça ölçer:
+  - eski: st.session_state.messages listesinin tamamı yeniden çizilir (burada yalnızca
+    dolaşılır) ve session_state'teki hafızaya tur eklenir.
+  - depo: son sayfa okunur, önbellekteki hafızadan chat_history alınır ve tur eklenir
+    (session_store.py; bellek içi ve WAL modunda SQLite arka uçları).
+Streamlit olmadan çizim maliyeti ölçülemediğinden turda çizilen mesaj sayısı ayrıca
+raporlanır; gerçek arayüzde her mesaj ayrı bir st.chat_message/st.markdown çağrısıdır.
+Ayrıca yeniden başlatma sonrası bir oturumun ilk kez açılma (hafızanın depodan kurulması)
+süresi raporlanır. Ağ veya GROQ_API_KEY gerektirmez.
+
+Kullanım:
+    python benchmarks/bench_session_store.py
+    python benchmarks/bench_session_store.py --lengths 10 100 1000 5000 --turns 200
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory import ConversationMemory  # noqa: E402
+from session_store import (DEFAULT_PAGE_SIZE, InMemorySessionStore, SessionStore,  # noqa: E402
+                           SQLiteSessionStore)
+
+USER_TEXT = "Merhaba, 867530 numaralı siparişimin durumu nedir? Ankara'da mağazanız var mı?"
+AI_TEXT = "Siparişiniz kargoya verildi, takip numarası TR123456789. Ankara Kızılay şubemiz açıktır."
+
+
+def legacy_turn(messages: List[Dict[str, str]], memory: ConversationMemory) -> int:
+    """Depo öncesi tur: tüm geçmiş çizilir; çizilen mesaj sayısını döndürür."""
+    for message in messages:
+        _ = message["role"], message["content"]
+    memory.messages()
+    messages.append({"role": "user", "content": USER_TEXT})
+    messages.append({"role": "assistant", "content": AI_TEXT})
+    memory.add_user_message(USER_TEXT)
+    memory.add_ai_message(AI_TEXT)
+    return len(messages) - 2
+
+
+def store_turn(store: SessionStore, session_id: str) -> int:
+    history = store.page(session_id, limit=DEFAULT_PAGE_SIZE + 1)[-DEFAULT_PAGE_SIZE:]
+    for message in history:
+        _ = message.role, message.content
+    store.memory(session_id).messages()
+    store.append_turn(session_id, USER_TEXT, AI_TEXT)
+    return len(history)
+
+
+def fill(store: SessionStore, session_id: str, length: int) -> None:
+    for _ in range(length // 2):
+        store.append_turn(session_id, USER_TEXT, AI_TEXT)
+
+
+def measure(turn: Callable[[], int], turns: int) -> Tuple[float, int]:
+    """Tur başına medyan süre (µs) ve son turda çizilen mesaj sayısı."""
+    samples, rendered = [], 0
+    for _ in range(turns):
+        start = time.perf_counter()
+        rendered = turn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6, rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oturum deposu tur maliyeti benchmark'ı")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 5000],
+                        help="Ölçüm öncesi konuşmadaki mesaj sayıları")
+    parser.add_argument("--turns", type=int, default=100, help="Uzunluk başına ölçülen tur sayısı")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, "sessions.db")
+        sqlite_store = SQLiteSessionStore(database_path)
+        stores = {"bellek": InMemorySessionStore(), "sqlite": sqlite_store}
+
+        print(f"{'mesaj':>7s} {'eski (µs)':>10s} {'çizilen':>8s} {'bellek (µs)':>12s} {'sqlite (µs)':>12s} "
+              f"{'çizilen':>8s} {'sqlite açılış (ms)':>19s}")
+        for length in args.lengths:
+            session_id = f"oturum-{length}"
+            legacy = [{"role": "user" if i % 2 == 0 else "assistant",
+                       "content": USER_TEXT if i % 2 == 0 else AI_TEXT} for i in range(length)]
+            legacy_memory = ConversationMemory()
+            for message in legacy:
+                if message["role"] == "user":
+                    legacy_memory.add_user_message(message["content"])
+                else:
+                    legacy_memory.add_ai_message(message["content"])
+            legacy_us, legacy_rendered = measure(lambda: legacy_turn(legacy, legacy_memory), args.turns)
+            row = []
+            for store in stores.values():
+                fill(store, session_id, length)
+                store.memory(session_id)  # Isınma: hafıza oturum başına bir kez kurulur
+                row.append(measure(lambda: store_turn(store, session_id), args.turns))
+
+            # Yeniden başlatma: yeni bir süreçteki gibi boş önbellekle oturumu ilk kez aç
+            reopened = SQLiteSessionStore(database_path)
+            start = time.perf_counter()
+            reopened.page(session_id, limit=DEFAULT_PAGE_SIZE + 1)
+            reopened.memory(session_id).messages()
+            cold_ms = (time.perf_counter() - start) * 1000
+            reopened.pool.close()
+            print(f"{length:7d} {legacy_us:10.1f} {legacy_rendered:8d} {row[0][0]:12.1f} {row[1][0]:12.1f} "
+                  f"{row[1][1]:8d} {cold_ms:19.2f}")
+        sqlite_store.pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Mağaza indeksi mikro-benchmark'ı.
+
+Gerçek veri dosyası ve sentetik olarak üretilen 10.000 mağazalık indeks üzerinde
+konum çözümleme ve en yakın k mağaza sorgularının süresini ölçer.
+
+Kullanım:
+    python benchmarks/bench_store_index.py --stores 10000 --queries 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store_index import Place, Store, StoreIndex, get_store_index  # noqa: E402
+
+# Türkiye'yi kabaca kapsayan sınırlar
+LAT_RANGE = (36.0, 42.0)
+LON_RANGE = (26.0, 45.0)
+
+
+def build_synthetic_index(store_count: int, seed: int = 42) -> StoreIndex:
+    rng = random.Random(seed)
+    places = []
+    stores = []
+    for i in range(store_count):
+        lat, lon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+        district = f"Semt {i}"
+        places.append((Place(district, "district", "Sentetik", lat, lon), [f"semt{i}"]))
+        stores.append(Store(f"S-{i:05d}", f"Mağaza {i}", "Sentetik", district,
+                            f"Adres {i}", "0000 000 0000", "09:00-21:00", lat, lon))
+    return StoreIndex(places, stores)
+
+
+def time_calls(func, args_list):
+    durations = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        durations.append((time.perf_counter() - start) * 1e6)
+    durations.sort()
+    return {
+        "mean_us": statistics.fmean(durations),
+        "p50_us": durations[len(durations) // 2],
+        "p99_us": durations[int(len(durations) * 0.99) - 1],
+    }
+
+
+def report(name, stats):
+    print(f"{name:<40} ort={stats['mean_us']:8.1f} µs  p50={stats['p50_us']:8.1f} µs  p99={stats['p99_us']:8.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mağaza indeksi mikro-benchmark'ı")
+    parser.add_argument("--stores", type=int, default=10000, help="Sentetik mağaza sayısı")
+    parser.add_argument("--queries", type=int, default=20000, help="Sorgu sayısı")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+
+    start = time.perf_counter()
+    real_index = get_store_index()
+    print(f"Gerçek veri yüklendi: {len(real_index.stores)} mağaza, {(time.perf_counter() - start) * 1000:.2f} ms")
+    locations = ["Ankara", "Kadıköy'de", "izmir bornova", "KIZILAY", "Bursa Nilüfer", "Lara", "Trabzon"]
+    report("resolve_location (gerçek veri)",
+           time_calls(real_index.resolve_location, [(rng.choice(locations),) for _ in range(args.queries)]))
+    report("find_nearest k=3 (gerçek veri)",
+           time_calls(lambda loc: real_index.find_nearest(loc, k=3), [(rng.choice(locations),) for _ in range(args.queries)]))
+
+    start = time.perf_counter()
+    index = build_synthetic_index(args.stores)
+    print(f"Sentetik indeks kuruldu: {args.stores} mağaza, {(time.perf_counter() - start) * 1000:.1f} ms")
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.queries)]
+    report(f"resolve_location ({args.stores} ad)",
+           time_calls(index.resolve_location, [(f"Semt {rng.randrange(args.stores)}'de",) for _ in range(args.queries)]))
+    report(f"nearest k=1 ({args.stores} mağaza)", time_calls(lambda lat, lon: index.nearest(lat, lon, 1), points))
+    report(f"nearest k=5 ({args.stores} mağaza)", time_calls(lambda lat, lon: index.nearest(lat, lon, 5), points))
+
+
+if __name__ == "__main__":
+    main()
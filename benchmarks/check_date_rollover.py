@@ -0,0 +1,110 @@
+"""Gece yarısı tarih geçişi kontrolü.
+
+agent.build_agent_executor ile bir kez kurulan executor, dondurulmuş bir saatle gece
+yarısının iki yanında çalıştırılır. Modele giden mesajlar yakalanır ve şu değişmezler
+doğrulanır; biri bozulursa çıkış kodu 1 olur:
+  - sabit talimat öneki (ilk sistem mesajı) iki gün arasında bayt bazında aynıdır
+  - tarih bloğu executor yeniden kurulmadan yeni günün bugün/yarın/hafta günü tarihlerini içerir
+  - tarih bloğu gün başına yalnızca bir kez hesaplanır
+Ağ veya GROQ_API_KEY gerektirmez.
+
+Kullanım:
+    python benchmarks/check_date_rollover.py
+"""
+import datetime
+import logging
+import os
+import sys
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+import prompts  # noqa: E402
+from agent import build_agent_executor  # noqa: E402
+
+
+class FrozenClock:
+    """Elle ilerletilen saat."""
+
+    def __init__(self, now: datetime.datetime):
+        self.now = now
+
+    def advance(self, **kwargs: Any) -> None:
+        self.now += datetime.timedelta(**kwargs)
+
+    def today(self) -> datetime.date:
+        return self.now.date()
+
+
+class CapturingChatModel(BaseChatModel):
+    """Aldığı mesajları kaydeden ve doğrudan yanıt veren sahte model."""
+
+    captured: List[List[BaseMessage]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "capturing-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        self.captured.append(list(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="Tamam."))])
+
+
+def system_messages(messages: List[BaseMessage]) -> List[str]:
+    return [m.content for m in messages if isinstance(m, SystemMessage)]
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    # 2030-01-06 bir pazar; gece yarısından sonra pazartesi ve "bu hafta" tablosu değişir
+    clock = FrozenClock(datetime.datetime(2030, 1, 6, 23, 59, 58))
+    model = CapturingChatModel(captured=[])
+    executor = build_agent_executor(llm=model, clock=clock.today)
+    prompts.date_context.cache_clear()
+
+    executor.invoke({"input": "Merhaba"})
+    executor.invoke({"input": "Merhaba"})
+    clock.advance(seconds=4)
+    executor.invoke({"input": "Merhaba"})
+
+    before, _, after = (system_messages(messages) for messages in model.captured)
+    errors = []
+    if before[0].encode() != after[0].encode():
+        errors.append("Sabit talimat öneki gün değişiminde değişti")
+    if "{" in before[0] or "2030" in before[0]:
+        errors.append("Sabit talimat önekinde tarih veya doldurulmamış değişken var")
+
+    expectations = {
+        "önceki gün": (before[1], ["Bugünün tarihi: 2030-01-06 (Pazar)", "Yarının tarihi: 2030-01-07",
+                                   "Pazartesi: 2030-01-07", "Pazar: 2030-01-13"]),
+        "sonraki gün": (after[1], ["Bugünün tarihi: 2030-01-07 (Pazartesi)", "Yarının tarihi: 2030-01-08",
+                                   "Pazartesi: 2030-01-14", "Pazar: 2030-01-13"]),
+    }
+    for label, (block, expected_lines) in expectations.items():
+        for line in expected_lines:
+            if line not in block:
+                errors.append(f"{label} tarih bloğunda eksik: {line!r}")
+
+    misses = prompts.date_context.cache_info().misses
+    if misses != 2:
+        errors.append(f"Tarih bloğu gün başına bir kez yerine {misses} kez hesaplandı (3 tur, 2 gün)")
+
+    print("Önceki gün tarih bloğu:\n" + before[1])
+    print("Sonraki gün tarih bloğu:\n" + after[1])
+    if errors:
+        for error in errors:
+            print(f"HATA: {error}")
+        sys.exit(1)
+    print("Tüm değişmezler sağlandı: önek sabit, tarih bloğu gece yarısında executor yeniden kurulmadan güncellendi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""ASGI servis (service.py) yük testi.
+
+service.create_app ile kurulan uygulama, ChatGroq yerine senaryo tabanlı sahte modelle
+(scripted_llm.py) ayrı bir süreçte tek bir uvicorn worker'ı olarak başlatılır. Her eşzamanlılık
+seviyesinde N sanal kullanıcı kendi oturumunda benchmarks/scenarios.json senaryolarını
+HTTP üzerinden, oturum başına bir keep-alive bağlantısıyla sırayla oynatır. Seviye başına saniyedeki tur sayısı, tur gecikmesi
+p50/p99, ideal ölçeklenmeye göre verim (N oturum / tek oturum tur süresi) ve geri basınçla
+reddedilen (503) istek oranı raporlanır. --stream ile /chat/stream kullanılır ve ilk olaya
+kadar geçen süre de ölçülür.
+
+Her oturumun geçmişinin (GET /sessions/{id}/messages) gönderim sırasıyla ve
+kullanıcı/asistan çiftleri halinde yazıldığı da doğrulanır. Ağ veya GROQ_API_KEY gerektirmez.
+
+Kullanım:
+    python benchmarks/load_service.py
+    python benchmarks/load_service.py --levels 1 8 32 128 256 --latency 0.2 --stream
+    python benchmarks/load_service.py --max-concurrent 16 --max-waiting 32
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import uvicorn  # noqa: E402
+
+from agent import build_agent_executor  # noqa: E402
+from scripted_llm import ScriptedChatModel, build_script, load_scenarios  # noqa: E402
+from service import TurnGate, create_app  # noqa: E402
+from session_store import InMemorySessionStore  # noqa: E402
+
+DEFAULT_SCENARIOS = os.path.join(BENCH_DIR, "scenarios.json")
+DEFAULT_LEVELS = [1, 8, 32, 128]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(args, port: int) -> None:
+    """Alt süreçte uygulamayı tek uvicorn worker'ı olarak çalıştırır."""
+    logging.disable(logging.CRITICAL)
+    scenarios = load_scenarios(args.scenarios)
+    llm = ScriptedChatModel(script=build_script(scenarios), latency=args.latency, jitter=args.jitter)
+    app = create_app(
+        executor_factory=lambda: build_agent_executor(llm=llm),
+        session_store=InMemorySessionStore(),
+        fast_path=args.fast_path,
+        tool_workers=args.tool_workers,
+        gate_factory=lambda: TurnGate(args.max_concurrent, args.max_waiting, args.session_max_pending),
+    )
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error", backlog=4096, timeout_keep_alive=30)
+
+
+def start_server(args) -> Tuple[multiprocessing.Process, Tuple[str, int]]:
+    """Sunucuyu ayrı bir süreçte başlatır; istemci aynı GIL'i paylaşıp ölçümü bozmasın."""
+    port = _free_port()
+    process = multiprocessing.get_context("spawn").Process(target=_serve, args=(args, port), daemon=True)
+    process.start()
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz"):
+                return process, ("127.0.0.1", port)
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Servis 60 saniye içinde başlamadı")
+
+
+class _Connection:
+    """Tek oturumun kalıcı (keep-alive) HTTP/1.1 bağlantısı.
+
+    Tek çekirdekte istemci ve sunucu aynı CPU'yu paylaştığından, ölçümü istemci yükü
+    belirlemesin diye genel amaçlı bir HTTP istemcisi yerine bu küçük okuyucu kullanılır.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None
+                      ) -> Tuple[int, Dict[str, str], bytes, Optional[float]]:
+        """İsteği gönderir; (durum kodu, başlıklar, gövde, ilk gövde parçasına kadar geçen süre) döndürür."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        start = time.perf_counter()
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        first_chunk = None
+        if headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while size := int((await self.reader.readline()).strip(), 16):
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+                first_chunk = first_chunk or time.perf_counter() - start
+            await self.reader.readline()
+            content = b"".join(chunks)
+        else:
+            content = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, headers, content, first_chunk
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def _turn(connection: _Connection, session_id: str, message: str, stream: bool) -> Dict[str, Any]:
+    start = time.perf_counter()
+    status, headers, _, first_event = await connection.request(
+        "POST", "/chat/stream" if stream else "/chat", {"session_id": session_id, "message": message})
+    return {"status": status, "seconds": time.perf_counter() - start, "first_event": first_event,
+            "retry_after": float(headers.get("retry-after", 0))}
+
+
+async def _user(address: Tuple[str, int], user: int, scenarios: List[Dict[str, Any]], rounds: int,
+                stream: bool, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bir oturumda senaryoları sırayla oynatır; reddedilen tur Retry-After kadar beklenip tekrar denenir.
+
+    Sonunda oturum geçmişinin gönderim sırasıyla ve kullanıcı/asistan çiftleri halinde
+    yazıldığı doğrulanır.
+    """
+    session_id = f"load-{user}"
+    sent: List[str] = []
+    connection = _Connection(*address)
+    for turn_index in range(rounds):
+        scenario = scenarios[(user + turn_index) % len(scenarios)]
+        for turn in scenario["turns"]:
+            while True:
+                sample = await _turn(connection, session_id, turn["input"], stream)
+                samples.append(sample)
+                if sample["status"] != 503:
+                    break
+                await asyncio.sleep(sample["retry_after"])
+            sent.append(turn["input"])
+
+    _, _, content, _ = await connection.request("GET", f"/sessions/{session_id}/messages?limit={len(sent) * 2}")
+    await connection.close()
+    messages = json.loads(content)["messages"]
+    return {"in_order": [m["content"] for m in messages if m["role"] == "user"] == sent
+            and [m["role"] for m in messages] == ["user", "assistant"] * len(sent)}
+
+
+async def run_level(address: Tuple[str, int], users: int, scenarios: List[Dict[str, Any]], rounds: int,
+                    stream: bool) -> Dict[str, Any]:
+    samples: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*(_user(address, users * 1000 + user, scenarios, rounds, stream, samples)
+                                      for user in range(users)))
+    elapsed = time.perf_counter() - start
+    out_of_order = sum(1 for session in sessions if not session["in_order"])
+
+    accepted = [s for s in samples if s["status"] == 200]
+    latencies = [s["seconds"] for s in accepted]
+    result = {
+        "sessions": users,
+        "turns": len(accepted),
+        "turns_per_sec": len(accepted) / elapsed,
+        "mean_ms": sum(latencies) / max(len(latencies), 1) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rejected_pct": (len(samples) - len(accepted)) / max(len(samples), 1) * 100,
+        "errors": sum(1 for s in samples if s["status"] not in (200, 503)),
+        "out_of_order_sessions": out_of_order,
+    }
+    if stream:
+        result["first_event_p50_ms"] = percentile([s["first_event"] for s in accepted
+                                                   if s["first_event"] is not None], 0.50) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGI servis yük testi (sahte LLM)")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help="Senaryo JSON dosyası")
+    parser.add_argument("--levels", type=int, nargs="+", default=DEFAULT_LEVELS, help="Eşzamanlı oturum sayıları")
+    parser.add_argument("--rounds", type=int, default=3, help="Oturum başına oynatılan senaryo sayısı")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simüle edilen LLM çağrı süresi (saniye)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="LLM süresine eklenen rastgele sapma (saniye)")
+    parser.add_argument("--stream", action="store_true", help="/chat/stream uç noktasını kullan")
+    parser.add_argument("--fast-path", action="store_true", help="Kural tabanlı hızlı yolu aç")
+    parser.add_argument("--tool-workers", type=int, default=32, help="Engelleyen işler için thread sayısı")
+    parser.add_argument("--max-concurrent", type=int, default=256, help="Aynı anda çalışan en fazla tur")
+    parser.add_argument("--max-waiting", type=int, default=1024, help="Sırada bekleyebilecek en fazla tur")
+    parser.add_argument("--session-max-pending", type=int, default=4, help="Oturum başına bekleyen en fazla tur")
+    args = parser.parse_args()
+    os.environ.setdefault("DIRECT_ANSWERS", "0")  # Her turda iki LLM çağrısı (en kötü durum)
+    os.environ.setdefault("PROFILE_OUTBOX_PATH", ":memory:")  # Ölçüm data/ altındaki outbox'a yazmasın
+
+    scenarios = load_scenarios(args.scenarios)
+    process, address = start_server(args)
+
+    print(f"{'oturum':>7s} {'tur':>6s} {'tur/sn':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'verim':>7s} "
+          f"{'red %':>6s}" + (f" {'ilk olay ms':>12s}" if args.stream else ""))
+    # Yüksüz tur süresi: tek oturumla ölçülür (ısınma turlarını da içerir)
+    single_turn = asyncio.run(run_level(address, 1, scenarios, args.rounds, args.stream))["mean_ms"] / 1000
+    results = []
+    for users in args.levels:
+        result = asyncio.run(run_level(address, users, scenarios, args.rounds, args.stream))
+        if users == 1:
+            single_turn = min(single_turn, result["mean_ms"] / 1000)
+        # Verim: ölçülen tur/sn'nin, N oturumun yüksüz tur süresiyle ideal toplamına oranı
+        result["efficiency_pct"] = result["turns_per_sec"] * single_turn / users * 100
+        results.append(result)
+        print(f"{users:7d} {result['turns']:6d} {result['turns_per_sec']:8.1f} {result['p50_ms']:8.1f} "
+              f"{result['p99_ms']:8.1f} {result['efficiency_pct']:6.1f}% {result['rejected_pct']:6.1f}"
+              + (f" {result['first_event_p50_ms']:12.1f}" if args.stream else ""))
+
+    process.terminate()
+    print(json.dumps({"latency": args.latency, "stream": args.stream, "results": results}))
+    if any(r["errors"] or r["out_of_order_sessions"] for r in results):
+        print("HATA: hatalı yanıtlar veya sırası bozulmuş oturumlar var")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
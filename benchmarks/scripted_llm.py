@@ -0,0 +1,103 @@
+"""Benchmark'lar için senaryo tabanlı sahte sohbet modeli.
+
+ChatGroq yerine geçer; ağ veya GROQ_API_KEY gerektirmez. Her kullanıcı mesajı için
+önceden yazılmış yanıt dizisini (araç çağrıları ve nihai yanıt) sırayla oynatır ve
+her çağrıda yapılandırılabilir bir gecikme simüle eder.
+
+Yanıt dizisindeki adım, son kullanıcı mesajından sonra gelen AIMessage sayısından
+bulunur; model durum tutmadığı için eşzamanlı oturumlarda güvenle paylaşılabilir.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Senaryoda karşılığı olmayan mesajlar için nihai yanıt
+FALLBACK_REPLY = "Size nasıl yardımcı olabilirim?"
+
+
+def load_scenarios(path: str) -> List[Dict[str, Any]]:
+    """Senaryo dosyasını okur.
+
+    Dosya biçimi: [{"name": ..., "turns": [{"input": ..., "responses": [
+        {"tool_calls": [{"name": ..., "args": {...}}]}, {"content": "..."}]}]}]
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_script(scenarios: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Senaryolardan kullanıcı mesajı -> yanıt dizisi eşlemesi oluşturur."""
+    script: Dict[str, List[Dict[str, Any]]] = {}
+    for scenario in scenarios:
+        for turn in scenario["turns"]:
+            script[turn["input"]] = turn["responses"]
+    return script
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Senaryodaki yanıtları simüle edilmiş gecikmeyle oynatan sohbet modeli.
+
+    Args:
+        script: Kullanıcı mesajı -> yanıt adımları eşlemesi.
+        latency: Her model çağrısının simüle edilen gecikmesi (saniye).
+        jitter: Gecikmeye eklenen rastgele sapmanın üst sınırı (saniye).
+    """
+
+    script: Dict[str, List[Dict[str, Any]]]
+    latency: float = 0.0
+    jitter: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _delay(self) -> float:
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+        user_input = messages[last_human].content if last_human >= 0 else ""
+        step = sum(1 for m in messages[last_human + 1:] if isinstance(m, AIMessage))
+        responses = self.script.get(user_input, [])
+        if step >= len(responses):
+            return AIMessage(content=FALLBACK_REPLY)
+
+        response = responses[step]
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"call_{step}_{i}"}
+            for i, call in enumerate(response.get("tool_calls", []))
+        ]
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        content = response.get("content", "")
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": len(content) // 4 + 1,
+                "total_tokens": prompt_tokens + len(content) // 4 + 1,
+            },
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
@@ -0,0 +1,117 @@
+"""Randevu motoru eşzamanlılık stres testi.
+
+Çok sayıda thread aynı gün ve servis için aynı slotları aynı anda ayırtmaya çalışır.
+Sonunda şu değişmezler doğrulanır; biri bozulursa çıkış kodu 1 olur:
+  - aynı servis/gün için hiçbir randevu aralığı çakışmaz
+  - gün başına kapasite aşılmaz
+  - tüm randevu numaraları tekildir ve üretim sırasına göre sıralıdır
+Karşılaştırma için eski saniye çözünürlüklü numara şemasının çakışma sayısı da raporlanır.
+
+Kullanım:
+    python benchmarks/stress_appointments.py --threads 64 --attempts 200
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appointments import SERVICES, Appointment, BookingEngine  # noqa: E402
+
+# Tüm thread'lerin hedeflediği az sayıda slot, yoğun çekişme yaratır
+CONTESTED_TIMES = ["09:00", "09:30", "10:00", "14:00", "14:30", "17:00"]
+
+
+def check_invariants(appointments: List[Appointment]) -> List[str]:
+    errors = []
+    by_day: Dict[Tuple[str, str], List[Appointment]] = defaultdict(list)
+    for appointment in appointments:
+        by_day[(appointment.service_type, appointment.date)].append(appointment)
+
+    capacities = {config.name: config.daily_capacity for config in SERVICES.values()}
+    for (service, date), booked in by_day.items():
+        if len(booked) > capacities[service]:
+            errors.append(f"{service} {date}: kapasite aşıldı ({len(booked)} > {capacities[service]})")
+        booked.sort(key=lambda a: a.start_minute)
+        for previous, current in zip(booked, booked[1:]):
+            if current.start_minute < previous.end_minute:
+                errors.append(f"{service} {date}: {previous.time} ile {current.time} çakışıyor")
+
+    ids = [appointment.appointment_id for appointment in appointments]
+    if len(set(ids)) != len(ids):
+        errors.append(f"Tekrarlanan randevu numarası: {len(ids) - len(set(ids))}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Randevu motoru stres testi")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--attempts", type=int, default=200, help="Thread başına randevu denemesi")
+    parser.add_argument("--days", type=int, default=3, help="Hedeflenen gün sayısı")
+    args = parser.parse_args()
+
+    engine = BookingEngine(clock=lambda: datetime.datetime(2030, 1, 1, 8, 0))
+    dates = [(datetime.date(2030, 1, 2) + datetime.timedelta(days=i)).isoformat() for i in range(args.days)]
+    services = [config.name for config in SERVICES.values()]
+
+    booked: List[Tuple[int, Appointment]] = []
+    booked_lock = threading.Lock()
+    counts = {"success": 0, "rejected": 0}
+    legacy_ids: List[str] = []
+    barrier = threading.Barrier(args.threads)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        local: List[Tuple[int, Appointment]] = []
+        local_legacy: List[str] = []
+        rejected = 0
+        barrier.wait()
+        for _ in range(args.attempts):
+            result = engine.book(rng.choice(services), rng.choice(dates), rng.choice(CONTESTED_TIMES))
+            # Eski şema: saniye çözünürlüklü zaman damgası
+            local_legacy.append("APT" + datetime.datetime.now().strftime("%Y%m%d%H%M%S"))
+            if result.success:
+                local.append((time.perf_counter_ns(), result.appointment))
+            else:
+                rejected += 1
+        with booked_lock:
+            booked.extend(local)
+            legacy_ids.extend(local_legacy)
+            counts["success"] += len(local)
+            counts["rejected"] += rejected
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    appointments = [appointment for _, appointment in booked]
+    errors = check_invariants(appointments)
+    # Numaralar üretim sırasına göre sıralı olmalı (ULID sözlük sırası == zaman sırası)
+    ids_by_creation = [appointment.appointment_id for _, appointment in sorted(booked, key=lambda item: item[0])]
+    out_of_order = sum(1 for a, b in zip(ids_by_creation, ids_by_creation[1:]) if a > b)
+
+    total = args.threads * args.attempts
+    print(f"{args.threads} thread x {args.attempts} deneme = {total} randevu isteği, {elapsed:.2f} s "
+          f"({total / elapsed:,.0f} istek/s)")
+    print(f"Başarılı: {counts['success']}, reddedilen (alternatif önerilen): {counts['rejected']}")
+    print(f"Sıra dışı numara çifti (gözlem gecikmesi kaynaklı olabilir): {out_of_order}")
+    print(f"Eski şemada çakışan numara: {len(legacy_ids) - len(set(legacy_ids))} / {len(legacy_ids)}")
+    if errors:
+        for error in errors:
+            print(f"HATA: {error}")
+        sys.exit(1)
+    print("Tüm değişmezler sağlandı: çakışma yok, kapasite aşılmadı, numaralar tekil.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Groq sohbet API'sini taklit eden yerel stub sunucu.
+
+İsteklerin belirli bir kısmına 429 (Retry-After ile) veya 503 döner, bir kısmını da
+yapay olarak geciktirir. llm_client katmanını ağsız ve API anahtarsız denemek için
+kullanılır; GROQ_API_BASE=http://127.0.0.1:<port> ile ChatGroq buraya yönlendirilir.
+
+Kullanım:
+    python benchmarks/stub_groq_server.py --port 8765 --rate-limit 0.3 --slow 0.1 --slow-delay 2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+CHAT_PATH = "/openai/v1/chat/completions"
+
+
+class StubConfig:
+    """Stub sunucunun hata/gecikme oranları ve sayaçları."""
+
+    def __init__(self, rate_limit: float = 0.0, server_error: float = 0.0, slow: float = 0.0,
+                 slow_delay: float = 2.0, latency: float = 0.05, retry_after: Optional[float] = 1.0,
+                 seed: Optional[int] = None):
+        self.rate_limit = rate_limit
+        self.server_error = server_error
+        self.slow = slow
+        self.slow_delay = slow_delay
+        self.latency = latency
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "429": 0, "503": 0, "slow": 0, "ok": 0}
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+
+def _completion(request: Dict[str, Any]) -> Dict[str, Any]:
+    last = request.get("messages", [{}])[-1].get("content") or ""
+    content = f"Stub yanıt: {str(last)[:60]}"
+    return {
+        "id": f"chatcmpl-{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 20, "completion_tokens": 10, "total_tokens": 30},
+    }
+
+
+def make_handler(config: StubConfig):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002 - sessiz
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path != CHAT_PATH:
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            config.count("requests")
+            with config.lock:
+                roll = config.random.random()
+            if roll < config.rate_limit:
+                config.count("429")
+                headers = {"retry-after": str(config.retry_after)} if config.retry_after is not None else {}
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}}, headers)
+                return
+            if roll < config.rate_limit + config.server_error:
+                config.count("503")
+                self._send(503, {"error": {"message": "Service unavailable"}})
+                return
+            if roll < config.rate_limit + config.server_error + config.slow:
+                config.count("slow")
+                time.sleep(config.slow_delay)
+            else:
+                time.sleep(config.latency)
+            config.count("ok")
+            if request.get("stream"):
+                self._send_stream(_completion(request))
+            else:
+                self._send(200, _completion(request))
+
+        def _send_stream(self, completion: Dict[str, Any]) -> None:
+            # OpenAI uyumlu SSE: her kelime ayrı bir delta parçası olarak gönderilir
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            words = completion["choices"][0]["message"]["content"].split(" ")
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                    "model": completion["model"],
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": word if i == 0 else " " + word},
+                                 "finish_reason": None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            final = {
+                "id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"],
+                "model": completion["model"], "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"usage": completion["usage"]},
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.close_connection = True
+
+    return StubHandler
+
+
+def start_stub_server(config: StubConfig, port: int = 0) -> ThreadingHTTPServer:
+    """Stub sunucuyu arka plan thread'inde başlatır; port 0 ise boş bir port seçilir."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-groq", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Groq API stub sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit", type=float, default=0.3, help="429 dönen istek oranı")
+    parser.add_argument("--server-error", type=float, default=0.0, help="503 dönen istek oranı")
+    parser.add_argument("--slow", type=float, default=0.1, help="Yavaş yanıtlanan istek oranı")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="Yavaş yanıt gecikmesi (s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Normal yanıt gecikmesi (s)")
+    args = parser.parse_args()
+
+    config = StubConfig(rate_limit=args.rate_limit, server_error=args.server_error, slow=args.slow,
+                        slow_delay=args.slow_delay, latency=args.latency)
+    server = start_stub_server(config, args.port)
+    print(f"Stub Groq sunucusu: http://127.0.0.1:{server.server_address[1]} (Ctrl+C ile durdurun)")
+    try:
+        while True:
+            time.sleep(5)
+            print(config.counts, flush=True)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import datetime
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from text_utils import fold_turkish
+
+# Türkçe göreli tarih/saat ifadelerini deterministik olarak normalleştirir:
+#   "bugün", "yarın", "öbür gün", "3 gün sonra", "önümüzdeki salı", "haftaya cuma",
+#   "20 ekim", "20.10.2026", "2026-10-20"  -> "YYYY-MM-DD"
+#   "14:30", "14.30", "saat 2", "2 buçuk", "öğleden sonra", "sabah 10" -> "HH:MM"
+# Desenler katlanmış (fold_turkish) metin üzerinde çalışır ve modül yüklenirken derlenir.
+# Gün tablosu (bugün, yarın, hafta günleri) her gün için bir kez hesaplanır.
+
+WEEKDAYS = ("pazartesi", "salı", "çarşamba", "perşembe", "cuma", "cumartesi", "pazar")
+_FOLDED_WEEKDAYS = tuple(fold_turkish(day) for day in WEEKDAYS)
+_MONTHS = ("ocak", "subat", "mart", "nisan", "mayis", "haziran",
+           "temmuz", "agustos", "eylul", "ekim", "kasim", "aralik")
+_NUMBER_WORDS = {"bir": 1, "iki": 2, "uc": 3, "dort": 4, "bes": 5, "alti": 6,
+                 "yedi": 7, "sekiz": 8, "dokuz": 9, "on": 10}
+# Gün parçalarının varsayılan saatleri (çalışma saatleri 09:00-18:00)
+_DAY_PARTS = {"sabah": 9, "ogle": 12, "ogleden sonra": 14, "ikindi": 16, "aksam": 17}
+
+_ISO_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_DMY_RE = re.compile(r"(?<![\d:])(\d{1,2})[./](\d{1,2})(?:[./](\d{4}|\d{2}))?(?![\d:])")
+_MONTH_NAME_RE = re.compile(r"\b(\d{1,2})\s+(" + "|".join(_MONTHS) + r")\w*(?:\s+(\d{4}))?")
+_RELATIVE_DAY_RE = re.compile(r"\b(yarindan\s+sonra|obur\s*gun|ertesi\s*gun|bugun|yarin)\w*")
+_OFFSET_RE = re.compile(r"\b(\d{1,3}|" + "|".join(_NUMBER_WORDS) + r")\s+(gun|hafta|ay)\s+(?:sonra|sonrasi)")
+_WEEKDAY_RE = re.compile(
+    r"\b(?:(bu|onumuzdeki|gelecek|sonraki|haftaya)\s+)?(pazartesi|sali|carsamba|persembe|cumartesi|cuma|pazar)\w*"
+)
+_NEXT_WEEK_RE = re.compile(r"\b(?:onumuzdeki|gelecek|sonraki)\s+hafta\b|\bhaftaya\b")
+
+_CLOCK_RE = re.compile(r"(?<![\d./])([01]?\d|2[0-3])[:.]([0-5]\d)(?![\d./])")
+_HALF_RE = re.compile(r"\b(?:saat\s*)?(\d{1,2})\s*bucuk")
+_HOUR_RE = re.compile(r"\bsaat\s*(\d{1,2})\b|\b(\d{1,2})\s*'?\s*(?:te|de|ta|da)\b")
+_DAY_PART_RE = re.compile(r"\b(ogleden\s+sonra|sabah|ogle|ikindi|aksam)\w*(?:\s+(?:saat\s*)?(\d{1,2})\b)?")
+_BARE_HOUR_RE = re.compile(r"^\s*(\d{1,2})\s*$")
+
+
+@lru_cache(maxsize=4)
+def date_table(today: datetime.date) -> Dict[str, datetime.date]:
+    """Verilen gün için göreli ifade -> tarih tablosu (gün başına bir kez hesaplanır).
+
+    Çıplak hafta günü ve "önümüzdeki <gün>" bugünden sonraki ilk o günü, "bu <gün>"
+    bu haftanın o gününü (geçtiyse bir sonrakini), "haftaya <gün>" gelecek takvim
+    haftasının o gününü verir.
+    """
+    day = datetime.timedelta(days=1)
+    next_monday = today + day * (7 - today.weekday())
+    table = {
+        "bugun": today,
+        "yarin": today + day,
+        "obur gun": today + day * 2,
+        "onumuzdeki hafta": next_monday,
+    }
+    for index, name in enumerate(_FOLDED_WEEKDAYS):
+        ahead = (index - today.weekday()) % 7
+        table[name] = today + day * (ahead or 7)
+        table[f"bu {name}"] = today + day * ahead
+        table[f"haftaya {name}"] = next_monday + day * index
+    return table
+
+
+def weekday_dates(today: Optional[datetime.date] = None) -> Dict[str, str]:
+    """Hafta günü adı -> bugünden sonraki ilk o günün tarihi (YYYY-MM-DD)."""
+    table = date_table(today or datetime.date.today())
+    return {name: table[folded].isoformat() for name, folded in zip(WEEKDAYS, _FOLDED_WEEKDAYS)}
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else _NUMBER_WORDS[token]
+
+
+def _add_months(date: datetime.date, months: int) -> datetime.date:
+    month_index = date.month - 1 + months
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    # Ay sonu taşmalarında ayın son günü kullanılır (31 Ocak + 1 ay -> 28/29 Şubat)
+    for day in range(date.day, 27, -1):
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            continue
+    return datetime.date(year, month, min(date.day, 28))
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[datetime.date]:
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(today: datetime.date, month: int, day: int, year: Optional[int]) -> Optional[datetime.date]:
+    # Yıl verilmemişse geçmişte kalan gün/ay bir sonraki yıla atılır
+    if year is not None:
+        return _safe_date(year if year >= 100 else 2000 + year, month, day)
+    date = _safe_date(today.year, month, day)
+    if date is not None and date < today:
+        date = _safe_date(today.year + 1, month, day)
+    return date
+
+
+def _is_day_month(folded: str, match: re.Match) -> bool:
+    # "saat 14.30" veya "14.30" (ay > 12) gibi saatler tarih sayılmaz
+    return 1 <= int(match.group(2)) <= 12 and not folded[:match.start()].rstrip().endswith("saat")
+
+
+def _strip_dates(folded: str) -> str:
+    folded = _MONTH_NAME_RE.sub(" ", _ISO_RE.sub(" ", folded))
+    return _DMY_RE.sub(lambda m: " " if _is_day_month(folded, m) else m.group(0), folded)
+
+
+@lru_cache(maxsize=2048)
+def _normalize_date(folded: str, today: datetime.date) -> Optional[datetime.date]:
+    match = _ISO_RE.search(folded)
+    if match:
+        return _safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = _MONTH_NAME_RE.search(folded)
+    if match:
+        year = int(match.group(3)) if match.group(3) else None
+        return _upcoming(today, _MONTHS.index(match.group(2)) + 1, int(match.group(1)), year)
+
+    match = next((m for m in _DMY_RE.finditer(folded) if _is_day_month(folded, m)), None)
+    if match:
+        year = int(match.group(3)) if match.group(3) else None
+        return _upcoming(today, int(match.group(2)), int(match.group(1)), year)
+
+    match = _OFFSET_RE.search(folded)
+    if match:
+        amount, unit = _number(match.group(1)), match.group(2)
+        if unit == "ay":
+            return _add_months(today, amount)
+        return today + datetime.timedelta(days=amount * (7 if unit == "hafta" else 1))
+
+    table = date_table(today)
+    match = _WEEKDAY_RE.search(folded)
+    if match:
+        modifier, name = match.group(1), match.group(2)
+        if modifier in ("bu", "haftaya"):
+            return table[f"{modifier} {name}"]
+        return table[name]
+
+    match = _RELATIVE_DAY_RE.search(folded)
+    if match:
+        key = re.sub(r"\s+", " ", match.group(1))
+        return table["obur gun" if key in ("yarindan sonra", "ertesi gun", "obur gun") else key]
+
+    if _NEXT_WEEK_RE.search(folded):
+        return table["onumuzdeki hafta"]
+    return None
+
+
+def normalize_date(text: Optional[str], today: Optional[datetime.date] = None) -> Optional[str]:
+    """Tarih ifadesini YYYY-MM-DD biçimine çevirir; anlaşılamazsa None döndürür.
+
+    Args:
+        text: "yarın", "önümüzdeki salı", "3 gün sonra", "20 ekim", "2026-10-20" gibi ifade.
+        today: Referans gün (varsayılan: bugün).
+
+    Returns:
+        Optional[str]: Normalleştirilmiş tarih.
+    """
+    if not text:
+        return None
+    date = _normalize_date(fold_turkish(text), today or datetime.date.today())
+    return date.isoformat() if date else None
+
+
+def _afternoon(hour: int, day_part: Optional[str]) -> int:
+    # Çalışma saatleri içinde "saat 2" öğleden sonra 14:00 olarak anlaşılır
+    if day_part in ("ogleden sonra", "ikindi", "aksam") and hour < 12:
+        return hour + 12
+    if day_part is None and 1 <= hour <= 7:
+        return hour + 12
+    return hour
+
+
+@lru_cache(maxsize=2048)
+def _normalize_time(folded: str) -> Optional[Tuple[int, int]]:
+    day_part_match = _DAY_PART_RE.search(folded)
+    day_part = re.sub(r"\s+", " ", day_part_match.group(1)) if day_part_match else None
+
+    match = _CLOCK_RE.search(folded)
+    if match:
+        return _afternoon(int(match.group(1)), day_part), int(match.group(2))
+    match = _HALF_RE.search(folded)
+    if match and int(match.group(1)) <= 23:
+        return _afternoon(int(match.group(1)), day_part), 30
+    match = _HOUR_RE.search(folded) or _BARE_HOUR_RE.search(folded)
+    hour = next((int(group) for group in match.groups() if group), None) if match else None
+    if hour is not None and hour <= 23:
+        return _afternoon(hour, day_part), 0
+    if day_part_match:
+        if day_part_match.group(2) and int(day_part_match.group(2)) <= 23:
+            return _afternoon(int(day_part_match.group(2)), day_part), 0
+        return _DAY_PARTS[day_part], 0
+    return None
+
+
+def normalize_time(text: Optional[str]) -> Optional[str]:
+    """Saat ifadesini HH:MM biçimine çevirir; anlaşılamazsa None döndürür.
+
+    Args:
+        text: "14:30", "14.30", "saat 2", "2 buçuk", "öğleden sonra", "sabah 10" gibi ifade.
+
+    Returns:
+        Optional[str]: Normalleştirilmiş saat.
+    """
+    if not text:
+        return None
+    parsed = _normalize_time(fold_turkish(text))
+    return f"{parsed[0]:02d}:{parsed[1]:02d}" if parsed else None
+
+
+def normalize_datetime(date_text: Optional[str], time_text: Optional[str],
+                       today: Optional[datetime.date] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Tarih ve saat alanlarını birlikte normalleştirir.
+
+    Model bazen saati tarih alanına ("yarın öğleden sonra") veya tarihi saat alanına
+    yazar; bir alan boş kalırsa değer diğer alandan aranır.
+    """
+    date = normalize_date(date_text, today)
+    if date is None and time_text:
+        # "10.05" gibi saatler tarih sanılmasın diye saat eşleşmeleri çıkarıldıktan sonra aranır
+        parsed_date = _normalize_date(_CLOCK_RE.sub(" ", fold_turkish(time_text)), today or datetime.date.today())
+        date = parsed_date.isoformat() if parsed_date else None
+    time = normalize_time(time_text)
+    if time is None and date_text:
+        # "20.10" gibi tarih parçaları saat sanılmasın diye önce çıkarılır
+        parsed = _normalize_time(_strip_dates(fold_turkish(date_text)))
+        time = f"{parsed[0]:02d}:{parsed[1]:02d}" if parsed else None
+    return date, time
@@ -0,0 +1,106 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Başarılı tek araç çağrısından sonra ikinci LLM turunu atlayan "doğrudan yanıt" şablonları.
+# Şablonlar Jinja tarzı {{ alan }} / {{ alan.alt_alan }} yer tutucuları içerir; değerler
+# araç sonucundan, yoksa araç girdisinden alınır. Bir şablondaki tüm alanlar dolu değilse
+# sıradaki şablon denenir; hiçbiri uymazsa yanıt yine LLM'e bırakılır.
+
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+
+
+def _lookup(context: Dict[str, Any], path: str) -> Optional[str]:
+    value: Any = context
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    # Liste/sözlük gibi yapılar metne gömülmez; bu durumda şablon kapsamıyor sayılır
+    if value is None or value == "" or isinstance(value, (dict, list, tuple)):
+        return None
+    return str(value)
+
+
+def render_template(template: str, context: Dict[str, Any]) -> Optional[str]:
+    """Şablonu doldurur; eksik alan varsa None döndürür."""
+    missing = False
+
+    def replace(match: re.Match) -> str:
+        nonlocal missing
+        value = _lookup(context, match.group(1))
+        if value is None:
+            missing = True
+            return ""
+        return value
+
+    rendered = _PLACEHOLDER_RE.sub(replace, template)
+    return None if missing else rendered
+
+
+def _succeeded(result: Dict[str, Any]) -> bool:
+    return result.get("success") is True
+
+
+@dataclass
+class DirectAnswer:
+    """Bir araç için doğrudan yanıt tanımı.
+
+    Args:
+        templates: Sırayla denenen yanıt şablonları (en ayrıntılıdan en sadeye).
+        succeeded: Araç sonucunun doğrudan yanıtlanabilecek kadar başarılı olup olmadığı.
+    """
+
+    templates: List[str]
+    succeeded: Callable[[Dict[str, Any]], bool] = field(default=_succeeded)
+
+    def render(self, tool_input: Any, observation: Any) -> Optional[str]:
+        if not isinstance(observation, dict):
+            return None
+        try:
+            if not self.succeeded(observation):
+                return None
+        except Exception:
+            logging.exception("Doğrudan yanıt koşulu değerlendirilemedi")
+            return None
+        context = {**tool_input, **observation} if isinstance(tool_input, dict) else dict(observation)
+        for template in self.templates:
+            rendered = render_template(template, context)
+            if rendered is not None:
+                return rendered
+        return None
+
+
+DEFAULT_DIRECT_ANSWERS: Dict[str, DirectAnswer] = {
+    "get_order_status": DirectAnswer(
+        templates=[
+            "{{ order_id }} numaralı siparişinizin durumu: {{ status }}. Tahmini teslim tarihi: "
+            "{{ estimated_delivery }}. Kargo takip numaranız: {{ tracking_number }}.",
+            "{{ order_id }} numaralı siparişinizin durumu: {{ status }}. Tahmini teslim tarihi: "
+            "{{ estimated_delivery }}.",
+        ],
+        # Bulunamayan siparişlerde tahmini teslim tarihi yoktur; kullanıcıya LLM yanıt verir
+        succeeded=lambda result: "estimated_delivery" in result,
+    ),
+    "update_user_email": DirectAnswer(templates=["{{ message }}"]),
+    "get_email_update_status": DirectAnswer(templates=["{{ message }} ({{ email }})", "{{ message }}"]),
+    "schedule_appointment": DirectAnswer(
+        templates=["{{ message }} Randevu numaranız: {{ appointment_id }}."],
+    ),
+    "find_nearest_store": DirectAnswer(
+        templates=[
+            "Size en yakın mağazamız {{ store.name }} ({{ distance }}). Adres: {{ store.address }}, "
+            "telefon: {{ store.phone }}, çalışma saatleri: {{ store.working_hours }}.",
+            "{{ message }}",
+        ],
+    ),
+}
+
+
+def resolve_direct_answer(direct_answers: Dict[str, DirectAnswer],
+                          step: Tuple[Any, Any]) -> Optional[str]:
+    """(AgentAction, gözlem) adımı için doğrudan yanıt üretir; uygun değilse None döner."""
+    action, observation = step
+    spec = direct_answers.get(action.tool)
+    return spec.render(action.tool_input, observation) if spec else None
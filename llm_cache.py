@@ -0,0 +1,199 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+# ChatGroq için opsiyonel, disk üzerinde kalıcı LLM yanıt önbelleği.
+# Anahtar; model adı, sıcaklık ve araç şemalarını içeren llm_string ile işlenmiş
+# mesajların (sistem promptundaki tarih bilgisi dahil) özetidir.
+
+DEFAULT_MAX_ENTRIES = 10000
+# Gecikmesi ölçülen, henüz update görmemiş en fazla ıska. langchain_core hata veren
+# çağrılarda update'i hiç çağırmaz; sınır, bu kayıtların süreç boyunca birikmesini önler.
+MAX_PENDING = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    generations TEXT NOT NULL,
+    latency_ms REAL NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+_shared_caches: Dict[str, "SQLiteLLMCache"] = {}
+_shared_lock = threading.Lock()
+
+
+def _cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def _is_degraded(generation: Generation) -> bool:
+    message = getattr(generation, "message", None)
+    return bool(message is not None and message.response_metadata.get("degraded"))
+
+
+def _total_tokens(generations: Sequence[Generation]) -> int:
+    total = 0
+    for generation in generations:
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None) or {}
+        total += usage.get("total_tokens", 0)
+    return total
+
+
+class SQLiteLLMCache(BaseCache):
+    """SQLite tabanlı, boyut sınırlı (LRU) LLM yanıt önbelleği.
+
+    Args:
+        database_path: SQLite dosyasının yolu.
+        max_entries: Tutulacak en fazla kayıt; aşıldığında en uzun süre kullanılmayanlar silinir.
+    """
+
+    def __init__(self, database_path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.database_path = database_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        # Iska anından update'e kadar geçen süre, kaydın LLM gecikmesi olarak saklanır
+        self._pending: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_latency_ms = 0.0
+        self.saved_tokens = 0
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = _cache_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generations, latency_ms, total_tokens FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                self._start_pending(key)
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            self.saved_latency_ms += row[1]
+            self.saved_tokens += row[2]
+        return [loads(generation) for generation in json.loads(row[0])]
+
+    def peek(self, prompt: str, llm_string: str) -> bool:
+        """Kayıt var mı bakar; isabeti saymaz (akış yolunda isabet lookup ile alınır).
+
+        Iska burada sayılır ve gecikme ölçümü update'e kadar başlatılır.
+        """
+        key = _cache_key(prompt, llm_string)
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone():
+                return True
+            self.misses += 1
+            self._start_pending(key)
+            return False
+
+    def discard(self, prompt: str, llm_string: str) -> None:
+        """Yarıda kalan (hata veren veya kesilen) çağrının gecikme ölçümünü bırakır."""
+        key = _cache_key(prompt, llm_string)
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _start_pending(self, key: str) -> None:
+        # Kilit altında çağrılır; dict ekleme sırasını koruduğundan ilk anahtar en eskisidir
+        self._pending.pop(key, None)
+        self._pending[key] = time.perf_counter()
+        while len(self._pending) > MAX_PENDING:
+            del self._pending[next(iter(self._pending))]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = _cache_key(prompt, llm_string)
+        if any(_is_degraded(generation) for generation in return_val):
+            # Devre kesicinin geçici "yoğunluk" yanıtı kalıcı hale gelmemeli
+            with self._lock:
+                self._pending.pop(key, None)
+            return
+        payload = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._lock:
+            started = self._pending.pop(key, None)
+            latency_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+            exists = self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, generations, latency_ms, total_tokens, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, payload, latency_ms, _total_tokens(return_val), now, now),
+            )
+            if not exists:
+                self._size += 1
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)", (overflow,)
+                )
+                self._size -= overflow
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._size = 0
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbelleğin kazandırdığı gecikme ve token miktarını döndürür."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_latency_ms": round(self.saved_latency_ms, 1),
+                "saved_tokens": self.saved_tokens,
+            }
+
+
+def get_llm_cache_from_env() -> Optional[SQLiteLLMCache]:
+    """LLM_CACHE_PATH tanımlıysa süreç genelinde paylaşılan önbelleği döndürür.
+
+    Önbellek isteğe bağlıdır; değişken tanımlı değilse None döner ve ChatGroq
+    önbelleksiz çalışır. LLM_CACHE_MAX_ENTRIES ile boyut sınırı ayarlanabilir.
+
+    Returns:
+        Optional[SQLiteLLMCache]: Paylaşılan önbellek veya None.
+    """
+    database_path = os.getenv("LLM_CACHE_PATH")
+    if not database_path:
+        return None
+    with _shared_lock:
+        cache = _shared_caches.get(database_path)
+        if cache is None:
+            max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+            cache = _shared_caches[database_path] = SQLiteLLMCache(database_path, max_entries=max_entries)
+            logging.info("LLM yanıt önbelleği etkin: %s (en fazla %d kayıt)", database_path, max_entries)
+    return cache
@@ -0,0 +1,590 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+import groq
+import httpx
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, BaseMessageChunk, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_groq import ChatGroq
+from pydantic import PrivateAttr
+
+from llm_cache import SQLiteLLMCache
+from memory import count_tokens
+from metrics import get_metrics
+
+# Tüm Streamlit oturumları ve terminal tarafından paylaşılan dayanıklı LLM istemcisi.
+# Her LLM çağrısı (agent çalışmasının tamamı değil) sırasıyla şu katmanlardan geçer:
+#   devre kesici -> istek/token hız sınırlayıcı -> yeniden deneme (üstel geri çekilme + jitter)
+#   -> opsiyonel hedge (yavaş isteğe paralel ikinci istek) -> havuzlu HTTP bağlantısı
+# Devre açıkken model çağrılmaz; agent'a sabit bir "yoğunluk" yanıtı döner.
+
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 6000
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+DEFAULT_POOL_SIZE = 20
+# Token bütçesi için yanıt uzunluğu tahmini; gerçek kullanım yanıt gelince düzeltilir
+COMPLETION_TOKEN_ESTIMATE = 256
+# Yeniden denenebilecek HTTP durum kodları
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+DEGRADED_REPLY = (
+    "Şu anda yoğunluk nedeniyle isteğinizi işleyemiyorum. "
+    "Lütfen birkaç dakika sonra tekrar deneyin."
+)
+
+
+class TokenBucket:
+    """Thread-safe, rezervasyon tabanlı token bucket.
+
+    reserve() token'ları hemen düşer (bakiye eksiye inebilir) ve çağıranın ne kadar
+    beklemesi gerektiğini döndürür; bekleyenler sırayla ve adil biçimde ilerler.
+
+    Args:
+        per_minute: Dakikada eklenen token (0 veya negatif: sınırsız).
+        capacity: Biriktirilebilecek en fazla token; varsayılan per_minute.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """amount kadar token ayırır ve beklenmesi gereken süreyi (saniye) döndürür."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Beklemeden token alınabiliyorsa alır."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return True
+            return False
+
+    def adjust(self, amount: float) -> None:
+        """Tahmin ile gerçek kullanım arasındaki farkı düzeltir (pozitif: ek tüketim)."""
+        if not self.enabled or not amount:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class CircuitBreaker:
+    """Ardışık hatalarda açılan, süre dolunca tek deneme çağrısına izin veren devre kesici.
+
+    Args:
+        failure_threshold: Devreyi açan ardışık başarısız çağrı sayısı.
+        reset_timeout: Açık devrenin yarı açık duruma geçmesi için geçecek süre (saniye).
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                 reset_timeout: float = DEFAULT_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            # Deneme çağrısı sonucu hiç bildirilmeden bittiyse (ör. akış yarıda bırakıldı)
+            # reset_timeout sonra yeni bir deneme verilir; devre yarı açıkta takılı kalmaz
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Yarı açık: yalnızca bir deneme çağrısı geçer
+                self.state = "half_open"
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logging.info("LLM devre kesici kapandı")
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logging.warning("LLM devre kesici açıldı (%d ardışık hata)", self._failures)
+                    get_metrics().inc("llm_circuit_open_total")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def record_aborted(self) -> None:
+        """Yeniden denenmeyen bir hatayla biten çağrıyı bildirir.
+
+        Kapalı devrede ardışık hata sayılmaz (ör. 400 sağlık bilgisi vermez); yarı açık
+        devrenin deneme çağrısıysa devre yeniden açılır.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class RetryPolicy:
+    """Üstel geri çekilme ve tam jitter ile yeniden deneme politikası."""
+
+    max_retries: int = DEFAULT_MAX_RETRIES
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        # Sunucu Retry-After bildirdiyse ondan önce tekrar denenmez
+        return max(backoff, retry_after or 0.0)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (groq.APITimeoutError, groq.APIConnectionError)):
+        return True
+    if isinstance(error, groq.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _estimate_tokens(messages: List[BaseMessage]) -> int:
+    return sum(count_tokens(str(message.content)) for message in messages) + COMPLETION_TOKEN_ESTIMATE
+
+
+def _total_tokens(result: ChatResult) -> Optional[int]:
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+def degraded_result() -> ChatResult:
+    # "degraded" işareti, yanıtın LLM önbelleğine yazılmasını engeller
+    message = AIMessage(content=DEGRADED_REPLY, response_metadata={"degraded": True})
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class LLMGuard:
+    """LLM çağrılarını hız sınırı, yeniden deneme, hedge ve devre kesiciyle sarar.
+
+    Args:
+        requests_per_minute: Dakikadaki en fazla istek (0: sınırsız).
+        tokens_per_minute: Dakikadaki en fazla token (0: sınırsız).
+        retry: Yeniden deneme politikası.
+        breaker: Devre kesici.
+        hedge_after: Bu süre (saniye) içinde yanıt gelmezse ikinci istek gönderilir (None: kapalı).
+        max_workers: Senkron hedge çağrıları için thread sayısı.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 hedge_after: Optional[float] = None,
+                 max_workers: int = DEFAULT_POOL_SIZE):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_after = hedge_after
+        self._max_workers = max_workers
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="llm-hedge")
+        return self._pool
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        return max(self.request_bucket.reserve(1), self.token_bucket.reserve(estimated_tokens))
+
+    def _log_retry(self, attempt: int, delay: float, error: BaseException) -> None:
+        get_metrics().inc("llm_retries_total", error=type(error).__name__)
+        logging.warning("LLM çağrısı başarısız (%s), %.2f s sonra tekrar denenecek (deneme %d/%d)",
+                        type(error).__name__, delay, attempt + 1, self.retry.max_retries)
+
+    def _degraded(self) -> ChatResult:
+        get_metrics().inc("llm_degraded_replies_total")
+        return degraded_result()
+
+    # --- Senkron yol ---
+    def _hedged(self, call: Callable[[], ChatResult]) -> ChatResult:
+        if not self.hedge_after:
+            return call()
+        pool = self._get_pool()
+        first = pool.submit(contextvars.copy_context().run, call)
+        done, _ = concurrent.futures.wait([first], timeout=self.hedge_after)
+        # Hedge isteği de hız sınırına tabidir; boş kapasite yoksa gönderilmez
+        if done or not self.request_bucket.try_acquire():
+            return first.result()
+        get_metrics().inc("llm_hedged_requests_total")
+        second = pool.submit(contextvars.copy_context().run, call)
+        done, pending = concurrent.futures.wait([first, second], return_when=concurrent.futures.FIRST_COMPLETED)
+        winner = done.pop()
+        if winner.exception() is not None and pending:
+            return pending.pop().result()
+        return winner.result()
+
+    def call(self, call: Callable[[], ChatResult], messages: List[BaseMessage]) -> ChatResult:
+        if not self.breaker.allow():
+            return self._degraded()
+        estimated = _estimate_tokens(messages)
+        for attempt in range(self.retry.max_retries + 1):
+            wait = self._reserve(estimated)
+            if wait:
+                time.sleep(wait)
+            try:
+                result = self._hedged(call)
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_aborted()
+                    raise
+                # Başka bir çağrı devreyi açtıysa beklemeden sabit yanıta dönülür
+                if attempt == self.retry.max_retries or self.breaker.is_open:
+                    self.breaker.record_failure()
+                    logging.error("LLM çağrısı %d denemede başarısız: %s", attempt + 1, e)
+                    return self._degraded()
+                delay = self.retry.delay(attempt, _retry_after(e))
+                self._log_retry(attempt, delay, e)
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            actual = _total_tokens(result)
+            if actual is not None:
+                self.token_bucket.adjust(actual - estimated)
+            return result
+        return self._degraded()
+
+    def stream(self, stream: Callable[[], Iterator[ChatGenerationChunk]],
+               messages: List[BaseMessage]) -> Iterator[ChatGenerationChunk]:
+        # İlk parça geldikten sonraki hatalar yeniden denenmez (yanıt yarım kalır)
+        if not self.breaker.allow():
+            yield _degraded_chunk(self._degraded())
+            return
+        estimated = _estimate_tokens(messages)
+        for attempt in range(self.retry.max_retries + 1):
+            wait = self._reserve(estimated)
+            if wait:
+                time.sleep(wait)
+            started = False
+            try:
+                for chunk in stream():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started or not is_retryable(e):
+                    self.breaker.record_aborted()
+                    raise
+                # Başka bir çağrı devreyi açtıysa beklemeden sabit yanıta dönülür
+                if attempt == self.retry.max_retries or self.breaker.is_open:
+                    self.breaker.record_failure()
+                    yield _degraded_chunk(self._degraded())
+                    return
+                delay = self.retry.delay(attempt, _retry_after(e))
+                self._log_retry(attempt, delay, e)
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return
+
+    # --- Asenkron yol ---
+    async def _ahedged(self, call: Callable[[], Any]) -> ChatResult:
+        if not self.hedge_after:
+            return await call()
+        first = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done or not self.request_bucket.try_acquire():
+            return await first
+        get_metrics().inc("llm_hedged_requests_total")
+        second = asyncio.ensure_future(call())
+        done, pending = await asyncio.wait({first, second}, return_when=asyncio.FIRST_COMPLETED)
+        winner = done.pop()
+        if winner.exception() is not None and pending:
+            return await pending.pop()
+        for task in pending:
+            task.cancel()
+        return winner.result()
+
+    async def acall(self, call: Callable[[], Any], messages: List[BaseMessage]) -> ChatResult:
+        if not self.breaker.allow():
+            return self._degraded()
+        estimated = _estimate_tokens(messages)
+        for attempt in range(self.retry.max_retries + 1):
+            wait = self._reserve(estimated)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                result = await self._ahedged(call)
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_aborted()
+                    raise
+                # Başka bir çağrı devreyi açtıysa beklemeden sabit yanıta dönülür
+                if attempt == self.retry.max_retries or self.breaker.is_open:
+                    self.breaker.record_failure()
+                    logging.error("LLM çağrısı %d denemede başarısız: %s", attempt + 1, e)
+                    return self._degraded()
+                delay = self.retry.delay(attempt, _retry_after(e))
+                self._log_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            actual = _total_tokens(result)
+            if actual is not None:
+                self.token_bucket.adjust(actual - estimated)
+            return result
+        return self._degraded()
+
+    async def astream(self, stream: Callable[[], AsyncIterator[ChatGenerationChunk]],
+                      messages: List[BaseMessage]) -> AsyncIterator[ChatGenerationChunk]:
+        if not self.breaker.allow():
+            yield _degraded_chunk(self._degraded())
+            return
+        estimated = _estimate_tokens(messages)
+        for attempt in range(self.retry.max_retries + 1):
+            wait = self._reserve(estimated)
+            if wait:
+                await asyncio.sleep(wait)
+            started = False
+            try:
+                async for chunk in stream():
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started or not is_retryable(e):
+                    self.breaker.record_aborted()
+                    raise
+                # Başka bir çağrı devreyi açtıysa beklemeden sabit yanıta dönülür
+                if attempt == self.retry.max_retries or self.breaker.is_open:
+                    self.breaker.record_failure()
+                    yield _degraded_chunk(self._degraded())
+                    return
+                delay = self.retry.delay(attempt, _retry_after(e))
+                self._log_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return
+
+
+def _degraded_chunk(result: ChatResult) -> ChatGenerationChunk:
+    message = result.generations[0].message
+    return ChatGenerationChunk(
+        message=AIMessageChunk(content=message.content, response_metadata=message.response_metadata)
+    )
+
+
+class ResilientChatGroq(ChatGroq):
+    """Çağrılarını paylaşılan bir LLMGuard üzerinden yapan ChatGroq.
+
+    Doğrudan değil create_chat_model() ile oluşturulmalıdır; guard ve havuzlu HTTP
+    istemcisi yapıcı argümanı olarak verilmez ki LLM önbelleği anahtarı değişmesin.
+
+    langchain_core cache= önbelleğine yalnızca invoke/generate yolunda bakar. Akış modunda
+    (AGENT_STREAMING) da önbellekten yararlanmak için stream/astream, önbellekte kayıt varsa
+    akışı atlayıp yanıtı invoke ile önbellekten tek parça döndürür; yoksa akıtılan yanıtı
+    birleştirip önbelleğe yazar. Anahtar invoke yolundakiyle aynıdır.
+    """
+
+    _guard: Optional[LLMGuard] = PrivateAttr(default=None)
+
+    def _stream_cache_key(self, input: Any, stop: Optional[List[str]], kwargs: Any
+                          ) -> Tuple[Optional[SQLiteLLMCache], str, str]:
+        if not isinstance(self.cache, SQLiteLLMCache):
+            return None, "", ""
+        messages = self._convert_input(input).to_messages()
+        return self.cache, dumps(messages), self._get_llm_string(stop=stop, **kwargs)
+
+    @staticmethod
+    def _cached_generation(chunks: List[BaseMessageChunk]) -> List[ChatGeneration]:
+        merged = chunks[0]
+        for chunk in chunks[1:]:
+            merged = merged + chunk
+        return [ChatGeneration(message=message_chunk_to_message(merged))]
+
+    def stream(self, input: Any, config: Optional[dict] = None, *, stop: Optional[List[str]] = None,
+               **kwargs: Any) -> Iterator[BaseMessageChunk]:
+        cache, prompt, llm_string = self._stream_cache_key(input, stop, kwargs)
+        if cache is None:
+            yield from super().stream(input, config, stop=stop, **kwargs)
+            return
+        if cache.peek(prompt, llm_string):
+            yield self.invoke(input, config, stop=stop, **kwargs)
+            return
+        chunks = []
+        try:
+            for chunk in super().stream(input, config, stop=stop, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            if chunks:
+                cache.update(prompt, llm_string, self._cached_generation(chunks))
+        finally:
+            # Hata veya yarıda bırakılan akışta update'e ulaşılmaz; ölçüm kaydı sızmasın
+            cache.discard(prompt, llm_string)
+
+    async def astream(self, input: Any, config: Optional[dict] = None, *, stop: Optional[List[str]] = None,
+                      **kwargs: Any) -> AsyncIterator[BaseMessageChunk]:
+        cache, prompt, llm_string = self._stream_cache_key(input, stop, kwargs)
+        if cache is None:
+            async for chunk in super().astream(input, config, stop=stop, **kwargs):
+                yield chunk
+            return
+        if await asyncio.to_thread(cache.peek, prompt, llm_string):
+            # İsabette akış yoktur; langchain_core'un akışsız modeller için yaptığı gibi tek mesaj döner
+            yield await self.ainvoke(input, config, stop=stop, **kwargs)
+            return
+        chunks = []
+        try:
+            async for chunk in super().astream(input, config, stop=stop, **kwargs):
+                chunks.append(chunk)
+                yield chunk
+            if chunks:
+                await asyncio.to_thread(cache.update, prompt, llm_string, self._cached_generation(chunks))
+        finally:
+            cache.discard(prompt, llm_string)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        call = lambda: super(ResilientChatGroq, self)._generate(messages, stop, run_manager, **kwargs)  # noqa: E731
+        return self._guard.call(call, messages) if self._guard else call()
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        call = lambda: super(ResilientChatGroq, self)._agenerate(messages, stop, run_manager, **kwargs)  # noqa: E731
+        return await (self._guard.acall(call, messages) if self._guard else call())
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        stream = lambda: super(ResilientChatGroq, self)._stream(messages, stop, run_manager, **kwargs)  # noqa: E731
+        yield from (self._guard.stream(stream, messages) if self._guard else stream())
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        stream = lambda: super(ResilientChatGroq, self)._astream(messages, stop, run_manager, **kwargs)  # noqa: E731
+        async for chunk in (self._guard.astream(stream, messages) if self._guard else stream()):
+            yield chunk
+
+
+_shared_guard: Optional[LLMGuard] = None
+_shared_http_client: Optional[httpx.Client] = None
+_shared_lock = threading.Lock()
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def get_llm_guard() -> LLMGuard:
+    """Süreç genelinde paylaşılan LLMGuard'ı döndürür (ortam değişkenleriyle yapılandırılır).
+
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE: hız sınırları (0: sınırsız)
+    LLM_MAX_RETRIES: LLM çağrısı başına yeniden deneme sayısı
+    LLM_HEDGE_AFTER: hedge isteği için bekleme süresi (saniye, tanımsız: kapalı)
+    LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET_SECONDS: devre kesici ayarları
+    """
+    global _shared_guard
+    with _shared_lock:
+        if _shared_guard is None:
+            hedge_after = _env_float("LLM_HEDGE_AFTER", 0.0)
+            _shared_guard = LLMGuard(
+                requests_per_minute=_env_float("LLM_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE),
+                tokens_per_minute=_env_float("LLM_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE),
+                retry=RetryPolicy(max_retries=int(_env_float("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(_env_float("LLM_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD)),
+                    reset_timeout=_env_float("LLM_BREAKER_RESET_SECONDS", DEFAULT_BREAKER_RESET_SECONDS),
+                ),
+                hedge_after=hedge_after or None,
+            )
+        return _shared_guard
+
+
+def get_http_client() -> httpx.Client:
+    """Tüm LLM istemcilerinin paylaştığı keep-alive bağlantı havuzu (LLM_POOL_SIZE)."""
+    global _shared_http_client
+    with _shared_lock:
+        if _shared_http_client is None:
+            pool_size = int(_env_float("LLM_POOL_SIZE", DEFAULT_POOL_SIZE))
+            _shared_http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+        return _shared_http_client
+
+
+def create_chat_model(groq_api_key: Optional[str] = None, guard: Optional[LLMGuard] = None,
+                      **kwargs: Any) -> ResilientChatGroq:
+    """Paylaşılan guard ve bağlantı havuzunu kullanan bir ResilientChatGroq oluşturur.
+
+    Args:
+        groq_api_key: Groq API anahtarı.
+        guard: Opsiyonel LLMGuard; verilmezse süreç genelindeki guard kullanılır.
+        **kwargs: ChatGroq argümanları (model, temperature, cache, base_url ...).
+
+    Returns:
+        ResilientChatGroq: Dayanıklı sohbet modeli.
+    """
+    # SDK'nın kendi yeniden denemeleri kapatılır; denemeler LLMGuard'da yönetilir
+    kwargs.setdefault("max_retries", 0)
+    llm = ResilientChatGroq(groq_api_key=groq_api_key, **kwargs)
+    llm._guard = guard or get_llm_guard()
+    # Havuzlu istemci sonradan atanır; yapıcı argümanı olsaydı önbellek anahtarına girerdi
+    llm.client = groq.Groq(
+        api_key=llm.groq_api_key.get_secret_value() if llm.groq_api_key else None,
+        base_url=llm.groq_api_base,
+        timeout=llm.request_timeout,
+        max_retries=0,
+        http_client=get_http_client(),
+        default_headers=llm.default_headers,
+    ).chat.completions
+    return llm
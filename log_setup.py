@@ -0,0 +1,236 @@
+import atexit
+import contextlib
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+import zlib
+from typing import Any, Dict, Iterator, Optional
+
+# Sıcak yoldan dosya/stdout G/Ç'sini alan yapılandırılmış loglama:
+#   - Çağrılar %s biçiminde tembel yapılır; seviye kapalıysa veya kayıt örneklemeyle
+#     düşürülürse mesaj hiç biçimlendirilmez.
+#   - Kayıtlar istek thread'inde yalnızca kuyruğa eklenir (QueueHandler); biçimlendirme ve
+#     yazma QueueListener thread'inde yapılır.
+#   - Çıktı varsayılan olarak JSON-lines'tır; her kayıt oturum ve tur kimliği taşır.
+#     LOG_FORMAT=console ile eski Türkçe okunabilir satır biçimi kullanılır.
+#   - "tools" logger'ının INFO/DEBUG kayıtları LOG_TOOL_SAMPLE_RATE oranında tur bazında
+#     örneklenir; uyarı ve hatalar her zaman yazılır.
+
+CONSOLE_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Yüksek hacimli araç logları bu logger ve alt logger'ları altında toplanır
+TOOL_LOGGER = "tools"
+
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_session_id", default=None)
+_turn_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("log_turn_id", default=None)
+
+# LogRecord'un standart alanları; geri kalanlar (extra=...) JSON çıktısına eklenir
+_RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "session_id", "turn_id"}
+# Kuyrukta biçimlendirilmeden bekleyebilen argüman türleri; kayıt yazılana kadar değişemezler
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+# Kuyruğa sığ kopyası konan argüman türleri (araç sonuçları her çağrıda yeni sözlük olarak kurulur)
+_COPIED_ARGS = (dict, list)
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def current_session_id() -> Optional[str]:
+    """Etkin log_context bloğunun oturum kimliği (yoksa None)."""
+    return _session_id.get()
+
+
+@contextlib.contextmanager
+def log_context(session_id: Optional[str] = None, turn_id: Optional[str] = None) -> Iterator[None]:
+    """Blok boyunca üretilen kayıtlara oturum/tur kimliği ekler.
+
+    Args:
+        session_id: Oturum kimliği (None ise mevcut değer korunur).
+        turn_id: Tur kimliği (None ise yeni kimlik üretilir).
+    """
+    tokens = []
+    if session_id is not None:
+        tokens.append((_session_id, _session_id.set(session_id)))
+    tokens.append((_turn_id, _turn_id.set(turn_id or new_id())))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Kayda çağıran bağlamın oturum/tur kimliklerini ekler (kuyruğa girmeden önce)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session_id = _session_id.get()
+        record.turn_id = _turn_id.get()
+        return True
+
+
+class ToolSamplingFilter(logging.Filter):
+    """Araç loglarının INFO/DEBUG kayıtlarını örnekler.
+
+    Karar tur kimliğinden türetilir; bir turun araç logları ya hep birlikte tutulur ya da
+    hep birlikte düşer, böylece tutulan turlar eksiksiz izlenebilir.
+    """
+
+    def __init__(self, rate: float, logger_name: str = TOOL_LOGGER):
+        super().__init__()
+        self.rate = rate
+        self.prefix = logger_name + "."
+        self.logger_name = logger_name
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if record.name != self.logger_name and not record.name.startswith(self.prefix):
+            return True
+        turn_id = getattr(record, "turn_id", None) or _turn_id.get()
+        if turn_id is None:
+            return random.random() < self.rate
+        return (zlib.crc32(turn_id.encode()) % 10000) < self.rate * 10000
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Mesajı biçimlendirmeden kuyruğa ekleyen QueueHandler.
+
+    Standart QueueHandler.prepare mesajı çağıran thread'de biçimlendirir; burada msg/args
+    kuyruğa olduğu gibi konur ve biçimlendirme dinleyici thread'inde yapılır. Sözlük ve
+    liste argümanlarının sığ kopyası alınır; çağıran aynı nesneyi sonradan değiştirse de
+    kayıt loglandığı andaki içeriği yazar. Kopyalanamayan diğer nesneler (ör. model
+    nesneleri) için mesaj hemen biçimlendirilir. İstisna bilgisi traceback nesnesi
+    thread'ler arasında taşınmasın diye metne çevrilir.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, _COPIED_ARGS):
+            # Tek sözlük argümanı LogRecord tarafından args'ın kendisi yapılır
+            record.args = args.copy()
+        elif args:
+            snapshot = []
+            for arg in args:
+                if isinstance(arg, _IMMUTABLE_ARGS):
+                    snapshot.append(arg)
+                elif isinstance(arg, _COPIED_ARGS):
+                    snapshot.append(arg.copy())
+                else:
+                    record.msg, snapshot = record.getMessage(), None
+                    break
+            record.args = tuple(snapshot) if snapshot is not None else None
+        if record.exc_info:
+            record = copy.copy(record)
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık JSON nesnesine çevirir."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "session_id": getattr(record, "session_id", None),
+            "turn_id": getattr(record, "turn_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Türkçe okunabilir satır biçimi; tur kimliği varsa satır sonuna eklenir."""
+
+    def __init__(self):
+        super().__init__(CONSOLE_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        turn_id = getattr(record, "turn_id", None)
+        if turn_id:
+            line += f" [oturum={getattr(record, 'session_id', None) or '-'} tur={turn_id}]"
+        return line
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                  log_file: Optional[str] = None,
+                  tool_sample_rate: Optional[float] = None) -> logging.handlers.QueueListener:
+    """Kök logger'ı kuyruk tabanlı, yapılandırılmış loglama için bir kez yapılandırır.
+
+    Parametreler verilmezse LOG_LEVEL (varsayılan INFO), LOG_FORMAT (json | console,
+    varsayılan json), LOG_FILE (varsayılan: stderr) ve LOG_TOOL_SAMPLE_RATE (varsayılan 1.0)
+    ortam değişkenleri kullanılır.
+
+    Returns:
+        QueueListener: Yazma işini yapan dinleyici (süreç sonunda shutdown_logging ile durdurulur).
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        level = level or os.getenv("LOG_LEVEL", "INFO")
+        fmt = fmt or os.getenv("LOG_FORMAT", "json")
+        log_file = log_file or os.getenv("LOG_FILE")
+        if tool_sample_rate is None:
+            tool_sample_rate = float(os.getenv("LOG_TOOL_SAMPLE_RATE", 1.0))
+
+        output: logging.Handler = (logging.FileHandler(log_file, encoding="utf-8") if log_file
+                                   else logging.StreamHandler(sys.stderr))
+        output.setFormatter(ConsoleFormatter() if fmt == "console" else JsonFormatter())
+
+        queue_handler = LazyQueueHandler(queue.SimpleQueue())
+        # Filtreler çağıran thread'de çalışır: bağlam kimlikleri orada okunur, örneklenen
+        # kayıtlar kuyruğa hiç girmez
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(ToolSamplingFilter(tool_sample_rate))
+
+        # Çıktı biçimleri çağıran thread/süreç bilgisini kullanmaz; LogRecord oluşturma
+        # maliyetini azaltmak için toplanmaz (logging HOWTO, "Optimization")
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging() -> None:
+    """Kuyruktaki kayıtları yazıp dinleyiciyi durdurur (birden fazla çağrılabilir)."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
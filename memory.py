@@ -0,0 +1,194 @@
+import logging
+import math
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from store_index import get_store_index
+
+# Token bütçeli konuşma hafızası: son turlar bütçe dolana kadar olduğu gibi tutulur,
+# bütçeyi aşan eski turlar artımlı olarak güncellenen bir özete katlanır. Sipariş
+# numarası, e-posta ve şehir gibi varlıklar özetten bağımsız olarak sabitlenir.
+
+DEFAULT_MAX_TOKENS = 1500
+DEFAULT_SUMMARY_MAX_TOKENS = 300
+# Her varlık türü için tutulacak en fazla değer (en yeniler)
+MAX_ENTITIES_PER_KIND = 5
+# Özete eklenen tek bir satırın en fazla uzunluğu (karakter)
+SUMMARY_LINE_CHARS = 160
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_ORDER_ID_RE = re.compile(r"(?<!\d)\d{6}(?!\d)")
+_EMAIL_RE = re.compile(r"[\w.%+\-]+@[\w.\-]+\.[a-zA-Z]{2,}")
+
+_ROLE_LABELS = {"user": "Kullanıcı", "assistant": "Asistan"}
+
+Summarizer = Callable[[str, str, str], str]
+
+
+def count_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısını hesaplar.
+
+    Llama tokenizer'ı olmadan hızlı bir tahmin: her kelime ~4 karakterde bir token,
+    her noktalama işareti bir token sayılır.
+    """
+    return sum(math.ceil(len(token) / 4) for token in _TOKEN_RE.findall(text))
+
+
+def extractive_summarizer(summary: str, role: str, content: str) -> str:
+    """Eski bir turu özete ilk cümlesiyle ekler (LLM çağrısı yapmaz)."""
+    first_sentence = _SENTENCE_END_RE.split(content.strip(), maxsplit=1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    line = f"- {_ROLE_LABELS.get(role, role)}: {first_sentence}"
+    return f"{summary}\n{line}" if summary else line
+
+
+def make_llm_summarizer(llm) -> Summarizer:
+    """Özeti bir LLM ile artımlı olarak güncelleyen summarizer oluşturur.
+
+    Args:
+        llm: invoke() destekleyen bir sohbet modeli.
+
+    Returns:
+        Summarizer: (mevcut özet, rol, içerik) -> yeni özet.
+    """
+    def summarize(summary: str, role: str, content: str) -> str:
+        prompt = (
+            "Aşağıdaki konuşma özetini yeni mesajla güncelle. Sipariş numaraları, tarihler ve "
+            "kullanıcı tercihlerini koru, en fazla birkaç kısa madde yaz.\n\n"
+            f"Mevcut özet:\n{summary or '(boş)'}\n\n"
+            f"Yeni mesaj ({_ROLE_LABELS.get(role, role)}): {content}\n\nGüncel özet:"
+        )
+        try:
+            return llm.invoke(prompt).content.strip()
+        except Exception as e:
+            logging.warning("LLM özetleme başarısız, çıkarımsal özete dönülüyor: %s", e)
+            return extractive_summarizer(summary, role, content)
+
+    return summarize
+
+
+@dataclass
+class _Turn:
+    role: str
+    content: str
+    tokens: int
+    message: BaseMessage
+
+
+class ConversationMemory:
+    """Token bütçeli, özetleyen ve varlıkları sabitleyen konuşma hafızası.
+
+    Her mesajda yalnızca yeni mesaj işlenir; geçmiş baştan kurulmaz.
+
+    Args:
+        max_tokens: Son turlar için ayrılan token bütçesi.
+        summary_max_tokens: Özetin en fazla token sayısı; aşılırsa en eski satırlar atılır.
+        summarizer: (özet, rol, içerik) -> yeni özet fonksiyonu; varsayılan çıkarımsal özetleyici.
+    """
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS,
+                 summary_max_tokens: int = DEFAULT_SUMMARY_MAX_TOKENS,
+                 summarizer: Optional[Summarizer] = None):
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer or extractive_summarizer
+        self.summary = ""
+        self.entities: Dict[str, List[str]] = {"order_ids": [], "emails": [], "locations": []}
+        self._turns: Deque[_Turn] = deque()
+        self._recent_tokens = 0
+        self._context_message: Optional[SystemMessage] = None
+        self._lock = threading.Lock()
+
+    @property
+    def recent_tokens(self) -> int:
+        return self._recent_tokens
+
+    def add_user_message(self, content: str) -> None:
+        self._add("user", content, HumanMessage(content=content))
+
+    def add_ai_message(self, content: str) -> None:
+        self._add("assistant", content, AIMessage(content=content))
+
+    def _add(self, role: str, content: str, message: BaseMessage) -> None:
+        tokens = count_tokens(content)
+        with self._lock:
+            self._turns.append(_Turn(role, content, tokens, message))
+            self._recent_tokens += tokens
+            changed = self._extract_entities(content)
+            # Bütçe aşıldıysa en eski turları özete katla (en son tur her zaman kalır)
+            while self._recent_tokens > self.max_tokens and len(self._turns) > 1:
+                turn = self._turns.popleft()
+                self._recent_tokens -= turn.tokens
+                self.summary = self._trim_summary(self.summarizer(self.summary, turn.role, turn.content))
+                changed = True
+            if changed:
+                self._context_message = None
+
+    def _extract_entities(self, content: str) -> bool:
+        found = {
+            "order_ids": _ORDER_ID_RE.findall(content),
+            "emails": _EMAIL_RE.findall(content),
+            "locations": [],
+        }
+        place = get_store_index().resolve_location(content)
+        if place is not None and place.kind != "coordinate":
+            found["locations"].append(place.name)
+
+        changed = False
+        for kind, values in found.items():
+            pinned = self.entities[kind]
+            for value in values:
+                if pinned and pinned[-1] == value:
+                    continue
+                if value in pinned:
+                    pinned.remove(value)
+                pinned.append(value)
+                changed = True
+            del pinned[:-MAX_ENTITIES_PER_KIND]
+        return changed
+
+    def _trim_summary(self, summary: str) -> str:
+        lines = summary.splitlines()
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _build_context_message(self) -> Optional[SystemMessage]:
+        parts = []
+        if self.summary:
+            parts.append(f"Önceki konuşmanın özeti:\n{self.summary}")
+        labels = {"order_ids": "Sipariş numaraları", "emails": "E-posta adresleri", "locations": "Konumlar"}
+        pinned = [f"- {labels[kind]}: {', '.join(values)}" for kind, values in self.entities.items() if values]
+        if pinned:
+            parts.append("Konuşmada geçen bilgiler:\n" + "\n".join(pinned))
+        return SystemMessage(content="\n\n".join(parts)) if parts else None
+
+    def messages(self) -> List[BaseMessage]:
+        """Agent'a verilecek chat_history listesini döndürür.
+
+        Özet ve sabitlenen varlıklar tek bir SystemMessage olarak başa eklenir;
+        mesaj nesneleri eklendikleri anda oluşturulup yeniden kullanılır.
+        """
+        with self._lock:
+            if self._context_message is None and (self.summary or any(self.entities.values())):
+                self._context_message = self._build_context_message()
+            history: List[BaseMessage] = [turn.message for turn in self._turns]
+            if self._context_message is not None:
+                history.insert(0, self._context_message)
+            return history
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "recent_turns": len(self._turns),
+                "recent_tokens": self._recent_tokens,
+                "summary_tokens": count_tokens(self.summary),
+                "entities": {kind: list(values) for kind, values in self.entities.items()},
+            }
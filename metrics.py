@@ -0,0 +1,218 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from metrics_callback import AgentMetricsCallback
+
+# Agent ölçümleri: LLM gecikmesi, ilk token süresi, token sayıları, araç gecikmesi/hataları,
+# iterasyon ve yeniden deneme sayıları. Veriler histogram olarak tutulur ve Prometheus
+# metin formatında veya JSON-lines dosyasına aktarılır.
+
+# Saniye cinsinden gecikme kovaları
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192)
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 8, 13)
+# Yüzdelik hesaplamak için her histogramda tutulan son gözlem sayısı
+RESERVOIR_SIZE = 2048
+
+LabelKey = FrozenSet[Tuple[str, str]]
+
+
+class Histogram:
+    """Kovalı histogram; yüzdelikler son gözlemlerden (reservoir) hesaplanır."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._recent: Deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self._recent.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class MetricsRegistry:
+    """Etiketli sayaç ve histogramların thread-safe kaydı."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = frozenset(labels.items())
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels: str) -> None:
+        key = frozenset(labels.items())
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            self._buckets.setdefault(name, buckets)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Tüm metriklerin p50/p90/p99 dahil anlık görüntüsünü döndürür."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in self._counters.items() for key, value in series.items()
+            ]
+            histograms = [
+                {
+                    "name": name, "labels": dict(key), "count": h.count, "sum": round(h.sum, 6),
+                    "p50": h.percentile(0.5), "p90": h.percentile(0.9), "p99": h.percentile(0.99),
+                }
+                for name, series in self._histograms.items() for key, h in series.items()
+            ]
+        return {"timestamp": time.time(), "counters": counters, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        """Metrikleri Prometheus metin formatında döndürür."""
+        def fmt_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+            merged = {**labels, **(extra or {})}
+            if not merged:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(merged.items())) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{fmt_labels(dict(key))} {value}")
+            for name, series in self._histograms.items():
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in series.items():
+                    labels = dict(key)
+                    cumulative = 0
+                    for bound, count in zip(h.buckets, h.bucket_counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt_labels(labels, {'le': str(bound)})} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt_labels(labels, {'le': '+Inf'})} {h.count}")
+                    lines.append(f"{name}_sum{fmt_labels(labels)} {h.sum}")
+                    lines.append(f"{name}_count{fmt_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry
+
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("/metrics", ""):
+            self.send_error(404)
+            return
+        body = self.registry.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Her scrape isteğini loglamaya gerek yok
+        pass
+
+
+def start_prometheus_server(registry: MetricsRegistry, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """/metrics uç noktasını arka plan thread'inde sunar."""
+    handler = type("MetricsHandler", (_MetricsRequestHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logging.info("Prometheus metrikleri http://%s:%s/metrics adresinde sunuluyor", host, port)
+    return server
+
+
+class JsonLinesExporter:
+    """Metrik anlık görüntülerini belirli aralıklarla JSON-lines dosyasına ekler."""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 60.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+
+    def start(self) -> "JsonLinesExporter":
+        self._thread.start()
+        logging.info("Metrikler %g sn aralıkla %s dosyasına yazılıyor", self.interval, self.path)
+        return self
+
+    def export(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.registry.snapshot(), ensure_ascii=False) + "\n")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.export()
+            except OSError:
+                logging.exception("Metrikler %s dosyasına yazılamadı", self.path)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.export()
+
+
+_registry = MetricsRegistry()
+_callback: Optional["AgentMetricsCallback"] = None
+_callback_lock = threading.Lock()
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Süreç genelinde paylaşılan metrik kaydını döndürür."""
+    return _registry
+
+
+def get_metrics_callback() -> "AgentMetricsCallback":
+    """Paylaşılan kayda yazan agent callback'ini döndürür (ilk çağrıda langchain_core yüklenir)."""
+    global _callback
+    if _callback is None:
+        with _callback_lock:
+            if _callback is None:
+                from metrics_callback import AgentMetricsCallback
+                _callback = AgentMetricsCallback(_registry)
+    return _callback
+
+
+def setup_metrics_exporters() -> None:
+    """Ortam değişkenlerine göre dışa aktarıcıları bir kez başlatır.
+
+    METRICS_PORT tanımlıysa Prometheus /metrics uç noktası, METRICS_JSONL_PATH tanımlıysa
+    METRICS_EXPORT_INTERVAL (varsayılan 60 sn) aralıkla JSON-lines dosyası yazılır.
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        port = os.getenv("METRICS_PORT")
+        if port:
+            start_prometheus_server(_registry, int(port))
+        jsonl_path = os.getenv("METRICS_JSONL_PATH")
+        if jsonl_path:
+            JsonLinesExporter(_registry, jsonl_path, float(os.getenv("METRICS_EXPORT_INTERVAL", 60))).start()
@@ -0,0 +1,144 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from metrics import COUNT_BUCKETS, TOKEN_BUCKETS, MetricsRegistry
+
+# AgentExecutor çalışmalarını metrics.py kaydına yazan LangChain callback'i. langchain_core'u
+# yüklediği için ayrı modüldedir; giriş noktaları metrics.py'yi LLM yığını olmadan içe aktarır
+# ve bu modül ilk get_metrics_callback() çağrısında yüklenir.
+
+
+class AgentMetricsCallback(BaseCallbackHandler):
+    """AgentExecutor çalışmalarını ölçen callback.
+
+    invoke/astream_events çağrılarına config={"callbacks": [...]} ile verilmelidir;
+    executor yapıcısına verilen callback'ler alt LLM/araç çalışmalarına aktarılmaz.
+    """
+
+    # Asenkron yolda thread'e aktarılmadan, olay döngüsünde doğrudan çalıştırılır
+    run_inline = True
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._llm_runs: Dict[UUID, Dict[str, Any]] = {}
+        self._tool_runs: Dict[UUID, Tuple[str, float]] = {}
+        self._agent_runs: Dict[UUID, Dict[str, Any]] = {}
+
+    # --- LLM ---
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._llm_runs[run_id] = {"start": time.perf_counter(), "first_token": None}
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_chat_model_start(serialized, prompts, run_id=run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._llm_runs.get(run_id)
+            if run is None or run["first_token"] is not None:
+                return
+            run["first_token"] = time.perf_counter()
+        self.registry.observe("llm_time_to_first_token_seconds", run["first_token"] - run["start"])
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+        self.registry.observe("llm_latency_seconds", time.perf_counter() - run["start"])
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens or completion_tokens:
+            self.registry.observe("llm_prompt_tokens", prompt_tokens, buckets=TOKEN_BUCKETS)
+            self.registry.observe("llm_completion_tokens", completion_tokens, buckets=TOKEN_BUCKETS)
+            self.registry.inc("llm_prompt_tokens_total", prompt_tokens)
+            self.registry.inc("llm_completion_tokens_total", completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._llm_runs.pop(run_id, None)
+        self.registry.inc("llm_errors_total", error=type(error).__name__)
+
+    # --- Araçlar ---
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        with self._lock:
+            self._tool_runs[run_id] = (name, time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._tool_runs.pop(run_id, None)
+        if run is not None:
+            self.registry.observe("tool_latency_seconds", time.perf_counter() - run[1], tool=run[0])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._tool_runs.pop(run_id, None)
+        name = run[0] if run else "unknown"
+        if run is not None:
+            self.registry.observe("tool_latency_seconds", time.perf_counter() - run[1], tool=name)
+        self.registry.inc("tool_errors_total", tool=name)
+
+    # --- Agent turu ---
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       **kwargs: Any) -> None:
+        if parent_run_id is None:
+            with self._lock:
+                self._agent_runs[run_id] = {"start": time.perf_counter(), "steps": set(), "tool_calls": 0,
+                                            "model_answered": True}
+
+    def on_agent_action(self, action, *, run_id: UUID, **kwargs: Any) -> None:
+        # Aynı model yanıtından çıkan araç çağrıları aynı mesajı paylaşır; iterasyon
+        # sayısı bu mesajlardan, araç çağrısı sayısı ise eylemlerden hesaplanır.
+        message_log = getattr(action, "message_log", None)
+        step_key = message_log[0].id if message_log and message_log[0].id else id(action)
+        with self._lock:
+            run = self._agent_runs.get(run_id)
+            if run is not None:
+                run["steps"].add(step_key)
+                run["tool_calls"] += 1
+
+    def on_agent_finish(self, finish, *, run_id: UUID, **kwargs: Any) -> None:
+        # Doğrudan yanıt (ParallelAgentExecutor._get_tool_return) ve return_direct araçlarında
+        # tur araç sonucuyla biter; bu AgentFinish'lerin log'u boştur ve ek bir model çağrısı yoktur
+        if not finish.log:
+            with self._lock:
+                run = self._agent_runs.get(run_id)
+                if run is not None:
+                    run["model_answered"] = False
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_agent_run(run_id, error=None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_agent_run(run_id, error=error)
+
+    def _finish_agent_run(self, run_id: UUID, error: Optional[BaseException]) -> None:
+        with self._lock:
+            run = self._agent_runs.pop(run_id, None)
+        if run is None:
+            return
+        self.registry.observe("agent_turn_latency_seconds", time.perf_counter() - run["start"])
+        # Araç adımlarına ek olarak nihai yanıtı model ürettiyse o son iterasyon da sayılır
+        final_iteration = 1 if run["model_answered"] and error is None else 0
+        self.registry.observe("agent_iterations", len(run["steps"]) + final_iteration, buckets=COUNT_BUCKETS)
+        self.registry.observe("agent_tool_calls", run["tool_calls"], buckets=COUNT_BUCKETS)
+        self.registry.inc("agent_turns_total", status="error" if error else "ok")
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt_tokens += metadata.get("input_tokens", 0)
+            completion_tokens += metadata.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
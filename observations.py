@@ -0,0 +1,126 @@
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Araç sonuçlarının agent_scratchpad'e yazılmadan önce sıkıştırılması. Araçlar ve arayüz tam
+# sonucu görmeye devam eder (intermediate_steps değişmez); yalnızca LLM'e geri giden metin
+# küçültülür: tekrar eden alanlar ve alanların zaten taşıdığı bilgiyi yineleyen "message"
+# metinleri atılır, anahtarlar kısaltılır, uzun listeler ve metinler kırpılır, JSON boşluksuz
+# yazılır.
+
+# Gözlemdeki listelerin LLM'e giden en fazla eleman sayısı
+MAX_LIST_ITEMS = 10
+# Gözlemdeki tek bir metnin LLM'e giden en fazla uzunluğu (karakter)
+MAX_TEXT_CHARS = 400
+
+_KM_RE = re.compile(r"\d+(?:[.,]\d+)?")
+
+Compactor = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _km(distance: Any) -> Any:
+    """"Yaklaşık 2.8 km" -> 2.8; sayı bulunamazsa metni olduğu gibi bırakır."""
+    match = _KM_RE.search(distance) if isinstance(distance, str) else None
+    return float(match.group().replace(",", ".")) if match else distance
+
+
+def _mentions_all(text: Any, values: List[Any]) -> bool:
+    return isinstance(text, str) and all(str(value) in text for value in values)
+
+
+def _cap(value: Any) -> Any:
+    """Listeleri MAX_LIST_ITEMS, metinleri MAX_TEXT_CHARS ile sınırlar; boş alanları atar."""
+    if isinstance(value, dict):
+        return {key: _cap(item) for key, item in value.items() if item is not None and item != ""}
+    if isinstance(value, (list, tuple)):
+        items = [_cap(item) for item in value[:MAX_LIST_ITEMS]]
+        if len(value) > MAX_LIST_ITEMS:
+            items.append(f"+{len(value) - MAX_LIST_ITEMS} daha")
+        return items
+    if isinstance(value, str) and len(value) > MAX_TEXT_CHARS:
+        return value[:MAX_TEXT_CHARS].rstrip() + "…"
+    return value
+
+
+def _compact_generic(result: Dict[str, Any]) -> Dict[str, Any]:
+    # "success" adı korunur; prompt ve gözlemi okuyan modeller bu anahtara bakar
+    return dict(result)
+
+
+def _compact_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    compact = {"id": order.get("order_id"), "status": order.get("status"),
+               "eta": order.get("estimated_delivery"), "tracking": order.get("tracking_number")}
+    # Bulunamayan siparişin mesajı durumu yineler; yalnızca başka bilgi yoksa tutulur
+    if order.get("message") and not order.get("status"):
+        compact["message"] = order["message"]
+    return compact
+
+
+def _compact_order_statuses(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {"orders": [_compact_order(order) for order in result.get("orders", [])]}
+
+
+def _compact_appointment(result: Dict[str, Any]) -> Dict[str, Any]:
+    if result.get("success"):
+        # Onay mesajı tarih/saat/servis alanlarını yineler
+        return {"success": True, "id": result.get("appointment_id"), "service": result.get("service_type"),
+                "date": result.get("date"), "time": result.get("time"), "end": result.get("end_time")}
+    compact = {"success": False, "message": result.get("message")}
+    alternatives = result.get("alternatives") or []
+    # Önerilen saatler mesaj metninde zaten listeleniyorsa tekrar gönderilmez
+    if alternatives and not _mentions_all(result.get("message"),
+                                          [f"{slot.get('date')} {slot.get('time')}" for slot in alternatives]):
+        compact["alt"] = [f"{slot.get('date')} {slot.get('time')}" for slot in alternatives]
+    return compact
+
+
+def _compact_store(store: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": store.get("name"), "addr": store.get("address"), "tel": store.get("phone"),
+            "hours": store.get("working_hours"), "km": _km(store.get("distance"))}
+
+
+def _compact_nearest_store(result: Dict[str, Any]) -> Dict[str, Any]:
+    if result.get("success"):
+        # "Size en yakın mağazamız: ad, adres" mesajı mağaza alanlarını yineler
+        return {"success": True, "store": _compact_store({**result.get("store", {}), "distance": result.get("distance")}),
+                "alt": [_compact_store(other) for other in result.get("alternatives", [])]}
+    compact = _compact_generic({key: value for key, value in result.items() if key != "stores_available"})
+    cities = result.get("stores_available") or []
+    if cities and not _mentions_all(result.get("message"), cities):
+        compact["cities"] = cities
+    return compact
+
+
+DEFAULT_COMPACTORS: Dict[str, Compactor] = {
+    "get_order_status": lambda result: {
+        key: value for key, value in _compact_order(result).items() if key != "id"},
+    "get_order_statuses": _compact_order_statuses,
+    "schedule_appointment": _compact_appointment,
+    "find_nearest_store": _compact_nearest_store,
+}
+
+
+def compact_observation(tool: str, observation: Any,
+                        compactors: Optional[Dict[str, Compactor]] = None) -> Any:
+    """Bir araç sonucunu LLM'e gidecek kısa metne çevirir.
+
+    Args:
+        tool: Aracın adı.
+        observation: Aracın döndürdüğü (tam) sonuç.
+        compactors: Araç adına göre sıkıştırıcılar; tanımsız araçlar için genel kurallar uygulanır.
+
+    Returns:
+        Any: Sözlük sonuçlar için boşluksuz JSON metni; diğer sonuçlar kırpılmış olarak.
+    """
+    if isinstance(observation, str):
+        return _cap(observation)
+    if not isinstance(observation, dict):
+        return observation
+    compactor = (DEFAULT_COMPACTORS if compactors is None else compactors).get(tool, _compact_generic)
+    try:
+        compact = compactor(observation)
+    except Exception:
+        logging.exception("Araç sonucu sıkıştırılamadı: %s", tool)
+        compact = observation
+    return json.dumps(_cap(compact), ensure_ascii=False, separators=(",", ":"))
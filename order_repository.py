@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Sipariş durumu sorguları için depo (repository) katmanı. Araçlar yalnızca bu
+# arayüzü bilir; arka uç (bellek içi mock veya SQLite) ortam değişkeniyle seçilir.
+
+# Mock veri: veritabanı yapılandırılmamışsa bellek içi depo bununla başlar
+MOCK_ORDERS: Dict[str, Dict[str, Any]] = {
+    "123456": {"status": "Hazırlanıyor", "estimated_delivery": "2025-05-15"},
+    "867530": {"status": "Kargoya Verildi", "estimated_delivery": "2025-05-22",
+               "tracking_number": "TR123456789"},
+}
+
+DEFAULT_POOL_SIZE = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    estimated_delivery TEXT,
+    tracking_number TEXT
+) WITHOUT ROWID
+"""
+
+# Sorgu metinleri sabit tutulur; sqlite3 modülü bunları bağlantı başına hazırlanmış
+# (prepared) ifade olarak önbelleğe alır. Toplu sorgu, id sayısından bağımsız olarak
+# tek bir ifadeyle json_each üzerinden çalışır.
+_SELECT_ONE = "SELECT order_id, status, estimated_delivery, tracking_number FROM orders WHERE order_id = ?"
+_SELECT_MANY = ("SELECT order_id, status, estimated_delivery, tracking_number FROM orders "
+                "WHERE order_id IN (SELECT value FROM json_each(?))")
+_INSERT = ("INSERT OR REPLACE INTO orders (order_id, status, estimated_delivery, tracking_number) "
+           "VALUES (?, ?, ?, ?)")
+
+
+def _row_to_order(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    order = {"status": row[1], "estimated_delivery": row[2]}
+    if row[3]:
+        order["tracking_number"] = row[3]
+    return order
+
+
+class OrderRepository(ABC):
+    """Sipariş durumlarına erişim arayüzü."""
+
+    @abstractmethod
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Tek bir siparişin durumunu döndürür; bulunamazsa None."""
+
+    @abstractmethod
+    def get_many(self, order_ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Birden fazla siparişi tek seferde sorgular; bulunamayanlar None olur."""
+
+
+class InMemoryOrderRepository(OrderRepository):
+    """Sözlük tabanlı depo; geliştirme ve testler için."""
+
+    def __init__(self, orders: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._orders = dict(MOCK_ORDERS if orders is None else orders)
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        order = self._orders.get(order_id)
+        return dict(order) if order is not None else None
+
+    def get_many(self, order_ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {order_id: self.get(order_id) for order_id in order_ids}
+
+
+class SQLiteConnectionPool:
+    """WAL modunda açılmış, thread'ler arasında paylaşılan SQLite bağlantı havuzu.
+
+    Args:
+        database_path: SQLite dosyasının yolu.
+        size: Havuzdaki bağlantı sayısı.
+    """
+
+    def __init__(self, database_path: str, size: int = DEFAULT_POOL_SIZE):
+        self.database_path = database_path
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database_path, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Havuzdan bir bağlantı ödünç alır; blok bitince geri koyar."""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class SQLiteOrderRepository(OrderRepository):
+    """SQLite tabanlı depo; okumalar havuzlanmış bağlantılar üzerinden yapılır.
+
+    Args:
+        database_path: SQLite dosyasının yolu (yoksa oluşturulur).
+        pool_size: Bağlantı havuzu boyutu.
+    """
+
+    def __init__(self, database_path: str, pool_size: int = DEFAULT_POOL_SIZE):
+        self.pool = SQLiteConnectionPool(database_path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.execute(_SCHEMA)
+            conn.commit()
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            row = conn.execute(_SELECT_ONE, (order_id,)).fetchone()
+        return _row_to_order(row) if row else None
+
+    def get_many(self, order_ids: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        results: Dict[str, Optional[Dict[str, Any]]] = {order_id: None for order_id in order_ids}
+        if not results:
+            return results
+        with self.pool.connection() as conn:
+            rows = conn.execute(_SELECT_MANY, (json.dumps(list(results)),)).fetchall()
+        for row in rows:
+            results[row[0]] = _row_to_order(row)
+        return results
+
+    def upsert_many(self, orders: Iterable[Tuple[str, str, Optional[str], Optional[str]]],
+                    batch_size: int = 50000) -> int:
+        """Siparişleri toplu olarak ekler/günceller (order_id, status, estimated_delivery, tracking_number).
+
+        Returns:
+            int: Yazılan kayıt sayısı.
+        """
+        written = 0
+        batch: List[Tuple[str, str, Optional[str], Optional[str]]] = []
+        with self.pool.connection() as conn:
+            for order in orders:
+                batch.append(order)
+                if len(batch) >= batch_size:
+                    conn.executemany(_INSERT, batch)
+                    conn.commit()
+                    written += len(batch)
+                    batch.clear()
+            if batch:
+                conn.executemany(_INSERT, batch)
+                conn.commit()
+                written += len(batch)
+        return written
+
+
+_repository: Optional[OrderRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_order_repository() -> OrderRepository:
+    """Süreç genelinde paylaşılan sipariş deposunu döndürür.
+
+    ORDER_DB_PATH tanımlıysa SQLite deposu (ORDER_DB_POOL_SIZE bağlantılı havuzla),
+    aksi halde mock verili bellek içi depo kullanılır.
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                database_path = os.getenv("ORDER_DB_PATH")
+                if database_path:
+                    pool_size = int(os.getenv("ORDER_DB_POOL_SIZE", DEFAULT_POOL_SIZE))
+                    _repository = SQLiteOrderRepository(database_path, pool_size=pool_size)
+                    logging.info("Sipariş deposu: SQLite (%s, havuz=%s)", database_path, pool_size)
+                else:
+                    _repository = InMemoryOrderRepository()
+    return _repository
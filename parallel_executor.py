@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.callbacks import AsyncCallbackManagerForChainRun, CallbackManagerForChainRun
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+
+from direct_answer import DirectAnswer, resolve_direct_answer
+from metrics import get_metrics
+
+# Modelin tek turda ürettiği birden fazla araç çağrısını eşzamanlı çalıştıran executor.
+# Sonuçlar, agent_scratchpad'in deterministik kalması için çağrı sırasıyla döndürülür.
+
+DEFAULT_MAX_TOOL_WORKERS = 4
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+
+def _timeout_observation(tool_name: str, timeout: float) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "message": f"{tool_name} aracı {timeout:g} saniye içinde yanıt vermedi. Lütfen daha sonra tekrar deneyin.",
+    }
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """Aynı adımdaki bağımsız araç çağrılarını sınırlı bir thread havuzunda çalıştırır.
+
+    Senkron yolda çağrılar paylaşılan bir ThreadPoolExecutor'a gönderilir; asenkron yolda
+    AgentExecutor zaten asyncio.gather kullandığından yalnızca zaman aşımı eklenir.
+    Zaman aşımına uğrayan araç için agent'a hata gözlemi döner (thread arka planda biter).
+
+    Args:
+        max_tool_workers: Eşzamanlı çalışabilecek en fazla araç çağrısı.
+        tool_timeout: Varsayılan araç zaman aşımı (saniye).
+        tool_timeouts: Araç adına göre özel zaman aşımları.
+        direct_answers: Araç adına göre doğrudan yanıt şablonları; adımda tek araç
+            çağrılmış ve sonuç şablonu karşılıyorsa ikinci LLM turu yapılmaz.
+        observation_compactor: (araç adı, sonuç) -> LLM'e gidecek gözlem; verilirse araç
+            sonuçları agent_scratchpad'e sıkıştırılarak yazılır. intermediate_steps çıktısı
+            ve doğrudan yanıtlar tam sonucu kullanmaya devam eder.
+    """
+
+    max_tool_workers: int = DEFAULT_MAX_TOOL_WORKERS
+    tool_timeout: float = DEFAULT_TOOL_TIMEOUT
+    tool_timeouts: Dict[str, float] = {}
+    direct_answers: Dict[str, DirectAnswer] = {}
+    observation_compactor: Optional[Callable[[str, Any], Any]] = None
+
+    _pool: Optional[ThreadPoolExecutor] = PrivateAttr(default=None)
+    _pool_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_tool_workers,
+                                                    thread_name_prefix="agent-tool")
+        return self._pool
+
+    def _timeout_for(self, tool_name: str) -> float:
+        return self.tool_timeouts.get(tool_name, self.tool_timeout)
+
+    def _prepare_intermediate_steps(self, intermediate_steps: List[Tuple[AgentAction, Any]]
+                                    ) -> List[Tuple[AgentAction, Any]]:
+        # Yalnızca plan'a (prompt'a) giden kopya sıkıştırılır
+        steps = super()._prepare_intermediate_steps(intermediate_steps)
+        if self.observation_compactor is None:
+            return steps
+        return [(action, self.observation_compactor(action.tool, observation)) for action, observation in steps]
+
+    def _get_tool_return(self, next_step_output: tuple) -> Optional[AgentFinish]:
+        # AgentExecutor bunu yalnızca adımda tek araç çağrısı varsa sorar
+        answer = resolve_direct_answer(self.direct_answers, next_step_output)
+        if answer is None:
+            return super()._get_tool_return(next_step_output)
+        get_metrics().inc("direct_answers_total", tool=next_step_output[0].tool)
+        return_values = self._action_agent.return_values
+        return AgentFinish({return_values[0] if return_values else "output": answer}, "")
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> AgentStep:
+        # Araç hemen havuza gönderilir; gözlem yerine Future döner, _iter_next_step
+        # aynı adımdaki tüm çağrılar gönderildikten sonra sonuçları sırayla toplar.
+        context = contextvars.copy_context()
+        future = self._get_pool().submit(
+            context.run,
+            super()._perform_agent_action,
+            name_to_tool_map,
+            color_mapping,
+            agent_action,
+            run_manager,
+        )
+        return AgentStep(action=agent_action, observation=future)
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[tuple],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending: List[tuple] = []
+        for output in super()._iter_next_step(
+            name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager
+        ):
+            if isinstance(output, AgentStep) and isinstance(output.observation, Future):
+                pending.append((output, time.monotonic() + self._timeout_for(output.action.tool)))
+            else:
+                yield output
+
+        # Zaman aşımı her çağrının gönderildiği andan itibaren sayılır
+        for step, deadline in pending:
+            timeout = self._timeout_for(step.action.tool)
+            try:
+                yield step.observation.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                step.observation.cancel()
+                logging.warning("Araç zaman aşımına uğradı: %s (%ss)", step.action.tool, timeout)
+                yield AgentStep(action=step.action, observation=_timeout_observation(step.action.tool, timeout))
+
+    async def _aperform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> AgentStep:
+        timeout = self._timeout_for(agent_action.tool)
+        try:
+            return await asyncio.wait_for(
+                super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logging.warning("Araç zaman aşımına uğradı: %s (%ss)", agent_action.tool, timeout)
+            return AgentStep(action=agent_action, observation=_timeout_observation(agent_action.tool, timeout))
@@ -0,0 +1,322 @@
+import atexit
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Kullanıcı profili güncellemeleri için arkadan yazmalı (write-behind) kuyruk. Araç güncellemeyi
+# doğrular, kuyruğa ekler ve hemen iyimser bir onay döndürür; tur süresi CRM gecikmesine bağlı
+# kalmaz. Arka plan thread'i:
+#   1. Aynı kullanıcının aynı alanına gelen ardışık güncellemeleri son değerde birleştirir,
+#   2. Birleşen güncellemeleri toplu olarak SQLite outbox tablosuna yazar,
+#   3. Outbox'taki bekleyen kayıtları CRM'e gönderir; hata olursa üstel geri çekilmeyle yeniden dener.
+# Outbox varsayılan olarak data/profile_outbox.db dosyasındadır (PROFILE_OUTBOX_PATH ile değişir);
+# gönderilemeyen kayıtlar yeniden başlatmadan sonra da gönderilir. Henüz outbox'a yazılmamış
+# güncellemeler (en fazla bir flush aralığı) süreç çökerse kaybolabilir; normal kapanışta atexit
+# ile outbox'a yazılır ve zamanı gelenler DEFAULT_DRAIN_TIMEOUT süresince CRM'e gönderilir.
+
+DEFAULT_OUTBOX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "profile_outbox.db")
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BASE_DELAY = 2.0
+# Kapanışta bekleyen kayıtların CRM'e gönderilmesi için ayrılan en fazla süre (saniye)
+DEFAULT_DRAIN_TIMEOUT = 10.0
+# Yeniden deneme gecikmesinin üst sınırı (saniye)
+MAX_RETRY_DELAY = 300.0
+
+# Durumlar: queued (bellekte, birleştirilebilir) -> pending (outbox'ta) -> sent | failed;
+# gönderilmeden yerine daha yeni bir değer gelen outbox kaydı superseded olur.
+QUEUED, PENDING, SENT, FAILED, SUPERSEDED = "queued", "pending", "sent", "failed", "superseded"
+
+# RFC 5322'nin pratikte kullanılan alt kümesi: noktayla ayrılmış atom yerel kısım, en az iki
+# etiketli alan adı ve harflerden oluşan üst düzey alan. Tırnaklı yerel kısım ve IP adresli
+# alan adları kabul edilmez.
+_ATOM = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+_LABEL = r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+_EMAIL_RE = re.compile(rf"(?P<local>{_ATOM}(?:\.{_ATOM})*)@(?P<domain>(?:{_LABEL}\.)+[A-Za-z]{{2,63}})")
+MAX_EMAIL_LENGTH = 254
+MAX_LOCAL_PART_LENGTH = 64
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS profile_outbox (
+        update_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS profile_outbox_due ON profile_outbox (status, next_attempt_at)",
+    "CREATE INDEX IF NOT EXISTS profile_outbox_user ON profile_outbox (user_id, field, created_at)",
+)
+_SUPERSEDE = ("UPDATE profile_outbox SET status = 'superseded', updated_at = ? "
+              "WHERE user_id = ? AND field = ? AND status = 'pending'")
+_INSERT = ("INSERT INTO profile_outbox (update_id, user_id, field, value, status, next_attempt_at, "
+           "created_at, updated_at) VALUES (?, ?, ?, ?, 'pending', ?, ?, ?)")
+_SELECT_DUE = ("SELECT update_id, user_id, field, value, attempts FROM profile_outbox "
+               "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?")
+_MARK_SENT = "UPDATE profile_outbox SET status = 'sent', attempts = attempts + 1, updated_at = ? WHERE update_id = ?"
+_MARK_RETRY = ("UPDATE profile_outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, "
+               "last_error = ?, updated_at = ? WHERE update_id = ?")
+_SELECT_LATEST = ("SELECT update_id, value, status, attempts, last_error, updated_at FROM profile_outbox "
+                  "WHERE user_id = ? AND field = ? ORDER BY created_at DESC LIMIT 1")
+
+# CRM'e tek bir güncellemeyi gönderen fonksiyon: (user_id, alan, değer); hata durumunda istisna fırlatır
+Sender = Callable[[str, str, str], None]
+
+
+def validate_email(email: str) -> Optional[str]:
+    """E-posta adresini doğrular ve normalleştirir (alan adı küçük harfe çevrilir).
+
+    Args:
+        email: Kullanıcının verdiği adres.
+
+    Returns:
+        Optional[str]: Geçerliyse normalleştirilmiş adres, değilse None.
+    """
+    email = (email or "").strip()
+    match = _EMAIL_RE.fullmatch(email)
+    if not match or len(email) > MAX_EMAIL_LENGTH or len(match.group("local")) > MAX_LOCAL_PART_LENGTH:
+        return None
+    return f"{match.group('local')}@{match.group('domain').lower()}"
+
+
+def mock_crm_sender(user_id: str, field: str, value: str) -> None:
+    """Yavaş CRM API'sini taklit eder (CRM_LATENCY saniye bekler)."""
+    time.sleep(float(os.getenv("CRM_LATENCY", "0.5")))
+    logging.info("CRM güncellendi: kullanıcı=%s %s=%s", user_id, field, value)
+
+
+def dry_run_sender(user_id: str, field: str, value: str) -> None:
+    """Güncellemeyi CRM'e göndermeden yalnızca loglar (toplu tekrar oynatma gibi deneme çalışmaları için)."""
+    logging.info("CRM'e gönderilmedi (deneme çalışması): kullanıcı=%s %s=%s", user_id, field, value)
+
+
+@dataclass
+class _QueuedUpdate:
+    update_id: str
+    value: str
+    enqueued_at: float
+
+
+class ProfileOutbox:
+    """Profil güncellemelerini birleştiren, outbox'a toplu yazan ve CRM'e ileten kuyruk.
+
+    Args:
+        database_path: Outbox SQLite dosyası (":memory:" ise süreç içi, kalıcı değil).
+        drain_timeout: Kapanışta zamanı gelen kayıtları göndermek için en fazla süre (saniye);
+            süre dolarsa kalanlar outbox'ta bekler ve sonraki açılışta gönderilir.
+        sender: CRM'e tek bir güncellemeyi gönderen fonksiyon.
+        flush_interval: Kuyruğun outbox'a yazılma ve bekleyenlerin gönderilme aralığı (saniye).
+        batch_size: Bir turda gönderilecek en fazla outbox kaydı.
+        max_attempts: Bir kaydın failed sayılmadan önceki en fazla gönderim denemesi.
+        retry_base_delay: Üstel geri çekilmenin taban gecikmesi (saniye).
+    """
+
+    def __init__(self, database_path: str = DEFAULT_OUTBOX_PATH, sender: Optional[Sender] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 drain_timeout: float = DEFAULT_DRAIN_TIMEOUT):
+        self.sender = sender or mock_crm_sender
+        self.drain_timeout = drain_timeout
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.stats = {"submitted": 0, "coalesced": 0, "flushed": 0, "sent": 0, "retried": 0, "failed": 0}
+
+        # Tek bağlantı: yazımlar yalnızca arka plan thread'inden, durum okumaları kilitle
+        if database_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        if database_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        self._queued: Dict[Tuple[str, str], _QueuedUpdate] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, user_id: str, field: str, value: str) -> str:
+        """Güncellemeyi kuyruğa ekler ve hemen döner.
+
+        Aynı kullanıcı/alan için henüz outbox'a yazılmamış bir güncelleme varsa yeni değer
+        onun yerine geçer.
+
+        Returns:
+            str: Güncelleme kimliği.
+        """
+        update = _QueuedUpdate(uuid.uuid4().hex[:16], value, time.time())
+        with self._cond:
+            if (user_id, field) in self._queued:
+                self.stats["coalesced"] += 1
+            self._queued[(user_id, field)] = update
+            self.stats["submitted"] += 1
+        self.start()
+        return update.update_id
+
+    def start(self) -> None:
+        """Arka plan thread'ini (henüz çalışmıyorsa) başlatır."""
+        with self._cond:
+            if self._worker is None and not self._stopping:
+                self._worker = threading.Thread(target=self._run, name="profile-outbox", daemon=True)
+                self._worker.start()
+
+    def status(self, user_id: str, field: str) -> Optional[Dict[str, Any]]:
+        """Kullanıcının alanı için en son güncellemenin durumu; hiç güncelleme yoksa None."""
+        with self._cond:
+            queued = self._queued.get((user_id, field))
+            if queued is not None:
+                return {"update_id": queued.update_id, "value": queued.value, "status": QUEUED, "attempts": 0}
+        with self._db_lock:
+            row = self._conn.execute(_SELECT_LATEST, (user_id, field)).fetchone()
+        if row is None:
+            return None
+        update_id, value, status, attempts, last_error, _ = row
+        result = {"update_id": update_id, "value": value, "status": status, "attempts": attempts}
+        if last_error:
+            result["last_error"] = last_error
+        return result
+
+    def flush(self) -> int:
+        """Kuyruktaki birleşmiş güncellemeleri tek işlemde outbox'a yazar.
+
+        Returns:
+            int: Yazılan kayıt sayısı.
+        """
+        with self._cond:
+            batch, self._queued = self._queued, {}
+        if not batch:
+            return 0
+        now = time.time()
+        superseded = 0
+        with self._db_lock:
+            for (user_id, field), update in batch.items():
+                # Gönderilmemiş eski değer CRM'e hiç gitmez
+                superseded += self._conn.execute(_SUPERSEDE, (now, user_id, field)).rowcount
+                self._conn.execute(_INSERT, (update.update_id, user_id, field, update.value,
+                                             now, update.enqueued_at, now))
+            self._conn.commit()
+        self.stats["flushed"] += len(batch)
+        self.stats["coalesced"] += superseded
+        return len(batch)
+
+    def dispatch(self) -> int:
+        """Zamanı gelen outbox kayıtlarını CRM'e gönderir.
+
+        Returns:
+            int: Başarıyla gönderilen kayıt sayısı.
+        """
+        with self._db_lock:
+            due = self._conn.execute(_SELECT_DUE, (time.time(), self.batch_size)).fetchall()
+        sent = 0
+        for update_id, user_id, field, value, attempts in due:
+            try:
+                self.sender(user_id, field, value)
+            except Exception as e:
+                attempts += 1
+                failed = attempts >= self.max_attempts
+                delay = min(self.retry_base_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                delay *= random.uniform(0.5, 1.0)
+                now = time.time()
+                with self._db_lock:
+                    self._conn.execute(_MARK_RETRY, (FAILED if failed else PENDING, now + delay, str(e),
+                                                     now, update_id))
+                    self._conn.commit()
+                self.stats["failed" if failed else "retried"] += 1
+                logging.warning("CRM güncellemesi başarısız (%s, deneme %d): %s", update_id, attempts, e)
+                continue
+            with self._db_lock:
+                self._conn.execute(_MARK_SENT, (time.time(), update_id))
+                self._conn.commit()
+            sent += 1
+        self.stats["sent"] += sent
+        return sent
+
+    def _has_due(self) -> bool:
+        with self._db_lock:
+            return self._conn.execute(_SELECT_DUE, (time.time(), 1)).fetchone() is not None
+
+    def _drain(self) -> None:
+        """Kuyruğu outbox'a yazar ve zamanı gelen kayıtları drain_timeout dolana kadar gönderir."""
+        self.flush()
+        deadline = time.monotonic() + self.drain_timeout
+        while time.monotonic() < deadline and self._has_due():
+            self.dispatch()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping:
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            try:
+                if stopping:
+                    self._drain()
+                    return
+                self.flush()
+                self.dispatch()
+            except Exception:
+                logging.exception("Profil outbox işlenirken hata oluştu")
+                if stopping:
+                    return
+
+    def close(self) -> None:
+        """Arka plan thread'ini durdurur; kuyrukta kalanları outbox'a yazıp CRM'e gönderir."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+        else:
+            self._drain()
+        with self._db_lock:
+            self._conn.close()
+
+
+_outbox: Optional[ProfileOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_profile_outbox() -> ProfileOutbox:
+    """Süreç genelinde paylaşılan profil outbox'ını döndürür.
+
+    Outbox PROFILE_OUTBOX_PATH (varsayılan data/profile_outbox.db) SQLite dosyasında (WAL)
+    tutulur; ":memory:" verilirse kalıcı değildir. PROFILE_FLUSH_INTERVAL ve
+    PROFILE_MAX_ATTEMPTS ile ayarlanır. PROFILE_OUTBOX_DRY_RUN=1 ile güncellemeler CRM'e
+    gönderilmez, yalnızca loglanır.
+    """
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = ProfileOutbox(
+                    os.getenv("PROFILE_OUTBOX_PATH", DEFAULT_OUTBOX_PATH),
+                    flush_interval=float(os.getenv("PROFILE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+                    max_attempts=int(os.getenv("PROFILE_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)),
+                    sender=dry_run_sender if os.getenv("PROFILE_OUTBOX_DRY_RUN", "0") != "0" else None,
+                )
+                atexit.register(_outbox.close)
+                # Önceki çalışmadan kalan gönderilmemiş kayıtlar beklemeden işlenir
+                _outbox.start()
+    return _outbox
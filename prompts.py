@@ -0,0 +1,78 @@
+import datetime
+from functools import lru_cache
+from typing import Callable, Optional
+
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from dates import WEEKDAYS, date_table, weekday_dates
+
+# Agent prompt'u iki parçadan oluşur:
+#   - SYSTEM_PROMPT: günden güne değişmeyen, bayt bazında sabit talimatlar. Sağlayıcıların
+#     prompt önbelleği bu öneki süreç boyunca yeniden kullanabilir.
+#   - date_context: bugün/yarın/hafta günü tarihlerini içeren küçük dinamik blok. Her turda
+#     enjekte edilen saatten (clock) hesaplanır ve gün başına bir kez oluşturulur.
+# Böylece executor bir kez kurulur ve gece yarısından sonra yeniden kurulmadan doğru kalır.
+
+SYSTEM_PROMPT = """Sen müşteri hizmetleri taleplerini karşılayan bir asistansın. Uygun aracı çağırarak kullanıcıya yardımcı ol.
+
+Fonksiyon çağırma kuralları:
+- Sipariş durumu sorularında get_order_status kullan
+- Birden fazla sipariş numarası sorulduğunda hepsini tek çağrıda get_order_statuses ile sorgula
+- E-posta güncelleme için update_user_email kullan
+- Kullanıcı e-posta güncellemesinin işlenip işlenmediğini sorarsa get_email_update_status kullan
+- Randevu oluşturma için schedule_appointment kullan. "Önümüzdeki salı", "yarın öğleden sonra" gibi tarih ve saat ifadelerini hesaplamadan olduğu gibi iletebilirsin; araç bunları kendisi çözer
+- En yakın mağaza sorguları için find_nearest_store kullan ve lokasyon olarak şehir adı belirt
+- Kullanıcının lokasyonu yoksa veya "Your Current Location" çağrısı yapıyorsan, bunun yerine lokasyon için kullanıcıdan bilgi iste
+
+Tarih kuralları:
+- Tüm tarihler YYYY-MM-DD formatında kullanılmalıdır
+- "Bugün", "yarın", "bu pazartesi", "önümüzdeki pazartesi" gibi ifadeler için "Tarih bilgisi" bölümündeki tarihleri kullan
+- Başka tarihleri hesaplarken de YYYY-MM-DD formatını koruyarak hesapla
+
+Geçersiz bir yanıt verme ve her zaman Türkçe konuş."""
+
+_DATE_CONTEXT_TEMPLATE = """Tarih bilgisi:
+- Bugünün tarihi: {today} ({today_name})
+- Yarının tarihi: {tomorrow}
+- Önümüzdeki/bu/gelecek hafta için tarihler:
+{weekday_lines}
+- "Önümüzdeki hafta" ifadesinde bir sonraki pazartesi ({next_monday}) olarak kabul et"""
+
+
+@lru_cache(maxsize=4)
+def date_context(today: datetime.date) -> str:
+    """Verilen gün için dinamik tarih bloğunu oluşturur (gün başına bir kez hesaplanır)."""
+    table = date_table(today)
+    weekday_lines = "\n".join(
+        f"  * {name.capitalize()}: {date}" for name, date in weekday_dates(today).items()
+    )
+    return _DATE_CONTEXT_TEMPLATE.format(
+        today=today.isoformat(),
+        today_name=WEEKDAYS[today.weekday()].capitalize(),
+        tomorrow=table["yarin"].isoformat(),
+        weekday_lines=weekday_lines,
+        next_monday=table["onumuzdeki hafta"].isoformat(),
+    )
+
+
+def build_prompt(clock: Optional[Callable[[], datetime.date]] = None,
+                 system_prompt: str = SYSTEM_PROMPT) -> ChatPromptTemplate:
+    """Sabit talimat öneki ve her turda güncellenen tarih bloğuyla agent prompt'u oluşturur.
+
+    Args:
+        clock: Bugünün tarihini döndüren fonksiyon (varsayılan: datetime.date.today).
+        system_prompt: Sabit sistem talimatları.
+
+    Returns:
+        ChatPromptTemplate: date_context değişkeni her biçimlendirmede clock'tan doldurulan prompt.
+    """
+    clock = clock or datetime.date.today
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        ("system", "{date_context}"),
+        MessagesPlaceholder(variable_name="chat_history", optional=True),
+        ("human", "{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ])
+    # Çağrılabilir kısmi değişken her tur yeniden değerlendirilir; hesaplama güne göre önbelleklidir
+    return prompt.partial(date_context=lambda: date_context(clock()))
@@ -0,0 +1,216 @@
+import re
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from store_index import get_store_index
+from text_utils import fold_turkish
+
+# LLM'e gitmeden çözülebilecek açık talepler için deterministik yönlendirici.
+# Eşleşme yeterince güvenilir değilse None döner ve istek agent'a bırakılır.
+
+DEFAULT_MIN_CONFIDENCE = 0.8
+
+# Desenler katlanmış (fold_turkish) metin üzerinde çalışır
+_ORDER_ID_RE = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+_ORDER_KEYWORD_RE = re.compile(r"\b(siparis|kargo|paket|teslimat)")
+_EMAIL_RE = re.compile(r"[a-z0-9._%+\-]+@[a-z0-9.\-]+\.[a-z]{2,}")
+_EMAIL_KEYWORD_RE = re.compile(r"\b(e-?posta|e-?mail|mail)")
+_EMAIL_VERB_RE = re.compile(r"\b(guncelle|degistir|degis|olarak|yap)")
+_STORE_KEYWORD_RE = re.compile(r"\b(magaza|sube)")
+_STORE_QUESTION_RE = re.compile(r"\b(nerede|en yakin|adres|bul)")
+# Bu kelimeler desteklenmeyen ya da farklı bir niyete işaret eder, agent'a bırakılır
+_AMBIGUOUS_RE = re.compile(r"\b(iptal|iade|degil|sikayet|neden|randevu)")
+
+@dataclass
+class RouteMatch:
+    """Bir yönlendirme kuralının eşleşme sonucu."""
+    route: str
+    tool_name: str
+    args: Dict[str, Any]
+    confidence: float
+
+
+@dataclass
+class RouterStats:
+    """Yönlendiricinin ne kadar LLM trafiğini azalttığını izleyen sayaçlar."""
+    total: int = 0
+    hits: Dict[str, int] = field(default_factory=dict)
+    low_confidence: Dict[str, int] = field(default_factory=dict)
+    confidence_sum: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def hit_rate(self) -> float:
+        return sum(self.hits.values()) / self.total if self.total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        routes = {}
+        for route in set(self.hits) | set(self.low_confidence):
+            hits = self.hits.get(route, 0)
+            routes[route] = {
+                "hits": hits,
+                "low_confidence": self.low_confidence.get(route, 0),
+                "hit_rate": hits / self.total if self.total else 0.0,
+                "avg_confidence": self.confidence_sum.get(route, 0.0) / hits if hits else 0.0,
+            }
+        return {"total": self.total, "hit_rate": self.hit_rate, "routes": routes}
+
+
+def _match_order_status(text: str) -> Optional[RouteMatch]:
+    order_ids = _ORDER_ID_RE.findall(text)
+    if not order_ids:
+        return None
+    has_keyword = bool(_ORDER_KEYWORD_RE.search(text))
+    unique_ids = list(dict.fromkeys(order_ids))
+    if len(unique_ids) > 1:
+        # Birden fazla sipariş numarası tek toplu çağrıyla sorgulanır
+        return RouteMatch("order_statuses", "get_order_statuses", {"order_ids": unique_ids},
+                          0.9 if has_keyword else 0.5)
+    return RouteMatch("order_status", "get_order_status", {"order_id": order_ids[0]},
+                      0.95 if has_keyword else 0.6)
+
+
+def _match_update_email(text: str) -> Optional[RouteMatch]:
+    emails = _EMAIL_RE.findall(text)
+    if not emails:
+        return None
+    confidence = 0.5
+    if _EMAIL_KEYWORD_RE.search(text):
+        confidence += 0.2
+    if _EMAIL_VERB_RE.search(text):
+        confidence += 0.2
+    if len(set(emails)) > 1:
+        confidence = 0.3
+    return RouteMatch("update_email", "update_user_email", {"new_email": emails[0]}, round(confidence, 2))
+
+
+def _match_nearest_store(text: str) -> Optional[RouteMatch]:
+    if not _STORE_KEYWORD_RE.search(text):
+        return None
+    # Şehir ve semt adları mağaza indeksindeki yerlerden ve takma adlarından çözülür
+    places = get_store_index().find_places(text)
+    districts = {place for place in places if place.kind == "district"}
+    if not places or len({place.city for place in places}) > 1 or len(districts) > 1:
+        # Konum yoksa agent kullanıcıdan konum istemeli; birden fazla konum belirsizdir
+        return None
+    confidence = 0.9 if _STORE_QUESTION_RE.search(text) else 0.7
+    place = districts.pop() if districts else places[0]
+    return RouteMatch("nearest_store", "find_nearest_store", {"location": place.name}, confidence)
+
+
+def _render_order_status(match: RouteMatch, result: Dict[str, Any]) -> Optional[str]:
+    if "estimated_delivery" not in result:
+        return result.get("message")
+    reply = (f"{match.args['order_id']} numaralı siparişinizin durumu: {result['status']}. "
+             f"Tahmini teslim tarihi: {result['estimated_delivery']}.")
+    if result.get("tracking_number"):
+        reply += f" Kargo takip numaranız: {result['tracking_number']}."
+    return reply
+
+
+def _render_order_statuses(match: RouteMatch, result: Dict[str, Any]) -> Optional[str]:
+    lines = []
+    for order in result.get("orders", []):
+        if "estimated_delivery" in order:
+            line = (f"- {order['order_id']}: {order['status']}, "
+                    f"tahmini teslim tarihi {order['estimated_delivery']}")
+            if order.get("tracking_number"):
+                line += f", kargo takip numarası {order['tracking_number']}"
+        else:
+            line = f"- {order['order_id']}: {order.get('message', order['status'])}"
+        lines.append(line)
+    if not lines:
+        return None
+    return "Siparişlerinizin durumu:\n" + "\n".join(lines)
+
+
+def _render_update_email(match: RouteMatch, result: Dict[str, Any]) -> Optional[str]:
+    return result.get("message")
+
+
+def _render_nearest_store(match: RouteMatch, result: Dict[str, Any]) -> Optional[str]:
+    if not result.get("success"):
+        return result.get("message")
+    store = result["store"]
+    return (f"{result['message']}. Telefon: {store['phone']}, "
+            f"çalışma saatleri: {store['working_hours']}.")
+
+
+# Kurallar sırayla denenir; en yüksek güvenli eşleşme seçilir
+_RULES: List[Callable[[str], Optional[RouteMatch]]] = [
+    _match_order_status,
+    _match_update_email,
+    _match_nearest_store,
+]
+
+_RENDERERS: Dict[str, Callable[[RouteMatch, Dict[str, Any]], Optional[str]]] = {
+    "order_status": _render_order_status,
+    "order_statuses": _render_order_statuses,
+    "update_email": _render_update_email,
+    "nearest_store": _render_nearest_store,
+}
+
+
+class IntentRouter:
+    """Açık talepleri LLM'e gitmeden ilgili araca yönlendirir.
+
+    Args:
+        tools: Yönlendirilebilecek araçlar (invoke(args) destekleyen, name alanı olan nesneler).
+        min_confidence: Hızlı yolun kullanılacağı en düşük güven skoru.
+    """
+
+    def __init__(self, tools, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.tools = {tool.name: tool for tool in tools}
+        self.min_confidence = min_confidence
+        self.stats = RouterStats()
+        self._lock = threading.Lock()
+
+    def match(self, text: str) -> Optional[RouteMatch]:
+        """Metni kurallarla eşleştirir, en güvenilir eşleşmeyi döndürür."""
+        folded = fold_turkish(text)
+        if _AMBIGUOUS_RE.search(folded):
+            return None
+        matches = [m for m in (rule(folded) for rule in _RULES) if m and m.tool_name in self.tools]
+        if not matches:
+            return None
+        matches.sort(key=lambda m: m.confidence, reverse=True)
+        # İki farklı niyet de güçlü eşleşiyorsa talep birleşik demektir, agent'a bırak
+        if len(matches) > 1 and matches[1].confidence >= self.min_confidence:
+            return None
+        return matches[0]
+
+    def try_handle(self, text: str) -> Optional[Dict[str, Any]]:
+        """Talebi hızlı yoldan yanıtlamayı dener.
+
+        Args:
+            text: Kullanıcı mesajı.
+
+        Returns:
+            Optional[Dict]: Eşleşme güvenilirse "output", "tool_calls", "route" ve
+            "confidence" içeren sözlük; aksi halde None (istek agent'a gider).
+        """
+        match = self.match(text)
+        with self._lock:
+            self.stats.total += 1
+            if match and match.confidence < self.min_confidence:
+                self.stats.low_confidence[match.route] = self.stats.low_confidence.get(match.route, 0) + 1
+        if not match or match.confidence < self.min_confidence:
+            return None
+
+        result = self.tools[match.tool_name].invoke(match.args)
+        output = _RENDERERS[match.route](match, result) if isinstance(result, dict) else None
+        if not output:
+            return None
+
+        with self._lock:
+            self.stats.hits[match.route] = self.stats.hits.get(match.route, 0) + 1
+            self.stats.confidence_sum[match.route] = self.stats.confidence_sum.get(match.route, 0.0) + match.confidence
+        logging.info("Hızlı yol kullanıldı: route=%s, confidence=%.2f, hit_rate=%.2f%%",
+                     match.route, match.confidence, self.stats.hit_rate * 100)
+        return {
+            "output": output,
+            "route": match.route,
+            "confidence": match.confidence,
+            "tool_calls": [{"tool": match.tool_name, "input": match.args, "output": result}],
+        }
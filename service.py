@@ -0,0 +1,330 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from agent import build_agent_executor
+from batch import serialize_steps
+from log_setup import log_context, new_id, setup_logging
+from metrics import get_metrics, get_metrics_callback, setup_metrics_exporters
+from router import IntentRouter
+from session_store import DEFAULT_PAGE_SIZE, DEFAULT_SESSION_DB_PATH, SessionStore, get_session_store
+from streaming import astream_agent_events
+from tools import tool_specs
+
+# Çok kullanıcılı ASGI servis giriş noktası (FastAPI). Terminal ve Streamlit ile aynı araçları,
+# prompt'u, hızlı yolu ve oturum deposunu kullanır; agent yalnızca ainvoke / astream_events ile
+# çalıştırılır. Engelleyen işler (araçlar, hızlı yol, oturum deposu) olay döngüsünün varsayılan
+# executor'ı olarak kurulan sınırlı bir thread havuzunda çalışır.
+#
+# Sıralama ve geri basınç (TurnGate):
+#   - Aynı oturumun turları geliş sırasıyla, birer birer çalışır (geçmiş her turda tutarlı).
+#     Bu sıralama süreç içidir: birden fazla worker'da yalnızca bir oturumun tüm istekleri
+#     aynı worker'a yönlendiriliyorsa (session-sticky) geçerlidir.
+#   - Aynı anda çalışan tur sayısı SERVICE_MAX_CONCURRENT_TURNS ile sınırlıdır.
+#   - Sırada bekleyen tur sayısı SERVICE_MAX_WAITING_TURNS'ü, bir oturumun bekleyen turları
+#     SERVICE_SESSION_MAX_PENDING'i aşarsa istek beklemeden 503 (Retry-After) ile reddedilir.
+#
+# Çalıştırma:
+#   uvicorn service:app --host 0.0.0.0 --port 8000
+
+DEFAULT_MAX_CONCURRENT_TURNS = 64
+DEFAULT_MAX_WAITING_TURNS = 256
+DEFAULT_SESSION_MAX_PENDING = 4
+DEFAULT_TOOL_WORKERS = 32
+# GET /sessions/{id}/messages ile tek seferde okunabilecek en fazla mesaj
+MAX_PAGE_SIZE = 100
+# Geri basınçla reddedilen isteklere önerilen bekleme süresi (saniye)
+RETRY_AFTER_SECONDS = 1
+
+
+class Overloaded(Exception):
+    """Tur kabul edilemedi; istemci Retry-After kadar bekleyip yeniden denemeli."""
+
+
+class _SessionSlot:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+
+class TurnGate:
+    """Oturum başına sıralama ile küresel eşzamanlılık ve bekleme sınırlarını uygular.
+
+    Args:
+        max_concurrent: Aynı anda çalışan en fazla tur.
+        max_waiting: Sırada bekleyebilecek en fazla tur (tüm oturumlar).
+        session_max_pending: Bir oturumun çalışan + bekleyen en fazla turu.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT_TURNS,
+                 max_waiting: int = DEFAULT_MAX_WAITING_TURNS,
+                 session_max_pending: int = DEFAULT_SESSION_MAX_PENDING):
+        self.max_waiting = max_waiting
+        self.session_max_pending = session_max_pending
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Tek olay döngüsünde çalışıldığından sayaçlar ve sözlük kilitsiz güncellenir
+        self._sessions: Dict[str, _SessionSlot] = {}
+
+    @asynccontextmanager
+    async def admit(self, session_id: str) -> AsyncIterator[None]:
+        """Oturumun sırası ve küresel bir çalışma yeri gelene kadar bekler.
+
+        Raises:
+            Overloaded: Bekleme sınırları doluysa (beklemeden).
+        """
+        slot = self._sessions.get(session_id)
+        if self.waiting >= self.max_waiting or (slot is not None and slot.pending >= self.session_max_pending):
+            get_metrics().inc("service_rejected_turns_total")
+            raise Overloaded()
+        if slot is None:
+            slot = self._sessions[session_id] = _SessionSlot()
+        slot.pending += 1
+        self.waiting += 1
+        waiting = True
+        try:
+            async with slot.lock, self._semaphore:
+                self.waiting -= 1
+                waiting = False
+                self.in_flight += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if waiting:
+                self.waiting -= 1
+            slot.pending -= 1
+            if slot.pending == 0:
+                self._sessions.pop(session_id, None)
+
+
+class ChatRequest(BaseModel):
+    message: str = Field(..., min_length=1, description="Kullanıcı mesajı")
+    session_id: Optional[str] = Field(None, description="Devam edilecek oturum; verilmezse yeni oturum açılır")
+
+
+class ChatService:
+    """Servisin paylaşılan bileşenleri ve tur çalıştırma mantığı.
+
+    Args:
+        agent_executor: ainvoke / astream_events destekleyen AgentExecutor.
+        session_store: Oturum mesajlarının tutulduğu depo.
+        router: Opsiyonel hızlı yol yönlendiricisi.
+        gate: Sıralama ve geri basınç kapısı.
+    """
+
+    def __init__(self, agent_executor, session_store: SessionStore,
+                 router: Optional[IntentRouter], gate: TurnGate):
+        self.agent_executor = agent_executor
+        self.session_store = session_store
+        self.router = router
+        self.gate = gate
+        self.run_config = {"callbacks": [get_metrics_callback()]}
+
+    async def _fast_path(self, message: str) -> Optional[Dict[str, Any]]:
+        if self.router is None:
+            return None
+        fast_result = await asyncio.to_thread(self.router.try_handle, message)
+        if fast_result:
+            get_metrics().inc("fast_path_hits_total", route=fast_result["route"])
+        return fast_result
+
+    async def _agent_input(self, session_id: str, message: str) -> Dict[str, Any]:
+        memory = await asyncio.to_thread(self.session_store.memory, session_id)
+        return {"input": message, "chat_history": memory.messages()}
+
+    async def _finish_turn(self, session_id: str, message: str, output: str, start: float) -> None:
+        await asyncio.to_thread(self.session_store.append_turn, session_id, message, output)
+        get_metrics().observe("service_turn_seconds", time.perf_counter() - start)
+
+    async def chat(self, session_id: str, message: str) -> Dict[str, Any]:
+        """Bir turu çalıştırır ve sonucu batch.py çıktısıyla aynı biçimde döndürür."""
+        start = time.perf_counter()
+        with log_context(session_id=session_id):
+            fast_result = await self._fast_path(message)
+            if fast_result:
+                turn = {"output": fast_result["output"], "route": fast_result["route"],
+                        "tool_calls": fast_result["tool_calls"]}
+            else:
+                result = await self.agent_executor.ainvoke(await self._agent_input(session_id, message),
+                                                           config=self.run_config)
+                turn = {"output": result["output"], "route": "agent",
+                        "tool_calls": [{"tool": step["tool"], "input": step["tool_input"],
+                                        "output": step["observation"]}
+                                       for step in serialize_steps(result.get("intermediate_steps", []))]}
+            await self._finish_turn(session_id, message, turn["output"], start)
+        return {"session_id": session_id, **turn}
+
+    async def stream(self, session_id: str, message: str) -> AsyncIterator[Dict[str, Any]]:
+        """Bir turu streaming.py olayları olarak akıtır; son olay "final"dir."""
+        start = time.perf_counter()
+        with log_context(session_id=session_id):
+            fast_result = await self._fast_path(message)
+            if fast_result:
+                for call in fast_result["tool_calls"]:
+                    yield {"type": "tool_start", "tool": call["tool"], "input": call["input"]}
+                    yield {"type": "tool_end", "tool": call["tool"], "output": call["output"]}
+                final = {"type": "final", "output": fast_result["output"], "route": fast_result["route"],
+                         "tool_calls": fast_result["tool_calls"]}
+            else:
+                final = {"type": "final", "output": "", "route": "agent", "tool_calls": []}
+                async for event in astream_agent_events(self.agent_executor,
+                                                        await self._agent_input(session_id, message),
+                                                        config=self.run_config):
+                    if event["type"] == "final":
+                        final["output"] = event["output"]
+                        final["tool_calls"] = [{"tool": step["tool"], "input": step["tool_input"],
+                                                "output": step["observation"]}
+                                               for step in serialize_steps(event["intermediate_steps"])]
+                    else:
+                        yield event
+            await self._finish_turn(session_id, message, final["output"], start)
+        yield {"session_id": session_id, **final}
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+class _GatedStreamingResponse(StreamingResponse):
+    """Gövde hiç okunmasa veya istemci erken ayrılsa da tur kapısını serbest bırakan akış yanıtı.
+
+    Args:
+        release: Yanıt bittiğinde (her çıkış yolunda) çağrılır; birden fazla çağrılabilir olmalıdır.
+    """
+
+    def __init__(self, content, release: Callable[[], Any], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._release()
+
+
+def _overloaded_response() -> JSONResponse:
+    return JSONResponse({"detail": "Servis şu anda yoğun, lütfen biraz sonra tekrar deneyin."},
+                        status_code=503, headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+
+def create_app(executor_factory: Optional[Callable[[], Any]] = None,
+               session_store: Optional[SessionStore] = None,
+               fast_path: Optional[bool] = None,
+               tool_workers: Optional[int] = None,
+               gate_factory: Optional[Callable[[], TurnGate]] = None) -> FastAPI:
+    """ASGI uygulamasını oluşturur.
+
+    Args:
+        executor_factory: Agent executor'ı kuran fonksiyon (varsayılan: GROQ_API_KEY ile build_agent_executor).
+        session_store: Oturum deposu (varsayılan: SESSION_DB_PATH veya data/sessions.db'deki SQLite deposu;
+            worker'lar oturumları bu dosyada paylaşır).
+        fast_path: Hızlı yol açık mı (varsayılan: FAST_PATH_ROUTER != "0").
+        tool_workers: Engelleyen işler için thread havuzu boyutu (varsayılan: SERVICE_TOOL_WORKERS).
+        gate_factory: TurnGate oluşturan fonksiyon (varsayılan: SERVICE_* ortam değişkenleri).
+
+    Returns:
+        FastAPI: Uygulama.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        load_dotenv()
+        setup_logging()
+        setup_metrics_exporters()
+        # Araçlar, hızlı yol ve oturum deposu bu sınırlı havuzda çalışır (asyncio.to_thread ve
+        # LangChain'in senkron araçlar için kullandığı run_in_executor varsayılan executor'ı kullanır)
+        workers = tool_workers or int(os.getenv("SERVICE_TOOL_WORKERS", DEFAULT_TOOL_WORKERS))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-blocking")
+        asyncio.get_running_loop().set_default_executor(pool)
+
+        factory = executor_factory or (lambda: build_agent_executor(os.getenv("GROQ_API_KEY")))
+        # Executor bir kez, başlangıçta kurulur (ilk isteğin gecikmesine eklenmesin)
+        agent_executor = await asyncio.to_thread(factory)
+        enabled = fast_path if fast_path is not None else os.getenv("FAST_PATH_ROUTER", "1") != "0"
+        gate = gate_factory() if gate_factory else TurnGate(
+            max_concurrent=int(os.getenv("SERVICE_MAX_CONCURRENT_TURNS", DEFAULT_MAX_CONCURRENT_TURNS)),
+            max_waiting=int(os.getenv("SERVICE_MAX_WAITING_TURNS", DEFAULT_MAX_WAITING_TURNS)),
+            session_max_pending=int(os.getenv("SERVICE_SESSION_MAX_PENDING", DEFAULT_SESSION_MAX_PENDING)),
+        )
+        app.state.chat = ChatService(agent_executor, session_store or get_session_store(DEFAULT_SESSION_DB_PATH),
+                                     IntentRouter(tool_specs()) if enabled else None, gate)
+        logging.info("Servis hazır (araç havuzu=%d)", workers)
+        yield
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    app = FastAPI(title="Müşteri Destek Chatbot", lifespan=lifespan)
+
+    @app.post("/chat")
+    async def chat(body: ChatRequest, request: Request):
+        service: ChatService = request.app.state.chat
+        session_id = body.session_id or new_id()
+        try:
+            async with service.gate.admit(session_id):
+                return await service.chat(session_id, body.message)
+        except Overloaded:
+            return _overloaded_response()
+        except Exception:
+            logging.exception("Tur çalıştırılırken hata oluştu (oturum=%s)", session_id)
+            raise HTTPException(status_code=500, detail="Üzgünüm, isteğinizi işlerken bir sorun oluştu.")
+
+    @app.post("/chat/stream")
+    async def chat_stream(body: ChatRequest, request: Request):
+        service: ChatService = request.app.state.chat
+        session_id = body.session_id or new_id()
+        # Sıra ve kapasite yanıt başlamadan alınır; böylece geri basınç 503 olarak döner
+        stack = AsyncExitStack()
+        try:
+            await stack.enter_async_context(service.gate.admit(session_id))
+        except Overloaded:
+            return _overloaded_response()
+
+        async def events() -> AsyncIterator[str]:
+            # Kapı hem burada hem yanıt bitince kapatılır; AsyncExitStack.aclose ikinci kez no-op'tur
+            try:
+                async for event in service.stream(session_id, body.message):
+                    yield _sse(event)
+            except Exception:
+                logging.exception("Akış sırasında hata oluştu (oturum=%s)", session_id)
+                yield _sse({"type": "error", "detail": "Üzgünüm, isteğinizi işlerken bir sorun oluştu."})
+            finally:
+                await stack.aclose()
+
+        return _GatedStreamingResponse(events(), release=stack.aclose, media_type="text/event-stream",
+                                       headers={"Cache-Control": "no-cache", "X-Session-Id": session_id})
+
+    @app.get("/sessions/{session_id}/messages")
+    async def session_messages(session_id: str, request: Request, before: Optional[int] = Query(None, ge=1),
+                               limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
+        service: ChatService = request.app.state.chat
+        messages = await asyncio.to_thread(service.session_store.page, session_id, before, limit)
+        return {"session_id": session_id,
+                "messages": [{"seq": m.seq, "role": m.role, "content": m.content, "created_at": m.created_at}
+                             for m in messages]}
+
+    @app.get("/healthz")
+    async def healthz(request: Request):
+        gate: TurnGate = request.app.state.chat.gate
+        return {"status": "ok", "in_flight": gate.in_flight, "waiting": gate.waiting}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return get_metrics().to_prometheus()
+
+    return app
+
+
+app = create_app()
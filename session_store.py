@@ -0,0 +1,293 @@
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from order_repository import SQLiteConnectionPool, DEFAULT_POOL_SIZE
+
+if TYPE_CHECKING:
+    # memory.py langchain_core'u yükler; giriş noktalarının açılışını yavaşlatmasın diye ilk hafızada içe aktarılır
+    from memory import ConversationMemory
+
+# Konuşma oturumları için paylaşılan depo. Mesajlar yalnızca eklenir (append-only); arayüz
+# geçmişi sayfa sayfa okur, agent'a giden hafıza ise oturum başına bir kez kurulup önbellekte
+# tutulur ve her turda yalnızca yeni mesajlarla artımlı güncellenir. Arka uç (bellek içi veya
+# SQLite) ortam değişkeniyle seçilir; SQLite ile oturumlar yeniden başlatmalardan ve birden
+# fazla uygulama kopyası arasında korunur.
+
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_MAX_CACHED_SESSIONS = 256
+# Önbellekte olmayan bir oturumun hafızası bu kadar son mesajdan kurulur; hafıza bütçesini
+# (MEMORY_MAX_TOKENS) ve özetin son satırlarını dolduracak kadardır
+DEFAULT_COLD_START_MESSAGES = 100
+# Kalıcı depo isteyen giriş noktalarının (service.py) SESSION_DB_PATH yoksa kullandığı dosya
+DEFAULT_SESSION_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sessions.db")
+# Bellek içi depoda tutulan en fazla oturum; aşılınca en uzun süre yazılmayan oturum silinir
+DEFAULT_MAX_SESSIONS = 10000
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        seq INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS messages_session_seq ON messages (session_id, seq)",
+)
+
+# seq tüm oturumlarda artan rowid'dir; eşzamanlı yazan kopyalar sıra çakışması yaşamaz
+_INSERT = "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)"
+_SELECT_PAGE = ("SELECT seq, role, content, created_at FROM messages "
+                "WHERE session_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?")
+_SELECT_SINCE = ("SELECT seq, role, content, created_at FROM messages "
+                 "WHERE session_id = ? AND seq > ? ORDER BY seq")
+_COUNT = "SELECT COUNT(*) FROM messages WHERE session_id = ?"
+
+# Sayfalamada "en yeni mesajdan itibaren" anlamına gelen üst sınır
+_NO_UPPER_BOUND = 2 ** 63 - 1
+
+
+def _default_memory() -> "ConversationMemory":
+    """MEMORY_MAX_TOKENS bütçeli yeni bir oturum hafızası."""
+    from memory import ConversationMemory, DEFAULT_MAX_TOKENS
+    return ConversationMemory(max_tokens=int(os.getenv("MEMORY_MAX_TOKENS", DEFAULT_MAX_TOKENS)))
+
+
+@dataclass(frozen=True)
+class StoredMessage:
+    seq: int
+    role: str
+    content: str
+    created_at: float
+
+
+class _CachedMemory:
+    """Önbellekteki bir oturum hafızası ve içine işlenen son mesajın sırası."""
+
+    def __init__(self, memory: "ConversationMemory"):
+        self.memory = memory
+        self.last_seq = 0
+        self.lock = threading.Lock()
+
+
+class SessionStore(ABC):
+    """Oturum mesajlarına erişim arayüzü.
+
+    Args:
+        memory_factory: Yeni bir oturum hafızası oluşturan fonksiyon.
+        max_cached_sessions: Hafızası bellekte tutulan en fazla oturum sayısı (LRU).
+        cold_start_messages: Hafıza ilk kez kurulurken işlenen en fazla son mesaj sayısı.
+    """
+
+    def __init__(self, memory_factory: Optional[Callable[[], "ConversationMemory"]] = None,
+                 max_cached_sessions: int = DEFAULT_MAX_CACHED_SESSIONS,
+                 cold_start_messages: int = DEFAULT_COLD_START_MESSAGES):
+        self.memory_factory = memory_factory or _default_memory
+        self.max_cached_sessions = max_cached_sessions
+        self.cold_start_messages = cold_start_messages
+        self._memories: "OrderedDict[str, _CachedMemory]" = OrderedDict()
+        self._memories_lock = threading.Lock()
+
+    @abstractmethod
+    def append(self, session_id: str, role: str, content: str) -> int:
+        """Oturuma bir mesaj ekler ve sırasını (seq) döndürür."""
+
+    @abstractmethod
+    def page(self, session_id: str, before_seq: Optional[int] = None,
+             limit: int = DEFAULT_PAGE_SIZE) -> List[StoredMessage]:
+        """before_seq'ten önceki en yeni `limit` mesajı eskiden yeniye sıralı döndürür."""
+
+    @abstractmethod
+    def since(self, session_id: str, after_seq: int) -> List[StoredMessage]:
+        """after_seq'ten sonra eklenen mesajları eskiden yeniye sıralı döndürür."""
+
+    @abstractmethod
+    def count(self, session_id: str) -> int:
+        """Oturumdaki mesaj sayısı."""
+
+    def append_turn(self, session_id: str, user_content: str, ai_content: str) -> None:
+        """Bir kullanıcı mesajı ve yanıtını oturuma ekler."""
+        self.append(session_id, "user", user_content)
+        self.append(session_id, "assistant", ai_content)
+
+    def memory(self, session_id: str) -> "ConversationMemory":
+        """Oturumun agent'a verilecek hafızasını döndürür.
+
+        Hafıza oturum ilk istendiğinde (yeniden başlatma veya önbellekten atılma sonrası)
+        depodaki en fazla cold_start_messages son mesajdan kurulur; daha eski mesajlar
+        özete ve sabitlenen varlıklara girmez, böylece açılış süresi konuşma uzunluğundan
+        bağımsızdır. Sonraki çağrılarda yalnızca son işlenen mesajdan sonra eklenenler
+        (başka bir kopyanın yazdıkları dahil) işlenir, geçmiş baştan dönüştürülmez.
+        """
+        with self._memories_lock:
+            cached = self._memories.get(session_id)
+            if cached is None:
+                cached = _CachedMemory(self.memory_factory())
+                self._memories[session_id] = cached
+                if len(self._memories) > self.max_cached_sessions:
+                    self._memories.popitem(last=False)
+            else:
+                self._memories.move_to_end(session_id)
+
+        with cached.lock:
+            if cached.last_seq == 0:
+                messages = self.page(session_id, limit=self.cold_start_messages)
+            else:
+                messages = self.since(session_id, cached.last_seq)
+            for message in messages:
+                if message.role == "user":
+                    cached.memory.add_user_message(message.content)
+                else:
+                    cached.memory.add_ai_message(message.content)
+                cached.last_seq = message.seq
+        return cached.memory
+
+    def _forget_memory(self, session_id: str) -> None:
+        with self._memories_lock:
+            self._memories.pop(session_id, None)
+
+
+class InMemorySessionStore(SessionStore):
+    """Süreç içi depo; geliştirme ve testler için (yeniden başlatmada kaybolur).
+
+    Args:
+        max_sessions: Tutulan en fazla oturum; aşılınca en uzun süre yazılmayan oturum
+            (mesajları ve önbellekteki hafızası) silinir.
+    """
+
+    def __init__(self, memory_factory: Optional[Callable[[], "ConversationMemory"]] = None,
+                 max_cached_sessions: int = DEFAULT_MAX_CACHED_SESSIONS,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 cold_start_messages: int = DEFAULT_COLD_START_MESSAGES):
+        super().__init__(memory_factory, max_cached_sessions, cold_start_messages)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, List[StoredMessage]]" = OrderedDict()
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, session_id: str, role: str, content: str) -> int:
+        evicted = None
+        with self._lock:
+            self._seq += 1
+            messages = self._sessions.get(session_id)
+            if messages is None:
+                messages = self._sessions[session_id] = []
+                if len(self._sessions) > self.max_sessions:
+                    evicted, _ = self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            messages.append(StoredMessage(self._seq, role, content, time.time()))
+            seq = self._seq
+        if evicted is not None:
+            self._forget_memory(evicted)
+        return seq
+
+    def page(self, session_id: str, before_seq: Optional[int] = None,
+             limit: int = DEFAULT_PAGE_SIZE) -> List[StoredMessage]:
+        with self._lock:
+            messages = self._sessions.get(session_id, [])
+            end = len(messages) if before_seq is None else bisect_left(messages, before_seq,
+                                                                       key=lambda m: m.seq)
+            return messages[max(end - limit, 0):end]
+
+    def since(self, session_id: str, after_seq: int) -> List[StoredMessage]:
+        with self._lock:
+            messages = self._sessions.get(session_id, [])
+            return messages[bisect_left(messages, after_seq + 1, key=lambda m: m.seq):]
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            return len(self._sessions.get(session_id, []))
+
+
+class SQLiteSessionStore(SessionStore):
+    """WAL modunda SQLite tabanlı depo; birden fazla süreç aynı dosyayı paylaşabilir.
+
+    Args:
+        database_path: SQLite dosyasının yolu (yoksa oluşturulur).
+        pool_size: Bağlantı havuzu boyutu.
+        memory_factory: Yeni bir oturum hafızası oluşturan fonksiyon.
+        max_cached_sessions: Hafızası bellekte tutulan en fazla oturum sayısı (LRU).
+        cold_start_messages: Hafıza ilk kez kurulurken işlenen en fazla son mesaj sayısı.
+    """
+
+    def __init__(self, database_path: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 memory_factory: Optional[Callable[[], "ConversationMemory"]] = None,
+                 max_cached_sessions: int = DEFAULT_MAX_CACHED_SESSIONS,
+                 cold_start_messages: int = DEFAULT_COLD_START_MESSAGES):
+        super().__init__(memory_factory, max_cached_sessions, cold_start_messages)
+        self.pool = SQLiteConnectionPool(database_path, size=pool_size)
+        with self.pool.connection() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    def append(self, session_id: str, role: str, content: str) -> int:
+        with self.pool.connection() as conn:
+            seq = conn.execute(_INSERT, (session_id, role, content, time.time())).lastrowid
+            conn.commit()
+        return seq
+
+    def append_turn(self, session_id: str, user_content: str, ai_content: str) -> None:
+        # İki mesaj tek işlemde yazılır; diğer kopyalar turu yarım görmez
+        now = time.time()
+        with self.pool.connection() as conn:
+            conn.executemany(_INSERT, [(session_id, "user", user_content, now),
+                                       (session_id, "assistant", ai_content, now)])
+            conn.commit()
+
+    def page(self, session_id: str, before_seq: Optional[int] = None,
+             limit: int = DEFAULT_PAGE_SIZE) -> List[StoredMessage]:
+        upper = _NO_UPPER_BOUND if before_seq is None else before_seq
+        with self.pool.connection() as conn:
+            rows = conn.execute(_SELECT_PAGE, (session_id, upper, limit)).fetchall()
+        return [StoredMessage(*row) for row in reversed(rows)]
+
+    def since(self, session_id: str, after_seq: int) -> List[StoredMessage]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(_SELECT_SINCE, (session_id, after_seq)).fetchall()
+        return [StoredMessage(*row) for row in rows]
+
+    def count(self, session_id: str) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute(_COUNT, (session_id,)).fetchone()[0]
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store(default_path: Optional[str] = None) -> SessionStore:
+    """Süreç genelinde paylaşılan oturum deposunu döndürür.
+
+    SESSION_DB_PATH (yoksa default_path) tanımlıysa SQLite deposu, aksi halde en fazla
+    SESSION_MAX_SESSIONS oturum tutan bellek içi depo kullanılır. Oturum hafızaları
+    MEMORY_MAX_TOKENS bütçesiyle, son SESSION_COLD_START_MESSAGES mesajdan kurulur ve en
+    fazla SESSION_CACHE_SIZE oturumunki bellekte tutulur.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                options = {
+                    "memory_factory": _default_memory,
+                    "max_cached_sessions": int(os.getenv("SESSION_CACHE_SIZE", DEFAULT_MAX_CACHED_SESSIONS)),
+                    "cold_start_messages": int(os.getenv("SESSION_COLD_START_MESSAGES",
+                                                         DEFAULT_COLD_START_MESSAGES)),
+                }
+                database_path = os.getenv("SESSION_DB_PATH") or default_path
+                if database_path:
+                    _store = SQLiteSessionStore(database_path, **options)
+                    logging.info("Oturum deposu: SQLite (%s)", database_path)
+                else:
+                    _store = InMemorySessionStore(
+                        max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)), **options)
+    return _store
@@ -0,0 +1,252 @@
+import bisect
+import json
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from text_utils import fold_turkish
+
+# Mağaza konum indeksi: veri dosyası bir kez yüklenir, konum adları katlanmış
+# (fold_turkish) halde hash indeksinde, mağazalar coğrafi ızgara (grid) indeksinde tutulur.
+
+DEFAULT_STORE_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stores.json")
+
+EARTH_RADIUS_KM = 6371.0
+# Izgara hücre boyutu (derece); ~11 km, şehir içi sorgularda birkaç hücre taranır
+GRID_CELL_DEG = 0.1
+# Bir sorgu metninde aranacak en uzun ad (kelime sayısı), ör. "bağdat caddesi"
+MAX_ALIAS_WORDS = 3
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_COORDINATE_RE = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+# Türkçe ek almış yer adları ("ankara'da", "kadikoyde") için sondan atılabilecek ekler
+_SUFFIXES = ("daki", "deki", "taki", "teki", "da", "de", "ta", "te", "nda", "nde", "ya", "ye", "a", "e")
+
+
+@dataclass(frozen=True)
+class Place:
+    """Şehir veya semt; konum çözümlemesinin referans noktası."""
+    name: str
+    kind: str
+    city: str
+    lat: float
+    lon: float
+
+
+@dataclass(frozen=True)
+class Store:
+    """Tek bir mağaza şubesi."""
+    id: str
+    name: str
+    city: str
+    district: str
+    address: str
+    phone: str
+    working_hours: str
+    lat: float
+    lon: float
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "name": self.name,
+            "address": self.address,
+            "phone": self.phone,
+            "working_hours": self.working_hours,
+        }
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """İki koordinat arasındaki büyük daire mesafesini kilometre olarak döndürür."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    return int(math.floor(lat / GRID_CELL_DEG)), int(math.floor(lon / GRID_CELL_DEG))
+
+
+def _ring_cells(row: int, col: int, ring: int) -> Iterable[Tuple[int, int]]:
+    # Merkez hücreye Chebyshev uzaklığı tam olarak `ring` olan hücreler
+    if ring == 0:
+        yield row, col
+        return
+    for c in range(col - ring, col + ring + 1):
+        yield row - ring, c
+        yield row + ring, c
+    for r in range(row - ring + 1, row + ring):
+        yield r, col - ring
+        yield r, col + ring
+
+
+class StoreIndex:
+    """Konum adı ve koordinata göre mağaza arama indeksi.
+
+    Args:
+        places: Şehir/semt referans noktaları ve takma adları.
+        stores: Mağaza listesi.
+    """
+
+    # Aynı sorguda birden fazla yer eşleşirse daha özgül olan (semt) tercih edilir
+    _KIND_RANK = {"district": 0, "city": 1}
+
+    def __init__(self, places: Iterable[Tuple[Place, Iterable[str]]], stores: Iterable[Store]):
+        self.stores: List[Store] = list(stores)
+        self._aliases: Dict[str, Place] = {}
+        self.cities: List[str] = []
+        for place, aliases in places:
+            for alias in (place.name, *aliases):
+                self._aliases[fold_turkish(alias)] = place
+            if place.kind == "city":
+                self.cities.append(place.name)
+        # Önek (prefix) aramaları için sıralı anahtar listesi; trie yerine bisect kullanılır
+        self._sorted_aliases = sorted(self._aliases)
+
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for idx, store in enumerate(self.stores):
+            self._grid.setdefault(_cell(store.lat, store.lon), []).append(idx)
+        rows = [cell[0] for cell in self._grid] or [0]
+        cols = [cell[1] for cell in self._grid] or [0]
+        self._bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_STORE_DATA_PATH) -> "StoreIndex":
+        """JSON veri dosyasından indeks oluşturur."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        places = [
+            (Place(p["name"], p["kind"], p["city"], p["lat"], p["lon"]), p.get("aliases", []))
+            for p in data["places"]
+        ]
+        stores = [Store(**s) for s in data["stores"]]
+        return cls(places, stores)
+
+    def _ring_limit(self, row: int, col: int) -> int:
+        # Sorgu hücresinden tüm mağazaları kapsayan en uzak halka
+        if not self._grid:
+            return 0
+        return max(abs(row - self._bounds[0]), abs(row - self._bounds[1]),
+                   abs(col - self._bounds[2]), abs(col - self._bounds[3]))
+
+    def _lookup_alias(self, token: str) -> Optional[Place]:
+        place = self._aliases.get(token)
+        if place is not None:
+            return place
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                place = self._aliases.get(token[: -len(suffix)])
+                if place is not None:
+                    return place
+        return None
+
+    def _lookup_prefix(self, token: str) -> Optional[Place]:
+        # "kadik" gibi yarım yazılmış adlar; tek anlamlı önek eşleşmesi varsa kabul edilir
+        start = bisect.bisect_left(self._sorted_aliases, token)
+        candidates = set()
+        for alias in self._sorted_aliases[start:start + 4]:
+            if not alias.startswith(token):
+                break
+            candidates.add(self._aliases[alias])
+        return candidates.pop() if len(candidates) == 1 else None
+
+    def resolve_location(self, location: str) -> Optional[Place]:
+        """Serbest metin konumu (şehir, semt, "lat,lon") bir referans noktasına çözer.
+
+        Args:
+            location: Kullanıcının belirttiği konum.
+
+        Returns:
+            Optional[Place]: Çözümlenen yer veya eşleşme yoksa None.
+        """
+        coordinates = _COORDINATE_RE.match(location)
+        if coordinates:
+            lat, lon = float(coordinates.group(1)), float(coordinates.group(2))
+            return Place(f"{lat:.4f},{lon:.4f}", "coordinate", "", lat, lon)
+
+        words = self._words(location)
+        places = self._find_places(words)
+        if places:
+            return min(places, key=lambda place: self._KIND_RANK[place.kind])
+        if len(words) == 1 and len(words[0]) >= 3:
+            return self._lookup_prefix(words[0])
+        return None
+
+    def find_places(self, text: str) -> List[Place]:
+        """Metinde adı (veya takma adı) geçen tüm şehir/semtleri tekrarsız döndürür.
+
+        resolve_location'dan farklı olarak birden fazla yer geçen metinlerde seçim yapmaz;
+        çağıran belirsizliğe kendisi karar verir. Önek eşleşmesi yapılmaz.
+        """
+        return self._find_places(self._words(text))
+
+    @staticmethod
+    def _words(text: str) -> List[str]:
+        return _WORD_RE.findall(fold_turkish(text).replace("'", "").replace("’", ""))
+
+    def _find_places(self, words: List[str]) -> List[Place]:
+        # Uzun adlar önce denenir; en özgül yerin seçiminde ilk bulunan tercih edilir
+        found: Dict[Place, None] = {}
+        for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                place = self._lookup_alias(" ".join(words[i:i + size]))
+                if place is not None:
+                    found[place] = None
+        return list(found)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[Store, float]]:
+        """Koordinata en yakın k mağazayı mesafeleriyle (km) döndürür.
+
+        Izgara hücreleri sorgu hücresinden başlayarak halka halka taranır; bulunan
+        k. en yakın mağaza, taranmamış halkaların alt sınırından yakınsa durulur.
+        """
+        if not self.stores or k <= 0:
+            return []
+        k = min(k, len(self.stores))
+        row, col = _cell(lat, lon)
+        # Bir derece boylamın km karşılığı enleme göre küçülür; alt sınır için küçük olan alınır
+        cell_km = GRID_CELL_DEG * (math.pi / 180) * EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 0.01)
+        found: List[Tuple[float, int]] = []
+        for ring in range(self._ring_limit(row, col) + 1):
+            if (2 * ring + 1) ** 2 > len(self.stores):
+                # Seyrek veride boş halkaları taramak tüm mağazaları taramaktan pahalıdır
+                found = [(haversine_km(lat, lon, s.lat, s.lon), idx) for idx, s in enumerate(self.stores)]
+                break
+            for cell in _ring_cells(row, col, ring):
+                for idx in self._grid.get(cell, ()):
+                    store = self.stores[idx]
+                    found.append((haversine_km(lat, lon, store.lat, store.lon), idx))
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= ring * cell_km:
+                    break
+        found.sort()
+        return [(self.stores[idx], distance) for distance, idx in found[:k]]
+
+    def find_nearest(self, location: str, k: int = 1) -> Optional[Tuple[Place, List[Tuple[Store, float]]]]:
+        """Konum metnini çözüp en yakın k mağazayı döndürür; çözülemezse None."""
+        place = self.resolve_location(location)
+        if place is None:
+            return None
+        return place, self.nearest(place.lat, place.lon, k=k)
+
+
+_index: Optional[StoreIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_store_index() -> StoreIndex:
+    """Süreç genelinde paylaşılan mağaza indeksini döndürür (ilk çağrıda yüklenir).
+
+    Veri dosyası STORE_DATA_PATH ortam değişkeniyle değiştirilebilir.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = StoreIndex.from_file(os.getenv("STORE_DATA_PATH", DEFAULT_STORE_DATA_PATH))
+    return _index
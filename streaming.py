@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+# Agent'in astream_events akışını arayüzlerin (Streamlit, terminal) kullanabileceği
+# sade olaylara dönüştürür. Olay türleri:
+#   {"type": "token", "text": ...}                       -> nihai yanıt parçası
+#   {"type": "tool_start", "tool": ..., "input": ...}    -> araç çağrısı başladı
+#   {"type": "tool_end", "tool": ..., "output": ...}     -> araç sonucu geldi
+#   {"type": "final", "output": ..., "intermediate_steps": [...]}
+
+
+async def astream_agent_events(agent_executor, inputs: Dict[str, Any],
+                               config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Agent çalışmasını olay olay akıtır.
+
+    Args:
+        agent_executor: Çalıştırılacak AgentExecutor.
+        inputs: Agent girdisi ("input", "chat_history").
+        config: Opsiyonel Runnable yapılandırması (callbacks vb.).
+
+    Yields:
+        Dict: Sadeleştirilmiş olay sözlüğü.
+    """
+    async for event in agent_executor.astream_events(inputs, config=config, version="v2"):
+        kind = event["event"]
+
+        if kind == "on_chat_model_stream":
+            chunk = event["data"].get("chunk")
+            # Araç çağrısı içeren parçaların içeriği boştur, sadece metni akıt
+            text = getattr(chunk, "content", "")
+            if isinstance(text, str) and text:
+                yield {"type": "token", "text": text}
+
+        elif kind == "on_tool_start":
+            yield {"type": "tool_start", "tool": event["name"], "input": event["data"].get("input")}
+
+        elif kind == "on_tool_end":
+            yield {"type": "tool_end", "tool": event["name"], "output": event["data"].get("output")}
+
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # En dıştaki zincir (AgentExecutor) bittiğinde nihai sonucu ilet
+            output = event["data"].get("output") or {}
+            yield {
+                "type": "final",
+                "output": output.get("output", ""),
+                "intermediate_steps": output.get("intermediate_steps", []),
+            }
+
+
+def stream_agent(agent_executor, inputs: Dict[str, Any],
+                 on_event: Callable[[Dict[str, Any]], None],
+                 config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Senkron arayüzler için akış yardımcı fonksiyonu.
+
+    Her olayı geldiği anda on_event'e iletir ve sonunda invoke() ile aynı
+    biçimde sonuç sözlüğü döndürür.
+
+    Args:
+        agent_executor: Çalıştırılacak AgentExecutor.
+        inputs: Agent girdisi.
+        on_event: Her olay için çağrılacak fonksiyon.
+        config: Opsiyonel Runnable yapılandırması.
+
+    Returns:
+        Dict: "output" ve "intermediate_steps" anahtarlarını içeren sonuç.
+    """
+    async def _consume() -> Dict[str, Any]:
+        result: Dict[str, Any] = {"output": "", "intermediate_steps": []}
+        async for event in astream_agent_events(agent_executor, inputs, config=config):
+            if event["type"] == "final":
+                result = {"output": event["output"], "intermediate_steps": event["intermediate_steps"]}
+            try:
+                on_event(event)
+            except Exception:
+                # Arayüz hatası agent çalışmasını yarıda kesmemeli
+                logging.exception("Akış olayı işlenirken hata: %s", event["type"])
+        return result
+
+    # asyncio.run() kapanışta varsayılan executor'daki thread'lerin bitmesini bekler;
+    # zaman aşımına uğramış bir araç turu bekletmesin diye döngü elle kapatılır.
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_consume())
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
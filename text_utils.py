@@ -0,0 +1,27 @@
+# Türkçe metin normalleştirme yardımcıları
+
+# "İ" ve "I" harfleri str.lower() ile doğru küçülmez ("İ" -> "i̇"), bu yüzden önce çevrilir
+_TURKISH_UPPER_MAP = str.maketrans({"İ": "i", "I": "ı"})
+_TURKISH_FOLD_MAP = str.maketrans({
+    "ı": "i", "ö": "o", "ü": "u", "ş": "s", "ğ": "g", "ç": "c",
+    "â": "a", "î": "i", "û": "u",
+})
+
+
+def turkish_lower(text: str) -> str:
+    """Metni Türkçe kurallarına göre küçük harfe çevirir."""
+    return text.translate(_TURKISH_UPPER_MAP).lower()
+
+
+def fold_turkish(text: str) -> str:
+    """Metni küçük harfe çevirip Türkçe karakterleri ASCII karşılıklarına indirger.
+
+    Örnek: "Kadıköy'de" -> "kadikoy'de"
+
+    Args:
+        text: Normalleştirilecek metin.
+
+    Returns:
+        str: Katlanmış (folded) metin.
+    """
+    return turkish_lower(text).translate(_TURKISH_FOLD_MAP).strip()
@@ -0,0 +1,190 @@
+import copy
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Yan etkisi olmayan (idempotent) araçların sonuçları için TTL + LRU önbellek.
+# Yan etkili araçlar asla önbelleğe alınmamalıdır; aşağıdaki liste bunu zorunlu kılar.
+NEVER_CACHE = frozenset({"update_user_email", "schedule_appointment"})
+
+# Araç adı -> önbellek; istatistikleri dışarıya açmak için tutulur
+_CACHES: Dict[str, "ToolResultCache"] = {}
+
+
+class _InFlight:
+    """Aynı anahtar için devam eden tek bir hesaplamayı temsil eder."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.shared = True
+
+
+class ToolResultCache:
+    """Thread-safe TTL + LRU önbellek; eşzamanlı aynı istekleri tek çağrıda birleştirir.
+
+    Args:
+        name: Önbelleğin ait olduğu aracın adı.
+        ttl: Kayıtların geçerlilik süresi (saniye).
+        maxsize: Tutulacak en fazla kayıt sayısı, aşıldığında en eski kullanılan atılır.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Anahtar önbellekte geçerliyse onu, değilse compute() sonucunu döndürür."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+                del self._data[key]
+                self.expirations += 1
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                inflight = self._inflight[key] = _InFlight()
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            # Aynı argümanlarla süren çağrının sonucunu bekle
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            if not inflight.shared:
+                # Başarısız sonuç sahibinin ham girdisini içerebilir; bu çağrı kendi sonucunu üretir
+                return compute()
+            return copy.deepcopy(inflight.value)
+
+        try:
+            value = compute()
+        except BaseException as e:
+            # Hatalar önbelleğe alınmaz, bekleyenlere aynı hata iletilir
+            inflight.error = e
+            with self._lock:
+                del self._inflight[key]
+            inflight.done.set()
+            raise
+
+        inflight.value = value
+        inflight.shared = _is_cacheable(value)
+        with self._lock:
+            if inflight.shared:
+                self._data[key] = (time.monotonic() + self.ttl, value)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+            del self._inflight[key]
+        inflight.done.set()
+        return copy.deepcopy(value) if inflight.shared else value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+
+def _is_cacheable(value: Any) -> bool:
+    # Başarısız sonuçlar ("success": False) önbelleğe alınmaz: mesajları çağıranın ham
+    # girdisini aktarabilir ve normalleştirilmiş anahtarı paylaşan başka girdilere yanlış düşer
+    return not (isinstance(value, dict) and value.get("success") is False)
+
+
+def _default_normalize(value: Any) -> Hashable:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return tuple(_default_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _default_normalize(v)) for k, v in value.items()))
+    return value
+
+
+def cached_tool(ttl: float = 60.0, maxsize: int = 1024,
+                normalizers: Optional[Dict[str, Callable[[Any], Hashable]]] = None):
+    """Idempotent araç fonksiyonlarını önbelleğe alan dekoratör.
+
+    @tool dekoratörünün altına uygulanır; imza ve docstring korunur.
+
+    Args:
+        ttl: Kayıtların geçerlilik süresi (saniye).
+        maxsize: LRU önbellek boyutu.
+        normalizers: Argüman adı -> normalleştirme fonksiyonu (ör. konum için fold_turkish).
+
+    Returns:
+        Callable: Önbellekli fonksiyonu üreten dekoratör.
+    """
+    normalizers = normalizers or {}
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if func.__name__ in NEVER_CACHE:
+            raise ValueError(f"{func.__name__} yan etkili bir araçtır ve önbelleğe alınamaz.")
+
+        signature = inspect.signature(func)
+        cache = ToolResultCache(func.__name__, ttl, maxsize)
+        _CACHES[func.__name__] = cache
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                (name, normalizers.get(name, _default_normalize)(value) if value is not None else None)
+                for name, value in bound.arguments.items()
+            )
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Tüm araç önbelleklerinin isabet/ıska/atılma sayaçlarını döndürür."""
+    return {name: cache.stats() for name, cache in _CACHES.items()}
+
+
+def clear_caches() -> None:
+    """Tüm araç önbelleklerini boşaltır."""
+    for cache in _CACHES.values():
+        cache.clear()
+    logging.info("Araç önbellekleri temizlendi.")
@@ -0,0 +1,305 @@
+import datetime
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from text_utils import fold_turkish
+from tool_cache import cached_tool
+from store_index import get_store_index
+from order_repository import get_order_repository
+from appointments import SERVICES, get_booking_engine, resolve_service
+from dates import normalize_datetime
+from log_setup import TOOL_LOGGER, current_session_id
+from profile_outbox import FAILED, QUEUED, PENDING, SENT, get_profile_outbox, validate_email
+
+# Mock API fonksiyonları ve hafif araç kaydı. Bu modül LLM yığınını (langchain, langchain_groq)
+# içe aktarmaz: hızlı yol yönlendiricisi araçları doğrudan buradan çağırır; LangChain araç
+# nesneleri yalnızca agent ilk kez kurulurken get_langchain_tools ile oluşturulur.
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Kayıtlı bir araç: ad, fonksiyon ve açıklama (fonksiyonun docstring'i)."""
+
+    name: str
+    func: Callable[..., Any]
+
+    @property
+    def description(self) -> str:
+        return self.func.__doc__ or ""
+
+    def invoke(self, args: Dict[str, Any]) -> Any:
+        return self.func(**args)
+
+
+# Kayıt sırası agent'a verilen araç sırasıdır
+REGISTRY: Dict[str, ToolSpec] = {}
+
+
+def register(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Fonksiyonu araç kaydına ekler; fonksiyonun kendisini değiştirmeden döndürür."""
+    REGISTRY[func.__name__] = ToolSpec(func.__name__, func)
+    return func
+
+
+# find_nearest_store yanıtında döndürülecek yakın şube sayısı (ilki + alternatifler)
+NEAREST_STORE_COUNT = 3
+
+# Kullanıcı kimliği olarak oturum kimliği kullanılır; oturum dışı çağrılar bu kimliğe yazılır
+ANONYMOUS_USER = "anonim"
+
+# Profil güncelleme durumlarının kullanıcıya gösterilen karşılıkları
+EMAIL_UPDATE_STATUS_MESSAGES = {
+    QUEUED: "E-posta güncelleme talebiniz alındı, sisteme işlenmek üzere sırada.",
+    PENDING: "E-posta güncelleme talebiniz sisteme iletiliyor.",
+    SENT: "E-posta adresiniz sistemde güncellendi.",
+    FAILED: "E-posta güncellemesi sisteme işlenemedi. Lütfen daha sonra tekrar deneyin.",
+}
+
+# Sipariş depoda yoksa döndürülen varsayılan durum
+ORDER_NOT_FOUND = {"status": "Bulunamadı", "message": "Bu sipariş numarası sistemde bulunamadı."}
+
+# Araç logları örneklenebilir "tools" logger'ına yazılır (log_setup.py); mesajlar tembel biçimlendirilir
+logger = logging.getLogger(TOOL_LOGGER)
+
+@register
+@cached_tool(ttl=60, maxsize=4096)
+def get_order_status(order_id: str) -> Dict[str, Any]:
+    """Verilen sipariş numarası için sipariş durumunu sorgular.
+
+    Args:
+        order_id: Sorgulanacak sipariş numarası.
+
+    Returns:
+        Dict: Sipariş durum bilgilerini içeren sözlük.
+    """
+    logger.info("--- API Çağrısı: get_order_status(order_id=%s) ---", order_id)
+    order = get_order_repository().get(order_id.strip())
+    result = order if order is not None else dict(ORDER_NOT_FOUND)
+    logger.info("get_order_status sonucu: %s", result)
+    return result
+
+@register
+def get_order_statuses(order_ids: List[str]) -> Dict[str, Any]:
+    """Birden fazla sipariş numarasının durumunu tek seferde sorgular.
+
+    Args:
+        order_ids: Sorgulanacak sipariş numaralarının listesi.
+
+    Returns:
+        Dict: Her sipariş için durum bilgisini içeren "orders" listesi.
+    """
+    logger.info("--- API Çağrısı: get_order_statuses(order_ids=%s) ---", order_ids)
+    # Sırayı koruyarak tekrar eden numaraları ayıkla
+    unique_ids = list(dict.fromkeys(order_id.strip() for order_id in order_ids))
+    orders = get_order_repository().get_many(unique_ids)
+    result = {
+        "orders": [
+            {"order_id": order_id, **(order if order is not None else ORDER_NOT_FOUND)}
+            for order_id, order in orders.items()
+        ]
+    }
+    logger.info("get_order_statuses sonucu: %s", result)
+    return result
+
+@register
+def update_user_email(new_email: str) -> Dict[str, Any]:
+    """Kullanıcının email adresini günceller.
+
+    Args:
+        new_email: Güncellenecek yeni email adresi.
+
+    Returns:
+        Dict: İşlem sonucunu içeren sözlük.
+    """
+    logger.info("--- API Çağrısı: update_user_email(new_email=%s) ---", new_email)
+    
+    email = validate_email(new_email)
+    if email is None:
+        result = {"success": False, "message": "Geçerli bir email adresi girilmelidir."}
+    else:
+        # CRM'e yazım arka planda yapılır (profile_outbox.py); tur CRM gecikmesini beklemez.
+        # Kısa sürede gelen düzeltmeler son değerde birleştirilir.
+        update_id = get_profile_outbox().submit(current_session_id() or ANONYMOUS_USER, "email", email)
+        result = {
+            "success": True,
+            "status": QUEUED,
+            "update_id": update_id,
+            "message": f"Email adresiniz {email} olarak güncellenmiştir. Değişiklik birkaç saniye içinde "
+                       f"tüm sistemlere yansıyacaktır."
+        }
+    
+    logger.info("update_user_email sonucu: %s", result)
+    return result
+
+@register
+def get_email_update_status() -> Dict[str, Any]:
+    """Kullanıcının son e-posta güncelleme talebinin sisteme işlenip işlenmediğini sorgular.
+
+    Returns:
+        Dict: Güncellemenin durumunu (queued, pending, sent, failed) içeren sözlük.
+    """
+    logger.info("--- API Çağrısı: get_email_update_status() ---")
+    status = get_profile_outbox().status(current_session_id() or ANONYMOUS_USER, "email")
+    if status is None:
+        result = {"success": False, "message": "Bu oturumda bir e-posta güncelleme talebi bulunamadı."}
+    else:
+        result = {
+            "success": True,
+            "email": status["value"],
+            "status": status["status"],
+            "update_id": status["update_id"],
+            "message": EMAIL_UPDATE_STATUS_MESSAGES.get(status["status"], status["status"])
+        }
+    logger.info("get_email_update_status sonucu: %s", result)
+    return result
+
+@register
+def schedule_appointment(service_type: Optional[str] = None, 
+                        preferred_date: Optional[str] = None, 
+                        preferred_time: Optional[str] = None) -> Dict[str, Any]:
+    """Servis randevusu oluşturur.
+
+    Args:
+        service_type: Randevu türü: Genel Servis, Bakım, Tamir veya Kurulum (opsiyonel, belirtilmezse genel servis olarak alınır)
+        preferred_date: Tercih edilen tarih (YYYY-MM-DD veya "yarın", "önümüzdeki salı", "20 ekim" gibi ifade)
+        preferred_time: Tercih edilen saat (HH:MM veya "saat 2", "öğleden sonra", "10 buçuk" gibi ifade)
+
+    Returns:
+        Dict: Randevu bilgilerini içeren sözlük.
+    """
+    logger.info("--- API Çağrısı: schedule_appointment(service_type=%s, preferred_date=%s, preferred_time=%s) ---",
+                service_type, preferred_date, preferred_time)
+    
+    try:
+        if resolve_service(service_type) is None:
+            names = ", ".join(config.name for config in SERVICES.values())
+            result = {
+                "success": False,
+                "message": f"'{service_type}' tanımlı bir servis değil. Geçerli servisler: {names}."
+            }
+            logger.info("schedule_appointment sonucu: %s", result)
+            return result
+        # "yarın öğleden sonra", "önümüzdeki salı", "saat 2 buçuk" gibi ifadeler araç içinde
+        # deterministik olarak çözülür; model tarihi kendisi hesaplamak zorunda kalmaz
+        date, time = normalize_datetime(preferred_date, preferred_time)
+        if date is None and preferred_date and preferred_date.strip():
+            # Anlaşılamayan tarih için sessizce yarına randevu verilmez
+            result = {
+                "success": False,
+                "message": f"Tarih anlaşılamadı: '{preferred_date}'. Lütfen 'yarın', 'önümüzdeki salı' "
+                           f"veya YYYY-MM-DD biçiminde belirtin."
+            }
+            logger.info("schedule_appointment sonucu: %s", result)
+            return result
+        if date is None:
+            date = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+            logger.info("Tarih belirtilmemiş, varsayılan olarak yarın kullanılıyor: %s", date)
+        if time is None:
+            if preferred_time and preferred_time.strip():
+                logger.warning("Geçersiz saat ifadesi: %s, varsayılan olarak 09:00 kullanılıyor", preferred_time)
+            time = "09:00"
+        preferred_date, preferred_time = date, time
+
+        # Kapasite ve çakışma kontrolü randevu motorunda yapılır
+        booking = get_booking_engine().book(service_type, preferred_date, preferred_time)
+        if booking.success:
+            appointment = booking.appointment
+            result = {
+                "success": True, 
+                **appointment.to_dict(),
+                "message": f"{appointment.date} tarihinde saat {appointment.time} için {appointment.service_type} randevunuz oluşturulmuştur."
+            }
+        else:
+            # Körü körüne onay yerine en yakın boş saatler önerilir
+            suggestions = ", ".join(f"{slot['date']} {slot['time']}" for slot in booking.alternatives)
+            result = {
+                "success": False,
+                "message": booking.reason + (f" En yakın uygun saatler: {suggestions}" if suggestions else
+                                             " Önümüzdeki günlerde uygun saat bulunamadı."),
+                "alternatives": booking.alternatives
+            }
+    except Exception as e:
+        logger.error("Randevu oluşturulurken hata: %s", e)
+        result = {"success": False, "message": f"Randevu oluşturulamadı: {str(e)}"}
+    
+    logger.info("schedule_appointment sonucu: %s", result)
+    return result
+
+@register
+@cached_tool(ttl=3600, maxsize=1024, normalizers={"location": fold_turkish})
+def find_nearest_store(location: Optional[str] = None) -> Dict[str, Any]:
+    """Verilen konuma en yakın mağazayı bulur.
+
+    Args:
+        location: Kullanıcı konumu (şehir adı, semt veya "enlem,boylam")
+
+    Returns:
+        Dict: En yakın mağaza bilgisini içeren sözlük.
+    """
+    logger.info("--- API Çağrısı: find_nearest_store(location=%s) ---", location)
+    
+    # Konum belirlenmemişse veya geçersizse
+    if not location or fold_turkish(location) in ["your current location", "my location", "current location"]:
+        logger.warning("Konum belirtilmemiş veya geçersiz: %s", location)
+        return {
+            "message": "Konum bilgisi alınamadı. Lütfen bulunduğunuz şehir veya semti belirtin.",
+            "stores_available": get_store_index().cities
+        }
+    
+    # Konum, bir kez yüklenen mağaza indeksinde şehir/semt adına çözülür
+    store_index = get_store_index()
+    match = store_index.find_nearest(location, k=NEAREST_STORE_COUNT)
+
+    if match and match[1]:
+        place, nearest = match
+        store, distance_km = nearest[0]
+        result = {
+            "success": True,
+            "store": store.to_dict(),
+            "distance": f"Yaklaşık {distance_km:.1f} km",
+            "message": f"Size en yakın mağazamız: {store.name}, {store.address}"
+        }
+        # Diğer yakın şubeler de mesafeleriyle birlikte önerilir
+        if len(nearest) > 1:
+            result["alternatives"] = [
+                {"name": other.name, "address": other.address, "distance": f"Yaklaşık {other_km:.1f} km"}
+                for other, other_km in nearest[1:]
+            ]
+        logger.info("find_nearest_store sonucu (%s): %s", place.name, result)
+        return result
+    
+    # Eşleşme bulunamadı
+    cities = ", ".join(store_index.cities)
+    result = {
+        "success": False,
+        "message": f"'{location}' konumunda mağaza bulunamadı. Hizmet verdiğimiz şehirler: {cities}",
+        "stores_available": store_index.cities
+    }
+    
+    logger.info("find_nearest_store sonucu: %s", result)
+    return result
+
+
+def tool_specs(names: Optional[List[str]] = None) -> List[ToolSpec]:
+    """Kayıtlı araçları (veya verilen adlardakileri) kayıt sırasıyla döndürür."""
+    return [spec for name, spec in REGISTRY.items() if names is None or name in names]
+
+
+_langchain_tools: Optional[List[Any]] = None
+_langchain_tools_lock = threading.Lock()
+
+
+def get_langchain_tools() -> List[Any]:
+    """Kayıtlı araçların LangChain StructuredTool karşılıklarını ilk çağrıda oluşturur."""
+    global _langchain_tools
+    if _langchain_tools is None:
+        with _langchain_tools_lock:
+            if _langchain_tools is None:
+                # LLM yığını yalnızca agent gerçekten kurulurken yüklenir
+                from langchain_core.tools import StructuredTool
+
+                _langchain_tools = [StructuredTool.from_function(spec.func, name=spec.name)
+                                    for spec in REGISTRY.values()]
+    return list(_langchain_tools)